@@ -1,24 +1,111 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file, g
+from werkzeug.security import safe_join
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 import logging
-from src.resume_tailor import ResumeTailor
+import mimetypes
+import threading
+from src.resume_tailor.logging_config import configure_logging, new_request_id, set_request_id, reset_request_id
+from src.resume_tailor.metrics import render_prometheus
+from src.resume_tailor.compile_service import CompileQueueFull
+from src.resume_tailor.admission import AdmissionController, AdmissionRejected
+from src.resume_tailor.template_store import TemplateNotFound
+from src.resume_tailor.delivery import file_etag, offload_mode, accel_redirect_path, compress_response
+from src.resume_tailor.input_limits import InputLimits, InputRejected
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+configure_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key')
 
+
+def trust_proxies(wsgi_app):
+    """Take the client from X-Forwarded-For when TRUSTED_PROXY_COUNT proxies sit in front"""
+    # Behind Render or nginx remote_addr is the proxy, so per-client quotas need the forwarded
+    # address. Off by default: without a proxy, clients could forge the header to dodge quotas.
+    trusted_proxies = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+    if not trusted_proxies:
+        return wsgi_app
+    return ProxyFix(wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies, x_host=trusted_proxies)
+
+
+app.wsgi_app = trust_proxies(app.wsgi_app)
+# X-Sendfile: send_file answers with headers only and the front proxy streams the file
+app.config['USE_X_SENDFILE'] = offload_mode() == 'x-sendfile'
+
+# Per-request and per-field size limits for tailoring input
+input_limits = InputLimits()
+# One byte over the limit, so a chunked body that runs over reads back too long rather than cut to fit
+app.config['MAX_CONTENT_LENGTH'] = input_limits.max_request_bytes + 1
+
+# Built on first use so cold starts (Vercel, Render) only pay for Flask
 resume_tailor = None
-logger.info("🔧 Initializing ResumeTailor...")
-try:
-    resume_tailor = ResumeTailor()
-    logger.info("✅ ResumeTailor initialized successfully")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize ResumeTailor: {e}")
-    import traceback
-    logger.error(traceback.format_exc())
+_resume_tailor_lock = threading.Lock()
+
+def get_resume_tailor():
+    """Return the shared ResumeTailor, building it on the first call; None if that fails"""
+    global resume_tailor
+    if resume_tailor is None:
+        with _resume_tailor_lock:
+            if resume_tailor is None:
+                logger.info("🔧 Initializing ResumeTailor...")
+                try:
+                    from src.resume_tailor.core import ResumeTailor
+                    tailor = ResumeTailor()
+                    tailor.warm_up()
+                    resume_tailor = tailor
+                    logger.info("✅ ResumeTailor initialized successfully")
+                except Exception:
+                    logger.exception("❌ Failed to initialize ResumeTailor")
+    return resume_tailor
+
+# Caps concurrent tailoring jobs per worker process and sheds the overflow
+admission = AdmissionController()
+
+def read_json_body():
+    """JSON object body, refused before reading when its declared size is over the limit"""
+    input_limits.check_content_length(request.content_length)
+    try:
+        raw = request.get_data(cache=False)
+    except RequestEntityTooLarge:
+        raise InputRejected('request', f"Request body exceeds {input_limits.max_request_bytes} bytes", status=413)
+    return input_limits.parse_body(raw)
+
+def retry_later(message, status, retry_after):
+    response = jsonify({'error': message})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, status
+
+def shed(e, endpoint):
+    logger.warning("⏳ Shedding %s request: %s", endpoint, e)
+    if e.status == 429:
+        return retry_later('Too many requests from this client, please retry later', 429, e.retry_after)
+    return retry_later('Server is busy, please retry shortly', e.status, e.retry_after)
+
+@app.before_request
+def assign_request_id():
+    # Correlate every log line of a request, honoring an upstream X-Request-ID
+    g.request_id = new_request_id(request.headers.get('X-Request-ID'))
+    g.request_id_token = set_request_id(g.request_id)
+
+@app.after_request
+def expose_request_id(response):
+    response.headers['X-Request-ID'] = g.get('request_id', '-')
+    return response
+
+@app.after_request
+def compress_json(response):
+    # /tailor returns the whole modified resume; it compresses several-fold
+    return compress_response(response, request.accept_encodings)
+
+@app.teardown_request
+def clear_request_id(exc=None):
+    token = g.pop('request_id_token', None)
+    if token is not None:
+        reset_request_id(token)
 
 @app.route('/')
 def index():
@@ -28,31 +115,34 @@ def index():
 def tailor_resume():
     logger.info("🎯 /tailor endpoint called")
     try:
-        data = request.get_json()
-        logger.info(f"📥 Received data keys: {list(data.keys()) if data else 'None'}")
+        data = read_json_body()
+        logger.debug("📥 Received data keys: %s", list(data.keys()))
         
-        # Extract data from request
-        job_description = data.get('job_description', '')
-        projects_data = data.get('projects', [])
-        latex_resume = data.get('latex_resume', '')
+        # Extract data from request, within the size limits
+        job_description = input_limits.job_description(data.get('job_description'))
+        projects_data = input_limits.projects(data.get('projects'))
+        latex_resume = input_limits.latex(data.get('latex_resume'))
+        resume_id = input_limits.resume_id(data.get('resume_id'))
         
-        logger.info(f"📋 Job description length: {len(job_description)}")
-        logger.info(f"📋 Projects count: {len(projects_data)}")
-        logger.info(f"📋 LaTeX resume length: {len(latex_resume)}")
+        logger.info("📋 Tailor request: job_description=%d chars, projects=%d, latex_resume=%d chars, resume_id=%s",
+                    len(job_description), len(projects_data), len(latex_resume), resume_id)
         
-        if not job_description or not latex_resume:
-            logger.error("❌ Missing required data")
-            return jsonify({'error': 'Job description and LaTeX resume are required'}), 400
+        if not job_description or not (latex_resume or resume_id):
+            logger.warning("❌ Missing required data")
+            return jsonify({'error': 'Job description and a LaTeX resume or resume_id are required'}), 400
         
-        if resume_tailor is None:
+        tailor = get_resume_tailor()
+        if tailor is None:
             logger.error("❌ ResumeTailor not initialized")
             return jsonify({'error': 'ResumeTailor not initialized'}), 500
         
         # Use the new modular approach
-        logger.info("🔧 Calling resume_tailor.tailor_resume...")
-        result = resume_tailor.tailor_resume(job_description, latex_resume, projects_data)
-        logger.info(f"📊 Result keys: {list(result.keys()) if result else 'None'}")
-        logger.info(f"📊 PDF result: {result.get('pdf_result')}")
+        with admission.admit(request.remote_addr):
+            if resume_id:
+                result = tailor.tailor_resume(job_description, projects_data=projects_data, resume_id=resume_id)
+            else:
+                result = tailor.tailor_resume(job_description, latex_resume, projects_data)
+        logger.info("📊 PDF result: %s", result.get('pdf_result'))
         
         if result['pdf_result']:
             return jsonify({
@@ -61,34 +151,102 @@ def tailor_resume():
                 'modified_resume': result['modified_resume'],
                 'pdf_path': result['pdf_result']['filename'],
                 'is_single_page': result['pdf_result']['is_single_page'],
-                'page_count': result['pdf_result']['page_count']
+                'page_count': result['pdf_result']['page_count'],
+                'page_fit': result.get('page_fit'),
+                'llm_calls_saved': result.get('llm_calls_saved', 0)
             })
         else:
             return jsonify({'error': 'Failed to compile LaTeX resume'}), 500
             
+    except InputRejected as e:
+        logger.warning("❌ Rejected %s: %s", e.field, e)
+        return jsonify({'error': str(e)}), e.status
+    except TemplateNotFound:
+        logger.warning("❌ Unknown resume_id: %s", resume_id)
+        return jsonify({'error': 'Unknown resume_id; upload the resume to /templates first'}), 404
+    except AdmissionRejected as e:
+        return shed(e, '/tailor')
+    except CompileQueueFull as e:
+        logger.warning("⏳ Compile service is saturated: %s", e)
+        return retry_later('Compile service is busy, please retry shortly', 503, e.retry_after)
     except Exception as e:
-        logger.error(f"❌ Error in /tailor endpoint: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("❌ Error in /tailor endpoint")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/templates', methods=['POST'])
+def upload_template():
+    """Store a LaTeX resume once; later /tailor calls pass the returned resume_id"""
+    try:
+        latex_resume = input_limits.latex(read_json_body().get('latex_resume'))
+    except InputRejected as e:
+        return jsonify({'error': str(e)}), e.status
+    if not latex_resume:
+        return jsonify({'error': 'LaTeX resume is required'}), 400
+    
+    tailor = get_resume_tailor()
+    if tailor is None:
+        logger.error("❌ ResumeTailor not initialized")
+        return jsonify({'error': 'ResumeTailor not initialized'}), 500
+    
+    try:
+        # Uploads count against the same concurrency limit and per-client quota as /tailor
+        with admission.admit(request.remote_addr):
+            template = tailor.register_template(latex_resume)
+    except AdmissionRejected as e:
+        return shed(e, '/templates')
+    except Exception as e:
+        logger.exception("❌ Error in /templates endpoint")
+        return jsonify({'error': str(e)}), 500
+    logger.info("📦 Stored template %s (%d chars)", template.resume_id, len(latex_resume))
+    return jsonify(template.to_dict()), 201
+
+@app.route('/templates/<resume_id>')
+def get_template(resume_id):
+    tailor = get_resume_tailor()
+    template = tailor.template_store.get(resume_id) if tailor else None
+    if template is None:
+        return jsonify({'error': 'Unknown resume_id'}), 404
+    return jsonify(template.to_dict())
+
 @app.route('/download/<filename>')
 def download_file(filename):
     try:
         temp_dir = os.environ.get('TEMP_DIR', 'temp')
-        file_path = f'{temp_dir}/{filename}'
-        logger.info(f"📥 Download request for: {file_path}")
-        logger.info(f"📁 File exists: {os.path.exists(file_path)}")
-        if os.path.exists(file_path):
-            logger.info(f"📄 File size: {os.path.getsize(file_path)} bytes")
-        return send_file(file_path, as_attachment=True)
+        file_path = safe_join(os.path.abspath(temp_dir), filename)
+        logger.info("📥 Download request for: %s", file_path)
+        if file_path is None or not os.path.isfile(file_path):
+            raise FileNotFoundError(filename)
+        
+        # Tailored PDFs are named by content hash, so the name doubles as a strong ETag
+        etag = file_etag(file_path)
+        if offload_mode() == 'x-accel':
+            return accel_redirect(filename, etag)
+        # conditional=True answers If-None-Match with 304 and Range with 206
+        return send_file(file_path, as_attachment=True, etag=etag, conditional=True)
     except FileNotFoundError:
-        logger.error(f"❌ File not found: {filename}")
+        logger.error("❌ File not found: %s", filename)
         return jsonify({'error': 'File not found'}), 404
     except Exception as e:
-        logger.error(f"❌ Download error: {e}")
+        logger.exception("❌ Download error")
         return jsonify({'error': str(e)}), 500
 
+def accel_redirect(filename, etag):
+    """Headers-only response; nginx serves the body (and any Range) from its internal location"""
+    response = Response(status=200)
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    if request.if_none_match.contains(etag):
+        response.status_code = 304
+        return response
+    response.headers['X-Accel-Redirect'] = accel_redirect_path(filename)
+    response.headers['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response.headers.set('Content-Disposition', 'attachment', filename=filename)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
 if __name__ == '__main__':
     # Create temp directory if it doesn't exist
     temp_dir = os.environ.get('TEMP_DIR', 'temp')
@@ -97,12 +255,13 @@ if __name__ == '__main__':
     # Get port from environment variable or default to 5000
     port = int(os.environ.get('PORT', 5000))
     
-    # In Codespaces, always run in debug mode for better development experience
-    debug = True
+    # The Werkzeug server is for development only; production runs gunicorn -c gunicorn.conf.py app:app
+    debug = os.environ.get('FLASK_ENV', 'development') == 'development'
+    if not debug:
+        logger.warning("⚠️ Running the development server with FLASK_ENV=%s; use gunicorn -c gunicorn.conf.py app:app",
+                       os.environ.get('FLASK_ENV'))
     
-    print(f"🚀 Starting Resume Tailor on port {port}")
-    print(f"📁 Temp directory: {temp_dir}")
-    print(f"🔧 Debug mode: {debug}")
-    print(f"🌐 Access the application at: http://localhost:{port}")
+    logger.info("🚀 Starting Resume Tailor on port %d (temp dir: %s, debug: %s)", port, temp_dir, debug)
+    logger.info("🌐 Access the application at: http://localhost:%d", port)
     
     app.run(host='0.0.0.0', port=port, debug=debug) 
\ No newline at end of file
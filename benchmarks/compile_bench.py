@@ -0,0 +1,168 @@
+"""
+Compile Micro-Benchmark
+
+Runs every resume in benchmarks/corpus through each engine (pdflatex,
+lualatex, simplified pdflatex and the -draftmode layout probe), with a cold
+and a warm preamble format, in a tmpfs and an on-disk workspace. Records wall
+time, peak RSS of the engine and success rate, and prints a comparison table
+so the fallback order and caching choices in LaTeXProcessor.compile_latex can
+be made from data.
+
+Usage:
+    python -m benchmarks.compile_bench --repeat 5
+"""
+
+import os
+import json
+import glob
+import argparse
+import resource
+import statistics
+import tempfile
+import time
+import multiprocessing
+from typing import Dict, List
+
+from src.resume_tailor.compile_runner import CompileRunner, WorkspacePool
+from src.resume_tailor.latex_processor import LaTeXProcessor, engine_command
+from src.resume_tailor.preamble_format import PreambleFormatCache
+
+from .scenarios import CORPUS_DIR
+
+ENGINES = ['pdflatex', 'lualatex', 'simplified', 'probe']
+
+
+def simplify(latex_content: str) -> str:
+    # _simplify_latex_content does not touch any processor state
+    return LaTeXProcessor._simplify_latex_content(None, latex_content)
+
+
+def _compile_once(spec: Dict) -> Dict:
+    """Run one compile; executed in a fresh process so RUSAGE_CHILDREN is this run's peak"""
+    engine = 'pdflatex' if spec['engine'] in ('simplified', 'probe') else spec['engine']
+    draft = spec['engine'] == 'probe'
+    env = None
+    if spec['format_name']:
+        env = PreambleFormatCache(cache_dir=spec['format_dir']).format_env()
+
+    with WorkspacePool(spec['workspace_root']).acquire() as work_dir:
+        tex_file = os.path.join(work_dir, 'resume.tex')
+        with open(tex_file, 'w', encoding='utf-8') as f:
+            f.write(spec['latex'])
+        command = engine_command(engine, tex_file, work_dir, spec['format_name'], draft)
+        result = CompileRunner().run(command, cwd=work_dir, env=env)
+        produced_pdf = os.path.exists(os.path.join(work_dir, 'resume.pdf'))
+
+    # ru_maxrss is KiB on Linux
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        'status': result.status,
+        # A draft-mode probe succeeds without writing a PDF
+        'ok': result.ok and (produced_pdf or draft),
+        'wall': result.elapsed,
+        'peak_rss_mb': peak_rss_kb / 1024.0,
+    }
+
+
+def run_isolated(spec: Dict) -> Dict:
+    with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+        return pool.apply(_compile_once, (spec,))
+
+
+def workspace_roots(disk_root: str) -> Dict[str, str]:
+    roots = {'disk': disk_root}
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        roots['tmpfs'] = '/dev/shm'
+    return roots
+
+
+def benchmark(resumes: List[str], repeat: int, engines: List[str]) -> List[Dict]:
+    rows = []
+    with tempfile.TemporaryDirectory(dir=os.getcwd()) as disk_root, tempfile.TemporaryDirectory() as format_dir:
+        roots = workspace_roots(disk_root)
+        format_cache = PreambleFormatCache(cache_dir=format_dir)
+
+        for path in resumes:
+            name = os.path.basename(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                latex = f.read()
+            # Warm formats are built once up front; only their reuse is measured
+            build_start = time.perf_counter()
+            warm_format = format_cache.build(latex)
+            build_seconds = time.perf_counter() - build_start
+
+            for engine in engines:
+                source = simplify(latex) if engine == 'simplified' else latex
+                formats = {'cold': None}
+                if engine != 'lualatex':
+                    formats['warm'] = warm_format if engine in ('pdflatex', 'probe') else format_cache.build(source)
+
+                for format_label, format_name in formats.items():
+                    for workspace_label, root in roots.items():
+                        if format_label == 'warm' and not format_name:
+                            rows.append(_row(name, engine, format_label, workspace_label, [], repeat,
+                                             note='format build failed'))
+                            continue
+                        spec = {
+                            'engine': engine, 'latex': source, 'format_name': format_name,
+                            'format_dir': format_dir, 'workspace_root': root,
+                        }
+                        runs = [run_isolated(spec) for _ in range(repeat)]
+                        note = f'format built in {build_seconds:.2f}s' if format_label == 'warm' and engine == 'pdflatex' else ''
+                        rows.append(_row(name, engine, format_label, workspace_label, runs, repeat, note))
+    return rows
+
+
+def _row(resume: str, engine: str, format_label: str, workspace: str, runs: List[Dict],
+         repeat: int, note: str = '') -> Dict:
+    successes = [run for run in runs if run['ok']]
+    return {
+        'resume': resume,
+        'engine': engine,
+        'format': format_label,
+        'workspace': workspace,
+        'runs': len(runs) or repeat,
+        'success_rate': len(successes) / (len(runs) or repeat),
+        'median_wall': statistics.median(run['wall'] for run in successes) if successes else None,
+        'max_wall': max(run['wall'] for run in successes) if successes else None,
+        'peak_rss_mb': max(run['peak_rss_mb'] for run in runs) if runs else None,
+        'statuses': sorted({run['status'] for run in runs}),
+        'note': note,
+    }
+
+
+def format_table(rows: List[Dict]) -> str:
+    def num(value, width, precision):
+        return f'{value:>{width}.{precision}f}' if value is not None else f"{'-':>{width}}"
+
+    header = (f"{'resume':<24} {'engine':<11} {'format':<6} {'workspace':<9} "
+              f"{'ok %':>5} {'median s':>9} {'max s':>7} {'RSS MB':>7}  notes")
+    lines = [header, '-' * len(header)]
+    for row in rows:
+        notes = row['note'] or ','.join(status for status in row['statuses'] if status != 'ok')
+        lines.append(
+            f"{row['resume']:<24} {row['engine']:<11} {row['format']:<6} {row['workspace']:<9} "
+            f"{row['success_rate'] * 100:>5.0f} {num(row['median_wall'], 9, 3)} "
+            f"{num(row['max_wall'], 7, 3)} {num(row['peak_rss_mb'], 7, 1)}  {notes}"
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare TeX engines, warm formats and workspaces')
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='directory of marker-annotated .tex resumes')
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=ENGINES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write the results as JSON to this path')
+    args = parser.parse_args()
+
+    resumes = sorted(glob.glob(os.path.join(args.corpus, '*.tex')))
+    rows = benchmark(resumes, args.repeat, args.engines)
+    print(format_table(rows))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Mock LLM Server
+
+Local HTTP stand-in for the OpenRouter chat-completions and Gemini
+generateContent endpoints, with configurable latency, jitter and error-rate
+profiles. Responses are canned: keyword prompts get a JSON array and section
+prompts get the section LaTeX echoed back, so the pipeline stays valid.
+
+Run standalone:
+    python -m benchmarks.mock_llm_server --profile realistic --port 8765
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+PROFILES = {
+    # Latencies in seconds; error_rate is the fraction of calls answered with error_status
+    'instant': {'latency': 0.0, 'jitter': 0.0, 'error_rate': 0.0, 'error_status': 502},
+    'fast': {'latency': 0.05, 'jitter': 0.02, 'error_rate': 0.0, 'error_status': 502},
+    'realistic': {'latency': 1.2, 'jitter': 0.6, 'error_rate': 0.02, 'error_status': 502},
+    'flaky': {'latency': 0.8, 'jitter': 0.4, 'error_rate': 0.2, 'error_status': 429},
+    'slow': {'latency': 6.0, 'jitter': 2.0, 'error_rate': 0.05, 'error_status': 503},
+}
+
+CANNED_KEYWORDS = ["Python", "Kubernetes", "AWS", "PostgreSQL", "CI/CD", "Docker", "REST APIs", "Agile"]
+
+# The section prompts embed the LaTeX between a heading and the closing instructions
+SECTION_PATTERNS = [
+    re.compile(r'EXPERIENCE SECTION CONTENT TO MODIFY:\n(.*?)\n\nReturn ONLY', re.DOTALL),
+    re.compile(r'TECHNICAL SKILLS SECTION CONTENT TO MODIFY:\n(.*?)\n\nReturn ONLY', re.DOTALL),
+    re.compile(r'LATEX CODE TO MODIFY:\n(.*?)\n\nKEYWORDS:', re.DOTALL),
+]
+
+
+def canned_response(prompt: str) -> str:
+    """Return a plausible completion for one of the pipeline's prompts"""
+    if 'JSON array' in prompt:
+        return json.dumps(CANNED_KEYWORDS)
+    for pattern in SECTION_PATTERNS:
+        match = pattern.search(prompt)
+        if match:
+            return match.group(1)
+    return 'OK'
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """Serves OpenRouter- and Gemini-shaped responses"""
+
+    server_version = 'MockLLM/1.0'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        profile = self.server.profile
+
+        delay = max(0.0, random.gauss(profile['latency'], profile['jitter'])) if profile['jitter'] else profile['latency']
+        time.sleep(delay)
+        self.server.record_call()
+
+        if random.random() < profile['error_rate']:
+            self._send_json(profile['error_status'], {'error': {'message': 'mock upstream error'}},
+                            {'Retry-After': '1'})
+            return
+
+        if self.path.endswith('/chat/completions'):
+            prompt = body['messages'][-1]['content']
+            self._send_json(200, {'choices': [{'message': {'role': 'assistant', 'content': canned_response(prompt)}}]})
+        elif ':generateContent' in self.path:
+            prompt = body['contents'][-1]['parts'][0]['text']
+            self._send_json(200, {'candidates': [{'content': {'parts': [{'text': canned_response(prompt)}]}}]})
+        else:
+            self._send_json(404, {'error': {'message': f'unknown path {self.path}'}})
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Keep benchmark output readable
+        pass
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """Threaded mock server that can run in the background of a benchmark"""
+
+    daemon_threads = True
+    # The default backlog of 5 drops SYNs under concurrent load and skews latency by whole seconds
+    request_queue_size = 256
+
+    def __init__(self, profile: str = 'fast', host: str = '127.0.0.1', port: int = 0, **overrides):
+        super().__init__((host, port), MockLLMHandler)
+        self.profile = dict(PROFILES[profile], **overrides)
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def record_call(self):
+        with self._calls_lock:
+            self.calls += 1
+
+    def provider_env(self) -> Dict[str, str]:
+        """Environment that points OpenRouter and Gemini providers at this server"""
+        return {
+            'OPENROUTER_API_KEY': 'benchmark',
+            'OPENROUTER_BASE_URL': f'{self.base_url}/api/v1',
+            'GEMINI_API_KEY': 'benchmark',
+            'GEMINI_BASE_URL': f'{self.base_url}/v1beta/models',
+        }
+
+    def start(self) -> 'MockLLMServer':
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the mock LLM server')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='realistic')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.profile, args.host, args.port)
+    print(f"Mock LLM server ({args.profile}) on {server.base_url}")
+    for name, value in server.provider_env().items():
+        print(f"  export {name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Throughput Benchmarks
+
+Drives ResumeTailor.tailor_resume and the Flask /tailor route against the
+local mock LLM server and reports p50/p95/p99 latency, requests per second
+and CPU seconds per scenario.
+
+Usage:
+    python -m benchmarks.run_benchmarks --profile realistic --users 10 --batch-size 100
+"""
+
+import os
+import json
+import argparse
+from typing import Callable, Dict, List
+
+from .mock_llm_server import MockLLMServer, PROFILES
+from .scenarios import (
+    SAMPLE_PROJECTS, load_resume, make_postings, single_request, concurrent_users, batch, format_table
+)
+
+COMPILE_FAILURE = 'Failed to compile LaTeX resume'
+
+
+def tailor_target(resume: str) -> Callable[[str], bool]:
+    from src.resume_tailor import ResumeTailor
+
+    tailor = ResumeTailor()
+
+    def call(posting: str) -> bool:
+        result = tailor.tailor_resume(posting, resume, SAMPLE_PROJECTS)
+        return bool(result and result.get('modified_resume'))
+    return call
+
+
+def flask_target(resume: str, ignore_compile_errors: bool) -> Callable[[str], bool]:
+    from app import app
+
+    def call(posting: str) -> bool:
+        # Test clients are cheap and not shared between threads
+        response = app.test_client().post('/tailor', json={
+            'job_description': posting,
+            'latex_resume': resume,
+            'projects': SAMPLE_PROJECTS,
+        })
+        if response.status_code == 200:
+            return True
+        error = (response.get_json(silent=True) or {}).get('error')
+        return ignore_compile_errors and error == COMPILE_FAILURE
+    return call
+
+
+def run(args) -> List[Dict]:
+    server = MockLLMServer(args.profile).start()
+    os.environ.update(server.provider_env())
+    # Only the mocked providers take part
+    os.environ.pop('CEREBRAS_API_KEY', None)
+
+    resume = load_resume(args.resume)
+    postings = make_postings(max(args.batch_size, args.users * 3))
+
+    targets = {}
+    if args.target in ('tailor', 'both'):
+        targets['tailor'] = tailor_target(resume)
+    if args.target in ('flask', 'both'):
+        targets['flask'] = flask_target(resume, args.ignore_compile_errors)
+
+    rows = []
+    try:
+        for target_name, call in targets.items():
+            if args.scenario in ('single', 'all'):
+                rows.append(dict(single_request(call, postings), target=target_name))
+            if args.scenario in ('concurrent', 'all'):
+                rows.append(dict(concurrent_users(call, postings, args.users), target=target_name))
+            if args.scenario in ('batch', 'all'):
+                rows.append(dict(batch(call, postings, args.batch_size, args.concurrency), target=target_name))
+    finally:
+        server.stop()
+
+    print(f"\nProfile: {args.profile} {PROFILES[args.profile]}  (mock LLM calls: {server.calls})")
+    print(format_table(rows))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline throughput benchmarks for Resume Tailor')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='fast')
+    parser.add_argument('--target', choices=['tailor', 'flask', 'both'], default='both')
+    parser.add_argument('--scenario', choices=['single', 'concurrent', 'batch', 'all'], default='all')
+    parser.add_argument('--users', type=int, default=10, help='concurrent users for the concurrent scenario')
+    parser.add_argument('--batch-size', type=int, default=100, help='postings in the batch scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='workers for the batch scenario')
+    parser.add_argument('--resume', default='software_engineer.tex', help='resume from benchmarks/corpus')
+    parser.add_argument('--ignore-compile-errors', action='store_true',
+                        help='count /tailor compile failures as completed (e.g. when TeX is not installed)')
+    parser.add_argument('--output', help='write the results as JSON to this path')
+    args = parser.parse_args()
+
+    rows = run(args)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
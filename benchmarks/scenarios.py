@@ -0,0 +1,134 @@
+"""
+Benchmark Scenarios
+
+Scenario drivers (single request, N concurrent users, batch of postings) and
+latency/throughput/CPU summaries shared by the benchmark runners.
+"""
+
+import os
+import math
+import time
+import random
+import resource
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), 'corpus')
+
+SKILL_POOL = [
+    'Python', 'Go', 'Java', 'TypeScript', 'React', 'Kubernetes', 'Docker', 'AWS', 'GCP', 'Terraform',
+    'PostgreSQL', 'Redis', 'Kafka', 'Spark', 'Airflow', 'GraphQL', 'gRPC', 'CI/CD', 'Linux', 'Agile',
+]
+ROLES = ['Backend Engineer', 'Platform Engineer', 'Data Engineer', 'Full Stack Developer', 'Site Reliability Engineer']
+
+SAMPLE_PROJECTS = [
+    {"title": "Ledger", "technologies": "Go, SQLite", "description": "Double-entry bookkeeping CLI"},
+    {"title": "Trailcam", "technologies": "Python, OpenCV", "description": "Wildlife classifier on a Raspberry Pi"},
+    {"title": "Shortly", "technologies": "Flask, Redis, Docker", "description": "URL shortener with rate limiting"},
+]
+
+
+def load_resume(name: str = 'software_engineer.tex') -> str:
+    with open(os.path.join(CORPUS_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def make_postings(count: int, seed: int = 7) -> List[str]:
+    """Generate deterministic, varied job descriptions"""
+    rng = random.Random(seed)
+    postings = []
+    for i in range(count):
+        skills = rng.sample(SKILL_POOL, 6)
+        postings.append(
+            f"{rng.choice(ROLES)} (req #{i})\n"
+            f"- {rng.randint(2, 8)}+ years building production services in {skills[0]} or {skills[1]}\n"
+            f"- Hands-on experience with {skills[2]}, {skills[3]} and {skills[4]}\n"
+            f"- Familiarity with {skills[5]} and modern engineering practices\n"
+        )
+    return postings
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _cpu_seconds() -> float:
+    """CPU seconds of this process plus reaped children (TeX engines)"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def summarize(name: str, latencies: List[float], errors: int, wall: float, cpu: float) -> Dict:
+    ordered = sorted(latencies)
+    completed = len(ordered)
+    return {
+        'scenario': name,
+        'requests': completed + errors,
+        'errors': errors,
+        'p50': percentile(ordered, 0.50),
+        'p95': percentile(ordered, 0.95),
+        'p99': percentile(ordered, 0.99),
+        'rps': completed / wall if wall else 0.0,
+        'cpu_seconds': cpu,
+        'wall_seconds': wall,
+    }
+
+
+def run_load(name: str, call: Callable[[str], bool], postings: List[str], concurrency: int) -> Dict:
+    """Send every posting through call() using `concurrency` workers and summarize"""
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(posting: str):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            ok = call(posting)
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    cpu_start = _cpu_seconds()
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, postings))
+    wall = time.perf_counter() - wall_start
+    return summarize(name, latencies, errors, wall, _cpu_seconds() - cpu_start)
+
+
+def single_request(call: Callable[[str], bool], postings: List[str]) -> Dict:
+    return run_load('single', call, postings[:1], 1)
+
+
+def concurrent_users(call: Callable[[str], bool], postings: List[str], users: int, requests_per_user: int = 3) -> Dict:
+    total = users * requests_per_user
+    workload = (postings * (total // len(postings) + 1))[:total]
+    return run_load(f'concurrent-{users}', call, workload, users)
+
+
+def batch(call: Callable[[str], bool], postings: List[str], size: int = 100, concurrency: int = 8) -> Dict:
+    workload = (postings * (size // len(postings) + 1))[:size]
+    return run_load(f'batch-{size}', call, workload, concurrency)
+
+
+def format_table(rows: List[Dict]) -> str:
+    header = f"{'target':<8} {'scenario':<16} {'reqs':>5} {'err':>4} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'req/s':>8} {'cpu s':>8}"
+    lines = [header, '-' * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row.get('target', ''):<8} {row['scenario']:<16} {row['requests']:>5} {row['errors']:>4} "
+            f"{row['p50']:>8.3f} {row['p95']:>8.3f} {row['p99']:>8.3f} {row['rps']:>8.2f} {row['cpu_seconds']:>8.2f}"
+        )
+    return '\n'.join(lines)
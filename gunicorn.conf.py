@@ -0,0 +1,87 @@
+"""
+Gunicorn configuration for production serving
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Worker processes scale with the CPUs this process may run on, because TeX
+compiles are CPU-bound. Threads inside each worker cover the LLM calls, which
+spend most of their time waiting on the network. The app is preloaded so
+ResumeTailor is built once in the master and shared copy-on-write with the workers.
+"""
+
+import os
+import shutil
+import tempfile
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects taskset/cgroup cpusets)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# One TeX engine per CPU; override with WEB_CONCURRENCY (the Heroku/Render convention)
+workers = int(os.environ.get('WEB_CONCURRENCY', available_cpus()))
+
+# Requests mostly wait on LLM providers, so each worker serves several at once
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 8))
+
+preload_app = True
+
+
+# A tailoring request makes several LLM calls and up to a handful of compiles
+timeout = int(os.environ.get('WEB_TIMEOUT', 180))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so fragmentation from large PDFs does not build up
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+
+# The app configures its own structured logging; send gunicorn's to stderr as well
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info').lower()
+
+
+# Each worker flushes its metrics here and /metrics sums them, so a scrape covers every worker
+metrics_dir = os.environ.get('METRICS_MULTIPROC_DIR') or os.path.join(tempfile.gettempdir(), 'resume-tailor-metrics')
+
+
+def on_starting(server):
+    # Snapshots left by a previous run would be added to this one's
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def when_ready(server):
+    # Runs in the master after the app is preloaded and before workers fork
+    from app import get_resume_tailor
+    from src.resume_tailor.metrics import REGISTRY
+    get_resume_tailor()
+    # Warm-up work done in the master is counted once, here
+    REGISTRY.write_snapshot(metrics_dir)
+
+
+def post_fork(server, worker):
+    from src.resume_tailor.metrics import REGISTRY
+    # Drop the values inherited from the master; they are already in its snapshot
+    REGISTRY.reset()
+    REGISTRY.enable_multiprocess(metrics_dir)
+
+
+def worker_exit(server, worker):
+    from src.resume_tailor.metrics import REGISTRY
+    if REGISTRY.directory:
+        REGISTRY.write_snapshot()
+
+
+def child_exit(server, worker):
+    # Runs in the master; recycled workers' counts move to the archive so totals never drop
+    from src.resume_tailor.metrics import archive_process
+    archive_process(metrics_dir, worker.pid)
@@ -31,4 +31,4 @@ echo "🌐 Starting Resume Tailor application..."
 echo "📱 Access at: http://$(curl -s http://169.254.169.254/latest/meta-data/public-ipv4):5000"
 echo "🛑 Press Ctrl+C to stop"
 
-python3 app.py 
\ No newline at end of file
+python3 -m gunicorn -c gunicorn.conf.py app:app 
\ No newline at end of file
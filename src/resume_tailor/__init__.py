@@ -2,12 +2,12 @@
 Resume Tailor - AI-Powered Resume Customization
 
 A Flask application that tailors LaTeX resumes based on job descriptions using AI.
+
+The public classes are imported on first access so that importing the package
+(or a light submodule such as metrics) does not pull in the whole pipeline.
 """
 
-from .core import ResumeTailor
-from .api_providers import APIManager
-from .latex_processor import LaTeXProcessor
-from .keyword_extractor import KeywordExtractor
+import importlib
 
 __version__ = "1.0.0"
 __author__ = "Resume Tailor Team"
@@ -17,4 +17,23 @@ __all__ = [
     "APIManager", 
     "LaTeXProcessor",
     "KeywordExtractor"
-] 
\ No newline at end of file
+]
+
+_EXPORTS = {
+    "ResumeTailor": ".core",
+    "APIManager": ".api_providers",
+    "LaTeXProcessor": ".latex_processor",
+    "KeywordExtractor": ".keyword_extractor",
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,160 @@
+"""
+Admission Control Module
+
+Caps the number of tailoring jobs running at once in a worker process. Extra
+requests wait in a short bounded queue, and beyond that they are turned away
+immediately with a Retry-After hint, so the jobs already admitted keep stable
+latency under bursts. An optional per-client quota limits how many jobs one
+client can start within a sliding window.
+"""
+
+import os
+import math
+import time
+import threading
+import collections
+import logging
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional
+
+from .metrics import ADMISSION_REJECTIONS, ADMISSION_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+REASON_QUOTA = 'quota'
+REASON_QUEUE_FULL = 'queue_full'
+REASON_QUEUE_TIMEOUT = 'queue_timeout'
+
+
+class AdmissionRejected(Exception):
+    """A request was shed; status is the HTTP status to answer with"""
+
+    def __init__(self, reason: str, status: int, retry_after: int):
+        super().__init__(f"request rejected ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency cap with a bounded wait queue and optional per-client quota"""
+
+    def __init__(self, max_concurrent: Optional[int] = None, max_queue: Optional[int] = None,
+                 queue_timeout: Optional[float] = None, client_quota: Optional[int] = None,
+                 client_window: Optional[float] = None, threads: Optional[int] = None):
+        self.max_concurrent = max_concurrent if max_concurrent is not None else int(
+            os.environ.get('ADMISSION_MAX_CONCURRENT', 4)
+        )
+        # Request threads per worker (gunicorn's WEB_THREADS); a request can only wait in the
+        # queue while it holds one, so at most threads - max_concurrent can ever be queued
+        threads = threads if threads is not None else int(os.environ.get('WEB_THREADS', 8))
+        queue_capacity = max(0, threads - self.max_concurrent)
+        if max_queue is None and os.environ.get('ADMISSION_MAX_QUEUE'):
+            max_queue = int(os.environ['ADMISSION_MAX_QUEUE'])
+        if max_queue is None:
+            max_queue = queue_capacity
+        elif max_queue > queue_capacity:
+            logger.warning("ADMISSION_MAX_QUEUE=%d cannot fill with %d threads and %d job slots; using %d",
+                           max_queue, threads, self.max_concurrent, queue_capacity)
+            max_queue = queue_capacity
+        if self.enabled and self.max_concurrent >= threads:
+            logger.warning("ADMISSION_MAX_CONCURRENT=%d is not below WEB_THREADS=%d, so nothing is ever shed",
+                           self.max_concurrent, threads)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout if queue_timeout is not None else float(
+            os.environ.get('ADMISSION_QUEUE_TIMEOUT', 30)
+        )
+        # Jobs one client may start per window; 0 disables the quota
+        self.client_quota = client_quota if client_quota is not None else int(
+            os.environ.get('ADMISSION_CLIENT_QUOTA', 0)
+        )
+        self.client_window = client_window if client_window is not None else float(
+            os.environ.get('ADMISSION_CLIENT_WINDOW', 60)
+        )
+
+        self._condition = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        # Running average of job duration, used for Retry-After estimates
+        self._average_seconds = 20.0
+        self._client_starts: Dict[str, Deque[float]] = collections.defaultdict(collections.deque)
+        self._last_sweep = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrent > 0
+
+    @contextmanager
+    def admit(self, client_id: Optional[str] = None) -> Iterator[None]:
+        """Hold a job slot for the duration of the block, or raise AdmissionRejected"""
+        if not self.enabled:
+            yield
+            return
+
+        self._acquire(client_id)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - start)
+
+    def _acquire(self, client_id: Optional[str]):
+        wait_start = time.perf_counter()
+        with self._condition:
+            if client_id and self.client_quota:
+                self._check_quota(client_id, time.monotonic())
+
+            if self.active >= self.max_concurrent:
+                if self.waiting >= self.max_queue:
+                    self._reject(REASON_QUEUE_FULL, 503)
+
+                self.waiting += 1
+                try:
+                    admitted = self._condition.wait_for(lambda: self.active < self.max_concurrent,
+                                                        timeout=self.queue_timeout)
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    self._reject(REASON_QUEUE_TIMEOUT, 503)
+
+            self.active += 1
+            if client_id and self.client_quota:
+                self._client_starts[client_id].append(time.monotonic())
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - wait_start)
+
+    def _release(self, elapsed: float):
+        with self._condition:
+            self.active -= 1
+            self._average_seconds = 0.8 * self._average_seconds + 0.2 * elapsed
+            self._condition.notify()
+
+    def _check_quota(self, client_id: str, now: float):
+        if now - self._last_sweep >= self.client_window:
+            self._sweep(now)
+        starts = self._client_starts[client_id]
+        while starts and now - starts[0] >= self.client_window:
+            starts.popleft()
+        if len(starts) >= self.client_quota:
+            retry_after = max(1, math.ceil(self.client_window - (now - starts[0])))
+            ADMISSION_REJECTIONS.inc(reason=REASON_QUOTA)
+            raise AdmissionRejected(REASON_QUOTA, 429, retry_after)
+        if not starts:
+            del self._client_starts[client_id]
+
+    def _sweep(self, now: float):
+        # One-off clients never come back to prune themselves; once a window, forget every
+        # client with no start inside it, so the table is bounded by the clients seen per window
+        self._last_sweep = now
+        expired = [client_id for client_id, starts in self._client_starts.items()
+                   if not starts or now - starts[-1] >= self.client_window]
+        for client_id in expired:
+            del self._client_starts[client_id]
+
+    def _reject(self, reason: str, status: int):
+        ADMISSION_REJECTIONS.inc(reason=reason)
+        raise AdmissionRejected(reason, status, self.retry_after())
+
+    def retry_after(self) -> int:
+        """Seconds until the running jobs and the queue should have drained"""
+        backlog = self.active + self.waiting
+        return max(1, math.ceil(backlog / max(1, self.max_concurrent) * self._average_seconds))
@@ -1,92 +1,212 @@
 """
 API Providers Module
 
-Handles communication with different AI providers (OpenRouter, Cerebras, Gemini)
-with automatic fallback mechanism.
+Handles communication with different AI providers (a self-hosted OpenAI-compatible
+server, OpenRouter, Cerebras, Gemini) with automatic fallback mechanism.
 """
 
 import os
 import json
-import requests
-from typing import List, Dict, Optional
+import time
+import logging
+from typing import Callable, List, Dict, Optional
 from abc import ABC, abstractmethod
+from .metrics import LLM_CALL_SECONDS, PROVIDER_FAILURES, FALLBACKS
+from .retry import RetryPolicy, RetryableError, raise_for_transient
+from .provider_pool import build_pool
+from .singleflight import SingleFlight, flight_key
+
+logger = logging.getLogger(__name__)
+
+# Used when <PREFIX>_MODELS is not set
+LOCAL_LLM_DEFAULT_MODEL = "local"
+OPENROUTER_DEFAULT_MODEL = "qwen/qwen3-coder:free"
+CEREBRAS_DEFAULT_MODEL = "qwen-3-coder-480b"
+GEMINI_DEFAULT_MODEL = "gemini-2.0-flash-exp"
+MAX_OUTPUT_TOKENS = 2000
+# Rough prompt size estimate for context window checks
+CHARS_PER_TOKEN = 4
+
+
+def post_json(url: str, headers: Dict, data: Dict, timeout: float, stream: bool = False):
+    """POST a JSON body, raising RetryableError for failures that are safe to repeat
+    
+    Connection failures and 408/425/429/5xx gateway statuses are retryable. Read
+    timeouts are not: the model may still be generating, and a retry would pay twice.
+    """
+    # Imported on first call: requests costs ~50ms at cold start
+    import requests
+    
+    try:
+        response = requests.post(url, headers=headers, json=data, timeout=timeout, stream=stream)
+    except requests.exceptions.ConnectionError as e:
+        raise RetryableError(f"Connection failed: {e}") from e
+    raise_for_transient(response.status_code, response.headers, url.split('?', 1)[0])
+    response.raise_for_status()
+    return response
+
+
+def read_event_stream(response) -> str:
+    """Join the content deltas of an OpenAI-style server-sent event stream"""
+    parts = []
+    try:
+        for raw in response.iter_lines():
+            line = raw.decode('utf-8')
+            if not line.startswith('data:'):
+                continue
+            payload = line[5:].strip()
+            if payload == '[DONE]':
+                break
+            choices = json.loads(payload).get('choices') or []
+            if choices:
+                parts.append(choices[0].get('delta', {}).get('content') or '')
+    finally:
+        response.close()
+    return ''.join(parts)
 
 
 class APIProvider(ABC):
     """Abstract base class for API providers"""
     
     @abstractmethod
-    def call_api(self, messages: List[Dict], temperature: float = 0.3) -> Optional[str]:
-        """Call the API and return the response content"""
+    def call_api(self, messages: List[Dict], temperature: float = 0.3, json_mode: bool = False) -> Optional[str]:
+        """Call the API and return the response content; json_mode asks for a JSON object where supported"""
         pass
     
     @abstractmethod
     def is_available(self) -> bool:
         """Check if the API provider is available"""
         pass
+    
+    def _note_failure(self, error: Exception):
+        """Tell the owning pool when the vendor rate-limited this key"""
+        on_throttle = getattr(self, 'on_throttle', None)
+        if on_throttle and isinstance(error, RetryableError) and error.reason == '429':
+            on_throttle(error.retry_after)
 
 
-class OpenRouterProvider(APIProvider):
-    """OpenRouter API provider"""
+class OpenAICompatibleProvider(APIProvider):
+    """Any server speaking the OpenAI chat completions API
     
-    def __init__(self):
-        self.api_key = os.getenv('OPENROUTER_API_KEY')
-        self.base_url = "https://openrouter.ai/api/v1"
-        self.model = "qwen/qwen3-coder:free"
+    By default this is a self-hosted server (llama.cpp server, vLLM, Ollama) at
+    LOCAL_LLM_BASE_URL. Capability flags describe what the server supports:
+    <PREFIX>_STREAMING, <PREFIX>_JSON_MODE and <PREFIX>_MAX_CONTEXT (in tokens).
+    """
+    
+    PREFIX = 'LOCAL_LLM'
+    LABEL = 'Local LLM'
+    DEFAULT_BASE_URL = None
+    DEFAULT_MODEL = LOCAL_LLM_DEFAULT_MODEL
+    # Local servers usually accept any key, or none
+    REQUIRES_KEY = False
+    
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None,
+                 on_throttle: Optional[Callable[[Optional[float]], None]] = None,
+                 base_url: Optional[str] = None):
+        prefix = self.PREFIX
+        self.api_key = api_key or os.getenv(f'{prefix}_API_KEY')
+        self.base_url = (base_url or os.getenv(f'{prefix}_BASE_URL') or self.DEFAULT_BASE_URL or '').rstrip('/')
+        self.model = model or self.DEFAULT_MODEL
+        self.on_throttle = on_throttle
+        self.streaming = os.getenv(f'{prefix}_STREAMING', '0') == '1'
+        self.json_mode = os.getenv(f'{prefix}_JSON_MODE', '0') == '1'
+        self.max_context = int(os.getenv(f'{prefix}_MAX_CONTEXT', 0))
+        self.retry_policy = RetryPolicy.from_env(prefix)
         
     def is_available(self) -> bool:
-        return bool(self.api_key)
+        if self.REQUIRES_KEY and not self.api_key:
+            return False
+        return bool(self.base_url)
+    
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+    
+    def fits_context(self, messages: List[Dict]) -> bool:
+        """Whether the prompt plus the completion budget fits the server's context window"""
+        if not self.max_context:
+            return True
+        prompt_tokens = sum(len(msg['content']) for msg in messages) // CHARS_PER_TOKEN
+        return prompt_tokens + MAX_OUTPUT_TOKENS <= self.max_context
     
-    def call_api(self, messages: List[Dict], temperature: float = 0.3) -> Optional[str]:
+    def call_api(self, messages: List[Dict], temperature: float = 0.3, json_mode: bool = False) -> Optional[str]:
         if not self.is_available():
             return None
+        if not self.fits_context(messages):
+            logger.warning("%s: prompt does not fit the %d-token context window, skipping",
+                           self.LABEL, self.max_context)
+            return None
             
         data = {
             "model": self.model,
             "messages": messages,
             "temperature": temperature,
-            "max_tokens": 2000
-        }
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://resume-tailor-app.com",
-            "X-Title": "Resume Tailor"
+            "max_tokens": MAX_OUTPUT_TOKENS
         }
+        # JSON mode is only requested from servers that declare it
+        if json_mode and self.json_mode:
+            data["response_format"] = {"type": "json_object"}
+        if self.streaming:
+            data["stream"] = True
         
         try:
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=30
+            response = self.retry_policy.call(
+                self.LABEL, post_json, f"{self.base_url}/chat/completions", self._headers(), data,
+                stream=self.streaming
             )
-            response.raise_for_status()
+            if self.streaming:
+                return read_event_stream(response)
             return response.json()["choices"][0]["message"]["content"]
         except Exception as e:
-            print(f"Error calling OpenRouter API: {e}")
+            logger.warning("Error calling %s API: %s", self.LABEL, e)
+            self._note_failure(e)
             return None
 
 
+class OpenRouterProvider(OpenAICompatibleProvider):
+    """OpenRouter API provider"""
+    
+    PREFIX = 'OPENROUTER'
+    LABEL = 'OpenRouter'
+    DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+    DEFAULT_MODEL = OPENROUTER_DEFAULT_MODEL
+    REQUIRES_KEY = True
+    
+    def _headers(self) -> Dict[str, str]:
+        headers = super()._headers()
+        headers.update({
+            "HTTP-Referer": "https://resume-tailor-app.com",
+            "X-Title": "Resume Tailor"
+        })
+        return headers
+
+
 class CerebrasProvider(APIProvider):
     """Cerebras API provider"""
     
-    def __init__(self):
-        self.api_key = os.getenv('CEREBRAS_API_KEY')
-        self.model = "qwen-3-coder-480b"
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None,
+                 on_throttle: Optional[Callable[[Optional[float]], None]] = None):
+        self.api_key = api_key or os.getenv('CEREBRAS_API_KEY')
+        self.model = model or CEREBRAS_DEFAULT_MODEL
+        self.on_throttle = on_throttle
+        self.retry_policy = RetryPolicy.from_env('CEREBRAS')
+        # The SDK and its HTTP client are created on first use
+        self._client = None
         
     def is_available(self) -> bool:
         return bool(self.api_key)
     
-    def call_api(self, messages: List[Dict], temperature: float = 0.3) -> Optional[str]:
+    def call_api(self, messages: List[Dict], temperature: float = 0.3, json_mode: bool = False) -> Optional[str]:
         if not self.is_available():
             return None
             
         try:
-            from cerebras.cloud.sdk import Cerebras
-            
-            client = Cerebras(api_key=self.api_key)
+            if self._client is None:
+                from cerebras.cloud.sdk import Cerebras
+                # Retries are handled by our policy, not the SDK's own
+                self._client = Cerebras(api_key=self.api_key, max_retries=0)
             
             # Convert messages to the format expected by Cerebras
             cerebras_messages = []
@@ -102,37 +222,55 @@ class CerebrasProvider(APIProvider):
                         "content": msg['content']
                     })
             
-            response = client.chat.completions.create(
-                messages=cerebras_messages,
-                model=self.model,
-                stream=False,
-                max_completion_tokens=2000,
-                temperature=temperature,
-                top_p=0.8
-            )
-            
+            response = self.retry_policy.call('Cerebras', self._create, cerebras_messages, temperature)
             return response.choices[0].message.content
             
         except ImportError:
-            print("Cerebras SDK not installed. Install with: pip install cerebras-cloud-sdk")
+            logger.warning("Cerebras SDK not installed. Install with: pip install cerebras-cloud-sdk")
             return None
         except Exception as e:
-            print(f"Error calling Cerebras API: {e}")
+            logger.warning("Error calling Cerebras API: %s", e)
+            self._note_failure(e)
             return None
+    
+    def _create(self, messages: List[Dict], temperature: float, timeout: float):
+        from cerebras.cloud.sdk import APIConnectionError, APIStatusError, APITimeoutError
+        
+        try:
+            return self._client.chat.completions.create(
+                messages=messages,
+                model=self.model,
+                stream=False,
+                max_completion_tokens=MAX_OUTPUT_TOKENS,
+                temperature=temperature,
+                top_p=0.8,
+                timeout=timeout
+            )
+        except APITimeoutError:
+            # The request may still be generating server-side; let the next provider take it
+            raise
+        except APIConnectionError as e:
+            raise RetryableError(f"Cerebras connection failed: {e}") from e
+        except APIStatusError as e:
+            raise_for_transient(e.status_code, e.response.headers, 'Cerebras')
+            raise
 
 
 class GeminiProvider(APIProvider):
     """Gemini API provider"""
     
-    def __init__(self):
-        self.api_key = os.getenv('GEMINI_API_KEY')
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models"
-        self.model = "gemini-2.0-flash-exp"
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None,
+                 on_throttle: Optional[Callable[[Optional[float]], None]] = None):
+        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        self.base_url = os.getenv('GEMINI_BASE_URL', "https://generativelanguage.googleapis.com/v1beta/models")
+        self.model = model or GEMINI_DEFAULT_MODEL
+        self.on_throttle = on_throttle
+        self.retry_policy = RetryPolicy.from_env('GEMINI')
         
     def is_available(self) -> bool:
         return bool(self.api_key)
     
-    def call_api(self, messages: List[Dict], temperature: float = 0.3) -> Optional[str]:
+    def call_api(self, messages: List[Dict], temperature: float = 0.3, json_mode: bool = False) -> Optional[str]:
         if not self.is_available():
             return None
             
@@ -154,23 +292,22 @@ class GeminiProvider(APIProvider):
             "contents": gemini_messages,
             "generationConfig": {
                 "temperature": temperature,
-                "maxOutputTokens": 2000
+                "maxOutputTokens": MAX_OUTPUT_TOKENS
             }
         }
+        if json_mode:
+            data["generationConfig"]["responseMimeType"] = "application/json"
         
         headers = {"Content-Type": "application/json"}
         
         try:
-            response = requests.post(
-                f"{self.base_url}/{self.model}:generateContent?key={self.api_key}",
-                headers=headers,
-                json=data,
-                timeout=30
+            response = self.retry_policy.call(
+                'Gemini', post_json, f"{self.base_url}/{self.model}:generateContent?key={self.api_key}", headers, data
             )
-            response.raise_for_status()
             return response.json()["candidates"][0]["content"]["parts"][0]["text"]
         except Exception as e:
-            print(f"Error calling Gemini API: {e}")
+            logger.warning("Error calling Gemini API: %s", e)
+            self._note_failure(e)
             return None
 
 
@@ -178,27 +315,48 @@ class APIManager:
     """Manages multiple API providers with fallback logic"""
     
     def __init__(self):
+        # One pool per vendor, tried in this order; each pool spreads calls over its keys and models.
+        # A self-hosted server, when configured, takes the hot path ahead of the rate-limited SaaS APIs.
         self.providers = [
-            OpenRouterProvider(),
-            CerebrasProvider(),
-            GeminiProvider()
+            build_pool('OpenAICompatibleProvider', 'LOCAL_LLM', OpenAICompatibleProvider, LOCAL_LLM_DEFAULT_MODEL),
+            build_pool('OpenRouterProvider', 'OPENROUTER', OpenRouterProvider, OPENROUTER_DEFAULT_MODEL),
+            build_pool('CerebrasProvider', 'CEREBRAS', CerebrasProvider, CEREBRAS_DEFAULT_MODEL),
+            build_pool('GeminiProvider', 'GEMINI', GeminiProvider, GEMINI_DEFAULT_MODEL)
         ]
+        # Identical prompts issued at the same moment share one provider call
+        self._inflight = SingleFlight('llm')
     
-    def call_with_fallback(self, messages: List[Dict], temperature: float = 0.3) -> Optional[str]:
-        """Call API with fallback to different providers"""
+    def call_with_fallback(self, messages: List[Dict], temperature: float = 0.3,
+                           stage: str = 'other', json_mode: bool = False) -> Optional[str]:
+        """Call API with fallback to different providers; stage labels the latency metrics
         
+        json_mode asks providers that support it to return a single JSON object.
+        """
+        key = flight_key(messages, temperature, json_mode)
+        return self._inflight.do(key, self._call_providers, messages, temperature, stage, json_mode)
+    
+    def _call_providers(self, messages: List[Dict], temperature: float, stage: str,
+                        json_mode: bool = False) -> Optional[str]:
+        attempted = 0
         for provider in self.providers:
             if provider.is_available():
+                name = provider.name
+                if attempted:
+                    FALLBACKS.inc(kind='provider')
+                attempted += 1
+                start_time = time.perf_counter()
                 try:
-                    result = provider.call_api(messages, temperature)
+                    result = provider.call_api(messages, temperature, stage=stage, json_mode=json_mode)
                     if result:
                         return result
                 except Exception as e:
-                    print(f"{provider.__class__.__name__} failed: {e}")
-                    continue
+                    logger.warning("%s failed: %s", name, e)
+                finally:
+                    LLM_CALL_SECONDS.observe(time.perf_counter() - start_time, provider=name, stage=stage)
+                PROVIDER_FAILURES.inc(provider=name)
         
         # All APIs failed
-        print("All API providers failed. You may have exceeded daily request limits.")
+        logger.error("All API providers failed. You may have exceeded daily request limits.")
         return None
     
     def has_any_provider(self) -> bool:
@@ -0,0 +1,289 @@
+"""
+Compile Runner Module
+
+Runs TeX engines in a sandboxed subprocess with a wall-clock timeout, CPU and
+memory limits, and process-group cleanup so a stuck compile cannot hold a
+worker indefinitely. Also manages the RAM-backed workspaces compiles run in.
+"""
+
+import os
+import re
+import atexit
+import hashlib
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+STATUS_TIMEOUT = 'timeout'
+STATUS_OOM = 'oom'
+STATUS_NOT_FOUND = 'not_found'
+
+# Outcomes after which retrying with another engine is pointless
+FATAL_STATUSES = (STATUS_TIMEOUT, STATUS_OOM, STATUS_NOT_FOUND)
+
+# Published PDFs are named after their content, so concurrent requests never share a file
+ARTIFACT_PREFIX = 'tailored_'
+ARTIFACT_NAME_PATTERN = re.compile(r'^tailored_([0-9a-f]{32})\.pdf$')
+# Seconds between sweeps of expired artifacts
+PRUNE_INTERVAL = 60.0
+
+OOM_MARKERS = ('out of memory', 'not enough memory', 'cannot allocate memory', 'memory exhausted', 'memoryerror')
+
+
+class CompileResult:
+    """Structured outcome of a single engine run"""
+
+    def __init__(self, status: str, returncode: Optional[int] = None, stdout: str = '',
+                 stderr: str = '', elapsed: float = 0.0):
+        self.status = status
+        self.returncode = returncode
+        self.stdout = stdout or ''
+        self.stderr = stderr or ''
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+    @property
+    def fatal(self) -> bool:
+        return self.status in FATAL_STATUSES
+
+    def to_dict(self) -> Dict:
+        return {
+            'status': self.status,
+            'returncode': self.returncode,
+            'elapsed': round(self.elapsed, 3)
+        }
+
+    def __repr__(self) -> str:
+        return f"CompileResult(status={self.status!r}, returncode={self.returncode}, elapsed={self.elapsed:.2f})"
+
+
+class CompileRunner:
+    """Runs TeX commands with a timeout, rlimits and no shell escape"""
+
+    def __init__(self, timeout: Optional[float] = None, cpu_limit: Optional[int] = None,
+                 memory_limit_mb: Optional[int] = None):
+        self.timeout = timeout if timeout is not None else float(os.environ.get('COMPILE_TIMEOUT', 30))
+        self.cpu_limit = cpu_limit if cpu_limit is not None else int(
+            os.environ.get('COMPILE_CPU_LIMIT', max(int(self.timeout), 1))
+        )
+        self.memory_limit_mb = memory_limit_mb if memory_limit_mb is not None else int(
+            os.environ.get('COMPILE_MEMORY_LIMIT_MB', 1024)
+        )
+
+    def run(self, command: List[str], cwd: str, env: Optional[Dict[str, str]] = None) -> CompileResult:
+        """Run command in its own process group and classify the outcome"""
+        start_time = time.perf_counter()
+        try:
+            process = subprocess.Popen(
+                command,
+                cwd=cwd,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                errors='replace',
+                start_new_session=True,
+                preexec_fn=self._limit_child if resource is not None else None
+            )
+        except FileNotFoundError:
+            return CompileResult(STATUS_NOT_FOUND, stderr=f"{command[0]} not found")
+
+        killed = False
+        try:
+            stdout, stderr = process.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            self._kill_group(process)
+            killed = True
+            stdout, stderr = process.communicate()
+            logger.warning("%s timed out after %.1fs", command[0], self.timeout)
+
+        elapsed = time.perf_counter() - start_time
+        status = self._classify(process.returncode, stdout, stderr, killed, elapsed)
+        return CompileResult(status, process.returncode, stdout, stderr, elapsed)
+
+    def _limit_child(self):
+        """Set CPU and address-space limits in the child, before it execs TeX"""
+        # Runs between fork and exec, so the engine is never unlimited. Only setrlimit
+        # calls happen here, which is safe even though the parent is multi-threaded.
+        if self.cpu_limit:
+            resource.setrlimit(resource.RLIMIT_CPU, (self.cpu_limit, self.cpu_limit + 1))
+        if self.memory_limit_mb:
+            limit = self.memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    def _kill_group(self, process: subprocess.Popen):
+        """Kill the whole process group so no TeX helper survives the overrun"""
+        try:
+            if hasattr(os, 'killpg'):
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def _classify(self, returncode: int, stdout: str, stderr: str, killed: bool = False,
+                  elapsed: float = 0.0) -> str:
+        if killed:
+            # The runner itself sent the SIGKILL when the wall-clock timeout expired
+            return STATUS_TIMEOUT
+        if returncode == 0:
+            return STATUS_OK
+        if hasattr(signal, 'SIGXCPU') and returncode == -signal.SIGXCPU:
+            return STATUS_TIMEOUT
+        if hasattr(signal, 'SIGKILL') and returncode == -signal.SIGKILL:
+            # The kernel kills at the hard RLIMIT_CPU once SIGXCPU was ignored; otherwise
+            # a SIGKILL from outside is almost always the OOM killer
+            if self.cpu_limit and elapsed >= self.cpu_limit:
+                return STATUS_TIMEOUT
+            return STATUS_OOM
+        output = f"{stdout[-2000:]}\n{stderr[-2000:]}".lower()
+        if any(marker in output for marker in OOM_MARKERS):
+            return STATUS_OOM
+        return STATUS_ERROR
+
+
+def default_workspace_root() -> str:
+    """Return COMPILE_WORKSPACE_DIR, else /dev/shm when writable, else the system temp dir"""
+    configured = os.environ.get('COMPILE_WORKSPACE_DIR')
+    if configured:
+        os.makedirs(configured, exist_ok=True)
+        return configured
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+
+class WorkspacePool:
+    """Hands out per-worker compile directories that are reused across jobs"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or default_workspace_root()
+        self._local = threading.local()
+        self._created = set()
+        self._created_lock = threading.Lock()
+        atexit.register(self.cleanup)
+
+    @contextmanager
+    def acquire(self) -> Iterator[str]:
+        """Yield this thread's workspace, emptied before and after the job"""
+        directory = self._directory()
+        self._clear(directory)
+        try:
+            yield directory
+        finally:
+            # Empty the workspace so finished jobs do not hold tmpfs memory
+            self._clear(directory)
+
+    def cleanup(self):
+        """Remove every workspace created by this process"""
+        with self._created_lock:
+            directories, self._created = self._created, set()
+        for directory in directories:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def _directory(self) -> str:
+        pid = os.getpid()
+        owner = getattr(self._local, 'owner', None)
+        directory = getattr(self._local, 'directory', None)
+        # A forked worker must not share its parent's directory
+        if owner != pid or directory is None or not os.path.isdir(directory):
+            directory = tempfile.mkdtemp(prefix=f'resume-tailor-{pid}-', dir=self.root)
+            self._local.owner = pid
+            self._local.directory = directory
+            with self._created_lock:
+                self._created.add(directory)
+        return directory
+
+    def _clear(self, directory: str):
+        for entry in os.scandir(directory):
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+def publish_artifact(source: str, destination: str):
+    """
+    Move a finished file into the artifact store.
+
+    Uses an atomic rename when both paths share a filesystem; across
+    filesystems (e.g. /dev/shm to disk) the file is copied to a temporary
+    name next to the destination and then renamed, so readers never see a
+    partial file.
+    """
+    os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+    try:
+        os.replace(source, destination)
+        return
+    except OSError:
+        pass
+
+    staging = f"{destination}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.copyfile(source, staging)
+    os.replace(staging, destination)
+    os.unlink(source)
+
+
+def artifact_name(path: str) -> str:
+    """Download name for a finished PDF, derived from a hash of its content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return f'{ARTIFACT_PREFIX}{digest.hexdigest()[:32]}.pdf'
+
+
+_last_prune = 0.0
+_prune_lock = threading.Lock()
+
+
+def prune_artifacts(directory: str, max_age: Optional[float] = None, force: bool = False) -> int:
+    """Delete published PDFs older than max_age (ARTIFACT_MAX_AGE), at most once per PRUNE_INTERVAL"""
+    global _last_prune
+    if max_age is None:
+        max_age = float(os.environ.get('ARTIFACT_MAX_AGE', 3600))
+    now = time.time()
+    with _prune_lock:
+        if not force and now - _last_prune < PRUNE_INTERVAL:
+            return 0
+        _last_prune = now
+
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if not ARTIFACT_NAME_PATTERN.match(entry.name):
+            continue
+        try:
+            if now - entry.stat().st_mtime > max_age:
+                os.unlink(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    if removed:
+        logger.info("🧹 Removed %d expired artifact(s) from %s", removed, directory)
+    return removed
@@ -0,0 +1,328 @@
+"""
+Compile Service Module
+
+A local compile daemon that runs TeX for the web workers over a Unix socket.
+The compile tier can then be sized, and placed, independently of request
+handling. Jobs wait in a bounded priority queue, and when it is full the
+daemon answers straight away with a queue-full error instead of letting work
+pile up. Jobs whose client has hung up, or whose client timeout has passed
+while they waited, are dropped rather than compiled for nobody.
+
+    python -m src.resume_tailor.compile_service --socket /run/resume-tailor/compile.sock
+
+Finished PDFs are published to TEMP_DIR as usual. Point the web tier and the
+daemon at the same TEMP_DIR, for example a shared volume.
+"""
+
+import os
+import json
+import math
+import queue
+import socket
+import select
+import struct
+import argparse
+import itertools
+import threading
+import socketserver
+import time
+import logging
+from typing import Dict, Optional
+
+from .metrics import REGISTRY, COMPILE_QUEUE_REJECTIONS, COMPILE_QUEUE_WAIT_SECONDS, COMPILE_JOBS_ABANDONED
+
+logger = logging.getLogger(__name__)
+
+# Lower numbers are served first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+# compile: full PDF; probe: draft-mode layout measurement only
+MODE_COMPILE = 'compile'
+MODE_PROBE = 'probe'
+MODES = (MODE_COMPILE, MODE_PROBE)
+
+DEFAULT_SOCKET = os.path.join(os.environ.get('TEMP_DIR', 'temp'), 'compile.sock')
+
+# Messages are a 4-byte big-endian length followed by UTF-8 JSON
+HEADER = struct.Struct('!I')
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+# How often a handler checks whether its waiting client has hung up
+CLIENT_POLL_SECONDS = 0.5
+# Seconds a web worker waits for a result; below the default WEB_TIMEOUT of 180
+DEFAULT_CLIENT_TIMEOUT = 150
+
+
+class CompileServiceError(Exception):
+    """The compile service failed, timed out or broke off while answering"""
+
+
+class CompileServiceUnavailable(CompileServiceError):
+    """Nothing accepted the connection, so the job never reached the service and can run elsewhere"""
+
+
+class CompileQueueFull(Exception):
+    """The compile service rejected a job because its queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"compile queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 65536))
+        if not chunk:
+            raise ConnectionError('connection closed mid-message')
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def send_message(sock: socket.socket, payload: Dict):
+    data = json.dumps(payload).encode('utf-8')
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def peer_closed(sock: socket.socket) -> bool:
+    """True once the other end has hung up; clients send nothing after their request"""
+    readable, _, _ = select.select([sock], [], [], 0)
+    if not readable:
+        return False
+    try:
+        return sock.recv(1, socket.MSG_PEEK) == b''
+    except OSError:
+        return True
+
+
+def recv_message(sock: socket.socket) -> Dict:
+    (length,) = HEADER.unpack(_recv_exactly(sock, HEADER.size))
+    if length > MAX_MESSAGE_BYTES:
+        raise ValueError(f"message of {length} bytes exceeds {MAX_MESSAGE_BYTES}")
+    return json.loads(_recv_exactly(sock, length).decode('utf-8'))
+
+
+class _Job:
+    """One queued compile and the slot its result is delivered through"""
+
+    __slots__ = ('latex', 'priority', 'mode', 'enqueued', 'expires', 'cancelled', 'done', 'result', 'error')
+
+    def __init__(self, latex: str, priority: int, mode: str = MODE_COMPILE, timeout: Optional[float] = None):
+        self.latex = latex
+        self.priority = priority
+        self.mode = mode
+        self.enqueued = time.perf_counter()
+        # The client stops waiting after timeout seconds; a job still queued by then is dropped
+        self.expires = self.enqueued + timeout if timeout else None
+        self.cancelled = False
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def abandoned(self) -> bool:
+        return self.cancelled or (self.expires is not None and time.perf_counter() > self.expires)
+
+
+def _job_arguments(request) -> tuple:
+    """(latex, priority, mode, timeout) from a request message, or ValueError naming the bad field"""
+    if not isinstance(request, dict):
+        raise ValueError('request must be a JSON object')
+    latex = request.get('latex')
+    if not isinstance(latex, str):
+        raise ValueError('latex must be a string')
+    priority = request.get('priority', PRIORITY_NORMAL)
+    if isinstance(priority, bool) or not isinstance(priority, int):
+        raise ValueError('priority must be an integer')
+    timeout = request.get('timeout')
+    if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float))):
+        raise ValueError('timeout must be a number')
+    return latex, priority, request.get('mode', MODE_COMPILE), timeout
+
+
+class _CompileRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        service = self.server.service
+        try:
+            request = recv_message(self.request)
+        except (ConnectionError, ValueError) as exc:
+            logger.warning("Rejected malformed compile request: %s", exc)
+            return
+
+        try:
+            job = service.submit(*_job_arguments(request))
+        except CompileQueueFull as exc:
+            send_message(self.request, {'status': 'queue_full', 'retry_after': exc.retry_after})
+            return
+        except ValueError as exc:
+            send_message(self.request, {'status': 'error', 'message': str(exc)})
+            return
+
+        while not job.done.wait(CLIENT_POLL_SECONDS):
+            if peer_closed(self.request):
+                # A job already running finishes; one still queued is skipped
+                job.cancelled = True
+                logger.info("Client hung up, dropping its %s job", job.mode)
+                return
+        if job.error:
+            send_message(self.request, {'status': 'error', 'message': job.error})
+        else:
+            send_message(self.request, {'status': 'ok', 'result': job.result})
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class CompileService:
+    """Bounded priority queue of compile jobs drained by a fixed set of workers"""
+
+    def __init__(self, processor, socket_path: Optional[str] = None, workers: Optional[int] = None,
+                 queue_size: Optional[int] = None):
+        # processor only needs compile_locally(latex) and probe_locally(latex) -> Optional[Dict]
+        self.processor = processor
+        self.socket_path = socket_path or os.environ.get('COMPILE_SERVICE_SOCKET', DEFAULT_SOCKET)
+        self.workers = workers or int(os.environ.get('COMPILE_SERVICE_WORKERS', os.cpu_count() or 1))
+        self.queue_size = queue_size or int(os.environ.get('COMPILE_SERVICE_QUEUE_SIZE', 32))
+        self._queue = queue.PriorityQueue(maxsize=self.queue_size)
+        # Keeps jobs of equal priority in arrival order
+        self._sequence = itertools.count()
+        # Running average of compile time, used for Retry-After estimates
+        self._average_seconds = 2.0
+        self._server = None
+        self._threads = []
+
+    def submit(self, latex: str, priority: int = PRIORITY_NORMAL, mode: str = MODE_COMPILE,
+               timeout: Optional[float] = None) -> _Job:
+        if mode not in MODES:
+            raise ValueError(f"unknown compile mode: {mode}")
+        job = _Job(latex, priority, mode, timeout)
+        try:
+            self._queue.put_nowait((priority, next(self._sequence), job))
+        except queue.Full:
+            COMPILE_QUEUE_REJECTIONS.inc()
+            raise CompileQueueFull(self.retry_after())
+        return job
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained"""
+        return max(1, math.ceil(self._queue.qsize() / self.workers * self._average_seconds))
+
+    def _work(self):
+        while True:
+            _, _, job = self._queue.get()
+            COMPILE_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - job.enqueued, priority=job.priority)
+            if job.abandoned():
+                COMPILE_JOBS_ABANDONED.inc(mode=job.mode)
+                job.error = 'abandoned by client'
+                job.done.set()
+                self._queue.task_done()
+                continue
+            start = time.perf_counter()
+            try:
+                if job.mode == MODE_PROBE:
+                    job.result = self.processor.probe_locally(job.latex)
+                else:
+                    job.result = self.processor.compile_locally(job.latex)
+            except Exception as exc:
+                logger.exception("Compile job failed")
+                job.error = str(exc)
+            finally:
+                self._average_seconds = 0.8 * self._average_seconds + 0.2 * (time.perf_counter() - start)
+                job.done.set()
+                self._queue.task_done()
+
+    def start(self) -> 'CompileService':
+        """Start the workers and accept connections on a background thread"""
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or '.', exist_ok=True)
+        self._server = _UnixServer(self.socket_path, _CompileRequestHandler)
+        self._server.service = self
+        # Web workers usually run as another user in the same group
+        os.chmod(self.socket_path, 0o660)
+
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info("Compile service listening on %s (workers=%d, queue=%d)",
+                    self.socket_path, self.workers, self.queue_size)
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class CompileClient:
+    """Submits compiles to a CompileService and waits for the result"""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        self.socket_path = socket_path
+        # Must stay under gunicorn's WEB_TIMEOUT, or the web worker is killed before it can answer
+        self.timeout = timeout or float(os.environ.get('COMPILE_SERVICE_TIMEOUT', DEFAULT_CLIENT_TIMEOUT))
+
+    def compile(self, latex_content: str, priority: int = PRIORITY_NORMAL) -> Optional[Dict]:
+        return self._request(latex_content, priority, MODE_COMPILE)
+
+    def probe(self, latex_content: str, priority: int = PRIORITY_NORMAL) -> Optional[Dict]:
+        """Draft-mode layout probe: page count and overflow, no PDF"""
+        return self._request(latex_content, priority, MODE_PROBE)
+
+    def _request(self, latex_content: str, priority: int, mode: str) -> Optional[Dict]:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError as exc:
+                raise CompileServiceUnavailable(f"{self.socket_path}: {exc}") from exc
+            # Past this point the service owns the job; a timeout must not be retried elsewhere
+            try:
+                send_message(sock, {'latex': latex_content, 'priority': priority, 'mode': mode,
+                                    'timeout': self.timeout})
+                response = recv_message(sock)
+            except (OSError, ValueError) as exc:
+                raise CompileServiceError(f"{self.socket_path}: {exc}") from exc
+
+        if response['status'] == 'queue_full':
+            raise CompileQueueFull(response['retry_after'])
+        if response['status'] != 'ok':
+            raise CompileServiceError(response.get('message', 'unknown error'))
+        return response['result']
+
+
+def main():
+    from .api_providers import APIManager, GeminiProvider
+    from .latex_processor import LaTeXProcessor
+    from .logging_config import configure_logging
+
+    parser = argparse.ArgumentParser(description='Run the Resume Tailor compile service')
+    parser.add_argument('--socket', help='Unix socket path (default: COMPILE_SERVICE_SOCKET or TEMP_DIR/compile.sock)')
+    parser.add_argument('--workers', type=int, help='concurrent TeX compiles (default: CPU count)')
+    parser.add_argument('--queue-size', type=int, help='jobs allowed to wait before rejecting (default: 32)')
+    args = parser.parse_args()
+
+    configure_logging()
+    if os.environ.get('METRICS_MULTIPROC_DIR'):
+        # Compile metrics then show up in the web tier's /metrics on the same host
+        REGISTRY.enable_multiprocess(os.environ['METRICS_MULTIPROC_DIR'])
+    processor = LaTeXProcessor(APIManager(), GeminiProvider())
+    service = CompileService(processor, args.socket, args.workers, args.queue_size).start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        service.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,23 +4,79 @@ Core Resume Tailor Module
 Main orchestrator that coordinates all components for resume tailoring.
 """
 
-from typing import List, Dict, Optional
+import os
+import threading
+from typing import Any, Callable, List, Dict, Optional
 from .api_providers import APIManager, GeminiProvider
 from .keyword_extractor import KeywordExtractor
 from .latex_processor import LaTeXProcessor
 from .section_modifiers import ThreadedSectionModifier
+from .page_fit import PageFitOptimizer
+from .singleflight import SingleFlight, flight_key
+from .document import ResumeDocument
+from .template_store import TemplateStore, ResumeTemplate, TemplateNotFound
+from .similarity_index import SimilarityIndex
 
 
 class ResumeTailor:
     """Main class that orchestrates resume tailoring process"""
     
     def __init__(self):
-        """Initialize all components"""
-        self.api_manager = APIManager()
-        self.gemini_provider = GeminiProvider()
-        self.keyword_extractor = KeywordExtractor(self.api_manager)
-        self.latex_processor = LaTeXProcessor(self.api_manager, self.gemini_provider)
-        self.section_modifier = ThreadedSectionModifier(self.api_manager)
+        """Initialize settings; components are built on first use"""
+        self.page_fit_enabled = os.environ.get('PAGE_FIT_ENABLED', '1') != '0'
+        # Reuse tailored sections for a near-duplicate posting against the same resume and projects
+        self.reuse_sections = os.environ.get('SIMILARITY_REUSE_SECTIONS', '0') == '1'
+        # Double-clicks and duplicate tabs share one pipeline run
+        self._inflight = SingleFlight('tailor')
+        self._components: Dict[str, Any] = {}
+        # Reentrant: building one component may build the ones it depends on
+        self._components_lock = threading.RLock()
+    
+    def _component(self, name: str, factory: Callable[[], Any]) -> Any:
+        component = self._components.get(name)
+        if component is None:
+            with self._components_lock:
+                component = self._components.get(name)
+                if component is None:
+                    component = self._components[name] = factory()
+        return component
+    
+    @property
+    def api_manager(self) -> APIManager:
+        return self._component('api_manager', APIManager)
+    
+    @property
+    def gemini_provider(self) -> GeminiProvider:
+        return self._component('gemini_provider', GeminiProvider)
+    
+    @property
+    def similarity_index(self) -> SimilarityIndex:
+        return self._component('similarity_index', SimilarityIndex)
+    
+    @property
+    def keyword_extractor(self) -> KeywordExtractor:
+        return self._component('keyword_extractor', lambda: KeywordExtractor(self.api_manager, self.similarity_index))
+    
+    @property
+    def latex_processor(self) -> LaTeXProcessor:
+        return self._component('latex_processor', lambda: LaTeXProcessor(self.api_manager, self.gemini_provider))
+    
+    @property
+    def section_modifier(self) -> ThreadedSectionModifier:
+        return self._component('section_modifier', lambda: ThreadedSectionModifier(self.api_manager))
+    
+    @property
+    def page_fit_optimizer(self) -> PageFitOptimizer:
+        return self._component('page_fit_optimizer', lambda: PageFitOptimizer(self.latex_processor))
+    
+    @property
+    def template_store(self) -> TemplateStore:
+        return self._component('template_store', TemplateStore)
+    
+    def warm_up(self):
+        """Build every component now, e.g. in a preloading master before forking"""
+        for name in ('keyword_extractor', 'section_modifier', 'page_fit_optimizer', 'template_store'):
+            getattr(self, name)
     
     def extract_keywords(self, job_description: str) -> List[str]:
         """
@@ -29,16 +85,23 @@ class ResumeTailor:
         return self.keyword_extractor.extract_keywords(job_description)
     
     def modify_resume_sections(self, latex_resume: str, keywords: List[str], 
-                              projects_data: List[Dict], job_description: str = "") -> str:
+                              projects_data: List[Dict], job_description: str = "",
+                              document: Optional[ResumeDocument] = None,
+                              savings: Optional[Dict[str, int]] = None) -> str:
         """
         Step 2: Modify resume sections to include keywords using parallel processing
+        
+        Sections that already cover the keywords skip their LLM call; pass a dict as
+        savings to collect the number of calls saved per section.
         """
-        # Parse the LaTeX resume to identify sections
-        sections = self.latex_processor.parse_latex_sections(latex_resume)
+        # Parse the LaTeX resume to identify sections, unless a stored template already did
+        if document is None:
+            document = self.latex_processor.parse_document(latex_resume)
+        sections = document.sections()
         
         # Modify sections in parallel
         modified_sections = self.section_modifier.modify_sections_parallel(
-            sections, keywords, job_description, projects_data
+            sections, keywords, job_description, projects_data, savings
         )
         
         # Update sections with results
@@ -50,7 +113,7 @@ class ResumeTailor:
             sections['projects'] = modified_sections['projects']
         
         # Replace all modified sections in the original LaTeX resume
-        modified_resume = self.latex_processor.replace_sections_in_resume(latex_resume, sections)
+        modified_resume = self.latex_processor.replace_sections_in_resume(document, sections)
 
         return modified_resume
 
@@ -60,27 +123,96 @@ class ResumeTailor:
         """
         return self.latex_processor.compile_latex(latex_content)
     
-    def tailor_resume(self, job_description: str, latex_resume: str, 
-                      projects_data: List[Dict] = None) -> Dict:
+    def fit_to_one_page(self, latex_content: str, keywords: List[str],
+                        pdf_result: Optional[Dict] = None) -> Dict:
+        """
+        Step 4: Shrink a multi-page result back onto one page
+        """
+        return self.page_fit_optimizer.fit_to_one_page(latex_content, keywords, pdf_result)
+    
+    def register_template(self, latex_resume: str) -> ResumeTemplate:
+        """
+        Store a resume for reuse by resume_id and warm its preamble format
+        """
+        template = self.template_store.put(latex_resume)
+        # With a compile service the format is built there, on the first compile. Otherwise
+        # it joins the single background builder's bounded queue, or is skipped if that is full.
+        if not self.latex_processor.compile_client:
+            self.latex_processor.format_cache.schedule(template.latex)
+        return template
+    
+    def tailor_resume(self, job_description: str, latex_resume: Optional[str] = None, 
+                      projects_data: List[Dict] = None, resume_id: Optional[str] = None) -> Dict:
         """
         Complete resume tailoring process
         
+        Pass either the LaTeX resume or the resume_id of a stored template.
+        Identical requests arriving while one is in flight share its result.
+        
         Returns:
-            Dict with keys: 'keywords', 'modified_resume', 'pdf_result'
+            Dict with keys: 'keywords', 'modified_resume', 'pdf_result', 'page_fit', 'llm_calls_saved'
         """
+        projects_data = projects_data or []
+        document = None
+        if resume_id is not None:
+            template = self.template_store.get(resume_id)
+            if template is None:
+                raise TemplateNotFound(resume_id)
+            document = template.document
+            latex_resume = template.latex
+            key = flight_key(job_description, resume_id, projects_data)
+        else:
+            key = flight_key(job_description, latex_resume, projects_data)
+        return self._inflight.do(key, self._tailor_resume, job_description, latex_resume, projects_data, document)
+    
+    def _reusable_sections(self, job_description: str, latex_resume: str,
+                           projects_data: List[Dict]) -> Optional[str]:
+        """Tailored resume of a near-duplicate posting for the same resume, if reuse is enabled"""
+        if not self.reuse_sections:
+            return None
+        match = self.similarity_index.lookup(job_description)
+        tailored = match[1].get('tailored') if match else None
+        if tailored and tailored['resume_key'] == flight_key(latex_resume, projects_data):
+            return tailored['modified_resume']
+        return None
+    
+    def _tailor_resume(self, job_description: str, latex_resume: str,
+                       projects_data: List[Dict], document: Optional[ResumeDocument] = None) -> Dict:
         # Step 1: Extract keywords
         keywords = self.extract_keywords(job_description)
         
         # Step 2: Modify resume sections
-        modified_resume = self.modify_resume_sections(
-            latex_resume, keywords, projects_data or [], job_description
-        )
+        savings: Dict[str, int] = {}
+        modified_resume = self._reusable_sections(job_description, latex_resume, projects_data)
+        if modified_resume is None:
+            modified_resume = self.modify_resume_sections(
+                latex_resume, keywords, projects_data, job_description, document, savings
+            )
+            if self.reuse_sections:
+                self.similarity_index.add(job_description, tailored={
+                    'resume_key': flight_key(latex_resume, projects_data),
+                    'modified_resume': modified_resume
+                })
         
         # Step 3: Compile to PDF
         pdf_result = self.compile_latex(modified_resume)
         
+        # Step 4: Fit to one page if the tailored content overflowed
+        page_fit = None
+        if self.page_fit_enabled and pdf_result and not pdf_result['is_single_page']:
+            fit = self.fit_to_one_page(modified_resume, keywords, pdf_result)
+            modified_resume = fit['latex_content']
+            pdf_result = fit['pdf_result']
+            page_fit = {
+                'fitted': fit['fitted'],
+                'iterations': fit['iterations'],
+                'total_seconds': fit['total_seconds']
+            }
+        
         return {
             'keywords': keywords,
             'modified_resume': modified_resume,
-            'pdf_result': pdf_result
+            'pdf_result': pdf_result,
+            'page_fit': page_fit,
+            'llm_calls_saved': sum(savings.values())
         } 
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Keyword Coverage Module
+
+Checks locally which job keywords a resume section already mentions, so the
+section modifiers can skip an LLM call when a section is already covered, or
+ask only for the keywords that are still missing. LaTeX markup is stripped
+before matching (\\textbf{PyTorch} counts as PyTorch) and common aliases are
+treated as the same keyword (JS and JavaScript, k8s and Kubernetes).
+"""
+
+import os
+import re
+import functools
+from typing import List, Optional, Pattern, Tuple
+
+# Spellings that name the same technology; matching is per group
+ALIAS_GROUPS = (
+    ('JavaScript', 'JS', 'ECMAScript'),
+    ('TypeScript', 'TS'),
+    ('Node.js', 'NodeJS'),
+    ('React', 'React.js', 'ReactJS'),
+    ('Vue', 'Vue.js', 'VueJS'),
+    ('Next.js', 'NextJS'),
+    ('Go', 'Golang'),
+    ('Python', 'Python3'),
+    ('C++', 'CPP'),
+    ('C#', 'CSharp'),
+    ('.NET', 'dotnet'),
+    ('PostgreSQL', 'Postgres'),
+    ('MongoDB', 'Mongo'),
+    ('Kubernetes', 'K8s'),
+    ('AWS', 'Amazon Web Services'),
+    ('GCP', 'Google Cloud Platform', 'Google Cloud'),
+    ('Azure', 'Microsoft Azure'),
+    ('CI/CD', 'CICD', 'Continuous Integration'),
+    ('Machine Learning', 'ML'),
+    ('Artificial Intelligence', 'AI'),
+    ('Natural Language Processing', 'NLP'),
+    ('Large Language Models', 'LLM', 'LLMs'),
+    ('scikit-learn', 'sklearn'),
+    ('REST', 'RESTful', 'REST API'),
+)
+ALIASES = {alias.lower(): group for group in ALIAS_GROUPS for alias in group}
+
+# \textbf, \resumeItem, ... are dropped but their braced arguments are kept
+COMMAND_PATTERN = re.compile(r'\\[A-Za-z]+\*?')
+ESCAPED_CHAR_PATTERN = re.compile(r'\\([&%$#_{}])')
+MARKUP_PATTERN = re.compile(r'[{}\[\]~]')
+COMMENT_PATTERN = re.compile(r'(?<!\\)%.*')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_text(latex: str) -> str:
+    """Plain text of a LaTeX fragment, for keyword matching"""
+    text = COMMENT_PATTERN.sub(' ', latex)
+    text = ESCAPED_CHAR_PATTERN.sub(r'\1', text)
+    text = COMMAND_PATTERN.sub(' ', text)
+    text = MARKUP_PATTERN.sub(' ', text)
+    return WHITESPACE_PATTERN.sub(' ', text)
+
+
+def _term_pattern(term: str) -> str:
+    # Word boundaries that also treat + and # as part of a term, so C does not match C++
+    body = r'\s+'.join(re.escape(word) for word in term.split())
+    # Plurals only for longer terms, so Goes does not count as Go
+    plural = '(?:e?s)?' if len(term) > 3 else ''
+    return rf'(?<![\w+#.]){body}{plural}(?![\w+#])'
+
+
+@functools.lru_cache(maxsize=4096)
+def keyword_patterns(keyword: str) -> Tuple[Pattern, ...]:
+    """Compiled patterns matching a keyword or any of its aliases"""
+    terms = ALIASES.get(keyword.strip().lower(), (keyword.strip(),))
+    # Acronyms (AI, REST) and short names (Go) are matched case-sensitively so ordinary words do not count
+    exact = [term for term in terms if term.isupper() or (len(term) <= 3 and term.isalpha() and term != term.lower())]
+    loose = [term for term in terms if term not in exact]
+    patterns = []
+    if exact:
+        patterns.append(re.compile('|'.join(_term_pattern(term) for term in exact)))
+    if loose:
+        patterns.append(re.compile('|'.join(_term_pattern(term) for term in loose), re.IGNORECASE))
+    return tuple(patterns)
+
+
+class KeywordCoverage:
+    """Keywords a section already mentions and the ones it is missing"""
+
+    __slots__ = ('covered', 'missing')
+
+    def __init__(self, covered: List[str], missing: List[str]):
+        self.covered = covered
+        self.missing = missing
+
+    @property
+    def ratio(self) -> Optional[float]:
+        """Share of keywords covered, or None when there were no keywords to judge by"""
+        total = len(self.covered) + len(self.missing)
+        return len(self.covered) / total if total else None
+
+
+class CoverageAnalyzer:
+    """Decides whether a section still needs the LLM to work keywords in"""
+
+    def __init__(self, threshold: Optional[float] = None):
+        # Share of keywords a section must already mention to skip its LLM call; above 1 never skips
+        self.threshold = threshold if threshold is not None else float(
+            os.environ.get('KEYWORD_COVERAGE_THRESHOLD', 1.0)
+        )
+
+    def analyze(self, latex: str, keywords: List[str]) -> KeywordCoverage:
+        text = normalize_text(latex)
+        covered, missing = [], []
+        for keyword in keywords:
+            if not keyword or not keyword.strip():
+                continue
+            if any(pattern.search(text) for pattern in keyword_patterns(keyword)):
+                covered.append(keyword)
+            else:
+                missing.append(keyword)
+        return KeywordCoverage(covered, missing)
+
+    def keywords_to_add(self, latex: str, keywords: List[str]) -> Optional[List[str]]:
+        """Keywords to send to the LLM, or None when the section is covered enough to skip the call"""
+        coverage = self.analyze(latex, keywords)
+        # Without keywords there is nothing to measure, so the call goes ahead as before
+        if coverage.ratio is not None and coverage.ratio >= self.threshold:
+            return None
+        return coverage.missing
@@ -0,0 +1,106 @@
+"""
+Delivery Module
+
+HTTP delivery helpers for the web tier. Downloadable artifacts get strong
+ETags from a hash of their content, so clients revalidate with a cheap 304.
+Tailored PDFs are already published under a content-hash name, so their ETag
+is read off the name; other files are hashed once and cached. File bodies
+can be handed to the front proxy (nginx X-Accel-Redirect, or X-Sendfile for
+Apache and lighttpd) so Python workers never stream bytes. Large JSON
+responses are compressed with brotli when the optional brotli package is
+installed, and with gzip otherwise.
+"""
+
+import os
+import gzip
+import hashlib
+import threading
+import collections
+import logging
+from typing import Optional
+from urllib.parse import quote
+
+from .compile_runner import ARTIFACT_NAME_PATTERN
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+OFFLOAD_MODES = ('none', 'x-accel', 'x-sendfile')
+HASH_CHUNK_BYTES = 1024 * 1024
+# Artifacts whose ETag is remembered, keyed by path, size and mtime
+ETAG_CACHE_SIZE = 256
+
+_etag_cache: 'collections.OrderedDict[tuple, str]' = collections.OrderedDict()
+_etag_lock = threading.Lock()
+
+
+def file_etag(path: str) -> str:
+    """Content hash of a file, cached until its size or mtime changes"""
+    named = ARTIFACT_NAME_PATTERN.match(os.path.basename(path))
+    if named:
+        return named.group(1)
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    with _etag_lock:
+        etag = _etag_cache.get(key)
+        if etag is not None:
+            _etag_cache.move_to_end(key)
+            return etag
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    etag = digest.hexdigest()[:32]
+
+    with _etag_lock:
+        _etag_cache[key] = etag
+        while len(_etag_cache) > ETAG_CACHE_SIZE:
+            _etag_cache.popitem(last=False)
+    return etag
+
+
+def offload_mode() -> str:
+    """How file bodies are delivered: by this process, or by the front proxy"""
+    mode = os.environ.get('DOWNLOAD_OFFLOAD', 'none').lower()
+    if mode not in OFFLOAD_MODES:
+        logger.warning("Unknown DOWNLOAD_OFFLOAD=%s, serving files directly", mode)
+        return 'none'
+    return mode
+
+
+def accel_redirect_path(filename: str) -> str:
+    """Internal nginx location that serves TEMP_DIR, for X-Accel-Redirect"""
+    prefix = os.environ.get('DOWNLOAD_ACCEL_PREFIX', '/_artifacts/')
+    return prefix.rstrip('/') + '/' + quote(filename)
+
+
+def compress_response(response, accept_encodings, min_bytes: Optional[int] = None):
+    """Compress a JSON response in place when the client accepts it and it is worth it"""
+    if min_bytes is None:
+        min_bytes = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+    if (response.direct_passthrough or response.status_code != 200
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < min_bytes:
+        return response
+
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    encoding = accept_encodings.best_match(offered)
+    if encoding is None:
+        return response
+
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=5)
+    else:
+        compressed = gzip.compress(data, compresslevel=6, mtime=0)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    return response
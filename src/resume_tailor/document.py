@@ -0,0 +1,117 @@
+"""
+Resume Document Module
+
+Compact model of a marker-annotated LaTeX resume. The source is stored once,
+along with the offsets of every marker block. Section text is sliced out only
+when asked for, and writing modified sections back is a single offset-based
+splice rather than another search for the markers.
+"""
+
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SKILLS_MARKER_PATTERN = re.compile(
+    r'%----START OF TECHNICAL SKILLS MARKER----(.*?)%----END OF TECHNICAL SKILLS MARKER----', re.DOTALL
+)
+EXPERIENCE_MARKER_PATTERN = re.compile(
+    r'%----START OF EXPERIENCE MARKER----(.*?)%----END OF EXPERIENCE MARKER----', re.DOTALL
+)
+PROJECTS_MARKER_PATTERN = re.compile(
+    r'%----START OF PROJECTS MARKER----(.*?)%----END OF PROJECTS MARKER----', re.DOTALL
+)
+
+
+class MarkerSpan:
+    """Offsets of one marker block (markers included) and of its content"""
+
+    __slots__ = ('start', 'end', 'content_start', 'content_end')
+
+    def __init__(self, start: int, end: int, content_start: int, content_end: int):
+        self.start = start
+        self.end = end
+        self.content_start = content_start
+        self.content_end = content_end
+
+    def __repr__(self):
+        return f"MarkerSpan({self.start}, {self.end}, content={self.content_start}:{self.content_end})"
+
+
+def _stripped_bounds(source: str, start: int, end: int) -> Tuple[int, int]:
+    """Bounds of source[start:end].strip() without building the substring"""
+    while start < end and source[start].isspace():
+        start += 1
+    while end > start and source[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _span(match: 're.Match', strip: bool) -> MarkerSpan:
+    content_start, content_end = match.span(1)
+    if strip:
+        content_start, content_end = _stripped_bounds(match.string, content_start, content_end)
+    return MarkerSpan(match.start(), match.end(), content_start, content_end)
+
+
+class ResumeDocument:
+    """A resume source plus the marker spans found in it"""
+
+    __slots__ = ('source', 'skills', 'experiences', 'projects')
+
+    def __init__(self, source: str):
+        self.source = source
+        # Skills and projects content is stripped; experience blocks keep their whitespace
+        match = SKILLS_MARKER_PATTERN.search(source)
+        self.skills: Optional[MarkerSpan] = _span(match, strip=True) if match else None
+        self.experiences: Tuple[MarkerSpan, ...] = tuple(
+            _span(match, strip=False) for match in EXPERIENCE_MARKER_PATTERN.finditer(source)
+        )
+        match = PROJECTS_MARKER_PATTERN.search(source)
+        self.projects: Optional[MarkerSpan] = _span(match, strip=True) if match else None
+
+    def text(self, span: MarkerSpan) -> str:
+        """Materialize the content of one span"""
+        return self.source[span.content_start:span.content_end]
+
+    def skills_text(self) -> Optional[str]:
+        return self.text(self.skills) if self.skills else None
+
+    def experience_texts(self) -> List[str]:
+        return [self.text(span) for span in self.experiences]
+
+    def projects_text(self) -> Optional[str]:
+        return self.text(self.projects) if self.projects else None
+
+    def sections(self) -> Dict[str, any]:
+        """Section contents in the shape parse_latex_sections has always returned"""
+        sections = {}
+        if self.skills:
+            sections['skills'] = self.skills_text()
+        if self.experiences:
+            sections['experiences'] = self.experience_texts()
+        if self.projects:
+            sections['projects'] = self.projects_text()
+        return sections
+
+    def _replacements(self, sections: Dict[str, any]) -> Iterator[Tuple[MarkerSpan, str]]:
+        if 'skills' in sections and self.skills:
+            yield self.skills, sections['skills']
+        if 'experiences' in sections:
+            yield from zip(self.experiences, sections['experiences'])
+        if 'projects' in sections and self.projects:
+            yield self.projects, sections['projects']
+
+    def splice(self, sections: Dict[str, any]) -> str:
+        """
+        Return the source with each marker block replaced by its new content.
+
+        Markers are removed for replaced blocks; blocks without a replacement
+        are left as they are.
+        """
+        pieces = []
+        cursor = 0
+        for span, content in sorted(self._replacements(sections), key=lambda item: item[0].start):
+            pieces.append(self.source[cursor:span.start])
+            pieces.append(content)
+            cursor = span.end
+        pieces.append(self.source[cursor:])
+        return ''.join(pieces)
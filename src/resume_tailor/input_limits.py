@@ -0,0 +1,168 @@
+"""
+Input Limits Module
+
+Bounds what one /tailor request may carry, so memory and prompt tokens per
+request stay predictable under load. The body is capped in bytes before it is
+parsed (oversized Content-Length is refused without reading anything), and
+each field has its own limit. LaTeX and project lists over their limits are
+rejected, since cutting them would break the document; an oversized job
+description is truncated at a sentence boundary, condensed (repeated lines
+and hiring boilerplate dropped first), or rejected, per JOB_DESCRIPTION_POLICY.
+"""
+
+import os
+import re
+import json
+import logging
+from typing import Dict, List, Optional
+
+from .metrics import INPUT_LIMITS
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ('truncate', 'condense', 'reject')
+
+# Sentence ends and line breaks, preferred places to cut a job description
+SENTENCE_END_PATTERN = re.compile(r'[.!?](?=\s)|\n')
+INLINE_WHITESPACE_PATTERN = re.compile(r'[ \t\f\v]+')
+# Equal-opportunity statements and similar lines carry no skills to tailor for
+BOILERPLATE_PATTERN = re.compile(
+    r'equal opportunity|affirmative action|reasonable accommodation|without regard to|'
+    r'protected veteran|e-verify|privacy (?:policy|notice)|background check|#LI-',
+    re.IGNORECASE,
+)
+# A cut may fall back this far from the limit to end on a sentence or word
+BOUNDARY_SLACK = 0.8
+# Template IDs are 24 hex characters; anything much longer is not one
+MAX_RESUME_ID_CHARS = 64
+
+
+class InputRejected(Exception):
+    """A request body or field was refused; status is the HTTP status to answer with"""
+
+    def __init__(self, field: str, message: str, status: int = 400):
+        super().__init__(message)
+        self.field = field
+        self.status = status
+
+
+def truncate_text(text: str, limit: int) -> str:
+    """Text cut to at most limit characters, ending on a sentence or word when one is near"""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    ends = [match.end() for match in SENTENCE_END_PATTERN.finditer(cut)]
+    if ends and ends[-1] >= limit * BOUNDARY_SLACK:
+        return cut[:ends[-1]].rstrip()
+    space = cut.rfind(' ')
+    if space >= limit * BOUNDARY_SLACK:
+        return cut[:space].rstrip()
+    return cut
+
+
+def condense_job_description(text: str, limit: int) -> str:
+    """Drop repeated lines and hiring boilerplate, then truncate what is left"""
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        line = INLINE_WHITESPACE_PATTERN.sub(' ', line).strip()
+        key = line.lower()
+        if not line or key in seen or BOILERPLATE_PATTERN.search(line):
+            continue
+        seen.add(key)
+        lines.append(line)
+    return truncate_text('\n'.join(lines), limit)
+
+
+class InputLimits:
+    """Per-request and per-field size limits for tailoring requests"""
+
+    def __init__(self, max_request_bytes: Optional[int] = None, max_job_description_chars: Optional[int] = None,
+                 job_description_policy: Optional[str] = None, max_latex_chars: Optional[int] = None,
+                 max_projects: Optional[int] = None, max_project_chars: Optional[int] = None):
+        self.max_request_bytes = max_request_bytes if max_request_bytes is not None else int(
+            os.environ.get('MAX_REQUEST_BYTES', 1024 * 1024)
+        )
+        self.max_job_description_chars = max_job_description_chars if max_job_description_chars is not None else int(
+            os.environ.get('MAX_JOB_DESCRIPTION_CHARS', 20000)
+        )
+        self.job_description_policy = job_description_policy or os.environ.get('JOB_DESCRIPTION_POLICY', 'condense')
+        if self.job_description_policy not in POLICIES:
+            raise ValueError(f"JOB_DESCRIPTION_POLICY must be one of {', '.join(POLICIES)}")
+        self.max_latex_chars = max_latex_chars if max_latex_chars is not None else int(
+            os.environ.get('MAX_LATEX_CHARS', 200000)
+        )
+        self.max_projects = max_projects if max_projects is not None else int(os.environ.get('MAX_PROJECTS', 20))
+        self.max_project_chars = max_project_chars if max_project_chars is not None else int(
+            os.environ.get('MAX_PROJECT_CHARS', 4000)
+        )
+
+    def check_content_length(self, content_length: Optional[int]):
+        """Refuse a declared body size over the limit before any of it is read"""
+        if content_length is not None and content_length > self.max_request_bytes:
+            self._reject('request', f"Request body is {content_length} bytes; the limit is {self.max_request_bytes}")
+
+    def parse_body(self, raw: bytes) -> Dict:
+        """JSON object from a body read with at most max_request_bytes + 1 bytes"""
+        if len(raw) > self.max_request_bytes:
+            # Chunked bodies have no Content-Length; the capped read tells us they ran over
+            self._reject('request', f"Request body exceeds {self.max_request_bytes} bytes")
+        try:
+            data = json.loads(raw) if raw else None
+        except (ValueError, RecursionError):
+            raise InputRejected('request', 'Request body is not valid JSON')
+        if not isinstance(data, dict):
+            raise InputRejected('request', 'Request body must be a JSON object')
+        return data
+
+    def job_description(self, text) -> str:
+        text = self._string('job_description', text)
+        limit = self.max_job_description_chars
+        if len(text) <= limit:
+            return text
+        if self.job_description_policy == 'reject':
+            self._reject('job_description', f"Job description is {len(text)} characters; the limit is {limit}")
+        if self.job_description_policy == 'condense':
+            shortened = condense_job_description(text, limit)
+        else:
+            shortened = truncate_text(text, limit)
+        INPUT_LIMITS.inc(field='job_description', action=self.job_description_policy)
+        logger.info("✂️ Job description shortened (%s) from %d to %d chars",
+                    self.job_description_policy, len(text), len(shortened))
+        return shortened
+
+    def latex(self, text, field: str = 'latex_resume') -> str:
+        text = self._string(field, text)
+        if len(text) > self.max_latex_chars:
+            self._reject(field, f"LaTeX resume is {len(text)} characters; the limit is {self.max_latex_chars}")
+        return text
+
+    def resume_id(self, value) -> Optional[str]:
+        resume_id = self._string('resume_id', value)
+        if len(resume_id) > MAX_RESUME_ID_CHARS:
+            raise InputRejected('resume_id', f"resume_id exceeds {MAX_RESUME_ID_CHARS} characters")
+        return resume_id or None
+
+    def projects(self, projects) -> List:
+        if projects is None:
+            return []
+        if not isinstance(projects, list):
+            raise InputRejected('projects', 'projects must be a list')
+        if len(projects) > self.max_projects:
+            self._reject('projects', f"{len(projects)} projects sent; the limit is {self.max_projects}")
+        for index, project in enumerate(projects):
+            # Projects reach the prompt as their str(), so that is what is measured
+            if len(str(project)) > self.max_project_chars:
+                self._reject('projects', f"Project {index + 1} exceeds {self.max_project_chars} characters")
+        return projects
+
+    def _string(self, field: str, value) -> str:
+        if value is None:
+            return ''
+        if not isinstance(value, str):
+            raise InputRejected(field, f"{field} must be a string")
+        return value
+
+    def _reject(self, field: str, message: str):
+        INPUT_LIMITS.inc(field=field, action='reject')
+        raise InputRejected(field, message, status=413)
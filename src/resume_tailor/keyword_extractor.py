@@ -7,15 +7,42 @@ with fallback to regex-based extraction.
 
 import re
 import json
-from typing import List
+import logging
+from typing import List, Optional
 from .api_providers import APIManager
+from .similarity_index import SimilarityIndex
+from .metrics import KEYWORD_EXTRACTION_SECONDS, FALLBACKS
+
+logger = logging.getLogger(__name__)
+
+# Markdown wrappers models put around JSON answers
+OPENING_FENCE_PATTERN = re.compile(r'^```(?:json)?\s*', re.IGNORECASE)
+CLOSING_FENCE_PATTERN = re.compile(r'\s*```$')
+NEWLINES_PATTERN = re.compile(r'\n+')
+LEADING_BACKTICKS_PATTERN = re.compile(r'^`+')
+TRAILING_BACKTICKS_PATTERN = re.compile(r'`+$')
+QUOTED_KEYWORD_PATTERN = re.compile(r'"([^"]+)"')
+
+# Regex fallback vocabulary: technical skills, then soft skills and practices
+KEYWORD_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'\b(Python|Java|JavaScript|C\+\+|C#|Go|Rust|Swift|Kotlin|TypeScript)\b',
+    r'\b(React|Angular|Vue|Node\.js|Express|Django|Flask|Spring|ASP\.NET)\b',
+    r'\b(AWS|Azure|GCP|Docker|Kubernetes|Jenkins|Git|GitHub|GitLab)\b',
+    r'\b(SQL|MySQL|PostgreSQL|MongoDB|Redis|Elasticsearch)\b',
+    r'\b(HTML|CSS|Sass|Less|Bootstrap|Tailwind|Material-UI)\b',
+    r'\b(Leadership|Communication|Teamwork|Problem Solving|Analytical)\b',
+    r'\b(Agile|Scrum|Kanban|Waterfall|DevOps)\b',
+    r'\b(Project Management|Product Management|User Experience|UX|UI)\b',
+)]
 
 
 class KeywordExtractor:
     """Extracts relevant keywords from job descriptions"""
     
-    def __init__(self, api_manager: APIManager):
+    def __init__(self, api_manager: APIManager, similarity_index: Optional[SimilarityIndex] = None):
         self.api_manager = api_manager
+        # Near-duplicate postings reuse the keywords extracted for the original
+        self.similarity_index = similarity_index
     
     def _clean_ai_response(self, content: str) -> str:
         """Clean AI response by removing markdown formatting and extra whitespace"""
@@ -26,26 +53,22 @@ class KeywordExtractor:
         content = content.strip()
         
         # Remove ```json and ``` markers (case insensitive)
-        import re
-        
-        # Remove starting code blocks
-        content = re.sub(r'^```(?:json|JSON)?\s*', '', content, flags=re.IGNORECASE)
-        
-        # Remove ending code blocks
-        content = re.sub(r'\s*```$', '', content)
+        content = OPENING_FENCE_PATTERN.sub('', content)
+        content = CLOSING_FENCE_PATTERN.sub('', content)
         
         # Remove leading/trailing whitespace
         content = content.strip()
         
         # Normalize newlines - replace multiple newlines with single newlines
-        content = re.sub(r'\n+', '\n', content)
+        content = NEWLINES_PATTERN.sub('\n', content)
         
         # Remove any remaining markdown artifacts
-        content = re.sub(r'^`+', '', content)  # Remove leading backticks
-        content = re.sub(r'`+$', '', content)  # Remove trailing backticks
+        content = LEADING_BACKTICKS_PATTERN.sub('', content)
+        content = TRAILING_BACKTICKS_PATTERN.sub('', content)
         
         return content.strip()
     
+    @KEYWORD_EXTRACTION_SECONDS.time()
     def extract_keywords(self, job_description: str) -> List[str]:
         """
         Extract relevant keywords from job description using AI or fallback
@@ -72,10 +95,18 @@ class KeywordExtractor:
         if not self.api_manager.has_any_provider():
             # Fallback: basic keyword extraction
             return self._basic_keyword_extraction(job_description)
+        
+        signature = None
+        if self.similarity_index is not None:
+            signature = self.similarity_index.signature(job_description)
+            match = self.similarity_index.lookup(job_description, signature)
+            if match and 'keywords' in match[1]:
+                logger.info("♻️ Reusing keywords of a near-duplicate posting (similarity %.2f)", match[0])
+                return list(match[1]['keywords'])
             
         try:
             messages = [{"role": "user", "content": prompt}]
-            content = self.api_manager.call_with_fallback(messages, temperature=0.3)
+            content = self.api_manager.call_with_fallback(messages, temperature=0.3, stage='keywords')
             
             if not content:
                 return self._basic_keyword_extraction(job_description)
@@ -88,43 +119,26 @@ class KeywordExtractor:
                 keywords = json.loads(content)
             else:
                 # Fallback: extract keywords from text
-                keywords = re.findall(r'"([^"]+)"', content)
+                keywords = QUOTED_KEYWORD_PATTERN.findall(content)
                 if not keywords:
                     keywords = content.split(', ')
             
-            return keywords[:15]  # Limit to 15 keywords
+            keywords = keywords[:15]  # Limit to 15 keywords
+            if self.similarity_index is not None:
+                self.similarity_index.add(job_description, signature, keywords=keywords)
+            return keywords
             
         except Exception as e:
-            print(f"Error extracting keywords: {e}")
+            logger.error("Error extracting keywords: %s", e)
             # Fallback: basic keyword extraction
             return self._basic_keyword_extraction(job_description)
     
     def _basic_keyword_extraction(self, job_description: str) -> List[str]:
         """Fallback keyword extraction using regex patterns"""
+        FALLBACKS.inc(kind='keyword_regex')
         keywords = []
         
-        # Technical skills patterns
-        tech_patterns = [
-            r'\b(Python|Java|JavaScript|C\+\+|C#|Go|Rust|Swift|Kotlin|TypeScript)\b',
-            r'\b(React|Angular|Vue|Node\.js|Express|Django|Flask|Spring|ASP\.NET)\b',
-            r'\b(AWS|Azure|GCP|Docker|Kubernetes|Jenkins|Git|GitHub|GitLab)\b',
-            r'\b(SQL|MySQL|PostgreSQL|MongoDB|Redis|Elasticsearch)\b',
-            r'\b(HTML|CSS|Sass|Less|Bootstrap|Tailwind|Material-UI)\b'
-        ]
-        
-        for pattern in tech_patterns:
-            matches = re.findall(pattern, job_description, re.IGNORECASE)
-            keywords.extend(matches)
-        
-        # Soft skills patterns
-        soft_patterns = [
-            r'\b(Leadership|Communication|Teamwork|Problem Solving|Analytical)\b',
-            r'\b(Agile|Scrum|Kanban|Waterfall|DevOps)\b',
-            r'\b(Project Management|Product Management|User Experience|UX|UI)\b'
-        ]
-        
-        for pattern in soft_patterns:
-            matches = re.findall(pattern, job_description, re.IGNORECASE)
-            keywords.extend(matches)
+        for pattern in KEYWORD_PATTERNS:
+            keywords.extend(pattern.findall(job_description))
         
         return list(set(keywords))[:15] 
\ No newline at end of file
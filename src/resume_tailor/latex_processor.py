@@ -6,287 +6,542 @@ Handles parsing, modification, and compilation of LaTeX resume content.
 
 import re
 import os
+import mmap
+import time
 import subprocess
-import tempfile
-import shutil
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 from .api_providers import APIManager, GeminiProvider
+from .preamble_format import PreambleFormatCache, BEGIN_DOCUMENT, split_preamble
+from .document import ResumeDocument
+from .logging_config import LazyPreview
+from .metrics import COMPILE_SECONDS, PAGE_COUNT_SECONDS, FALLBACKS
+from .compile_runner import (CompileRunner, CompileResult, WorkspacePool, publish_artifact, artifact_name,
+                             prune_artifacts, STATUS_NOT_FOUND)
+from .compile_service import CompileClient, CompileServiceError, CompileServiceUnavailable, PRIORITY_NORMAL
 
 logger = logging.getLogger(__name__)
 
+# Reports the fill of the last page so overflow can be measured from the log
+LAYOUT_PROBE = (
+    r'\AtEndDocument{\par\penalty10000'
+    r'\typeout{RT-LAYOUT: page=\number\value{page} total=\the\pagetotal\space goal=\the\pagegoal}}'
+)
+LAYOUT_PATTERN = re.compile(r'RT-LAYOUT: page=(\d+) total=(-?[\d.]+)pt goal=(-?[\d.]+)pt')
+MAX_DIMEN_PT = 16383.0
+
+OUTPUT_WRITTEN_MARKER = 'Output written on'
+OUTPUT_PAGES_PATTERN = re.compile(r'\((\d+) pages?')
+PDF_ROOT_PATTERN = re.compile(rb'/Root\s+(\d+)\s+(\d+)\s+R')
+PDF_PAGES_REF_PATTERN = re.compile(rb'/Pages\s+(\d+)\s+(\d+)\s+R')
+PDF_COUNT_PATTERN = re.compile(rb'/Count\s+(\d+)')
+# The trailer (or xref stream dictionary) lives in the last few KB of the file
+PDF_TRAILER_WINDOW = 4096
+
+# Packages and font switches that commonly fail on minimal TeX installs, removed in one pass
+SIMPLIFY_PACKAGES_PATTERN = re.compile('|'.join([
+    r'\\usepackage\{(?:CormorantGaramond|charter|FiraSans|roboto|noto-sans|sourcesanspro|helvet)\}',
+    r'\\renewcommand\{\\rmdefault\}\{phv\}',
+    r'\\input\{glyphtounicode\}',
+]))
+
+# Resume template macros rewritten to plain LaTeX: name -> (argument count, replacement with #N slots).
+# The headings keep the \item their template definitions start with, since they sit inside itemize.
+SIMPLIFIED_MACROS = {
+    'resumeItem': (1, r'\item #1'),
+    'resumeSubheading': (4, r'\item \textbf{#1} \hfill #2 \\ \textit{#3} \hfill \textit{#4}'),
+    'resumeSubSubheading': (2, r'\item \textit{#1} \hfill \textit{#2}'),
+    'resumeProjectHeading': (2, r'\item \textbf{#1} \hfill \textit{#2}'),
+    'resumeSubItem': (1, r'\item #1'),
+    'resumeSubHeadingListStart': (0, r'\begin{itemize}'),
+    'resumeSubHeadingListEnd': (0, r'\end{itemize}'),
+    'resumeItemListStart': (0, r'\begin{itemize}'),
+    'resumeItemListEnd': (0, r'\end{itemize}'),
+}
+# A control word, or a backslash escaping one character (so \\ is never read as a macro start)
+CONTROL_SEQUENCE_PATTERN = re.compile(r'\\(?:([A-Za-z]+)|.)', re.DOTALL)
+MACRO_SLOT_PATTERN = re.compile(r'#([1-9])')
+
+
+def match_brace(text: str, open_pos: int) -> int:
+    """Return the index of the brace closing the one at open_pos, or -1 if unbalanced"""
+    depth = 0
+    i = open_pos
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return -1
+
+
+def find_command_arguments(latex: str, command: str, nargs: int = 1) -> List[Tuple[int, int, List[Tuple[int, int]]]]:
+    """
+    Find every `\\command{arg1}...{argN}` in latex with brace-aware matching.
+
+    Returns a list of (start, end, arg_spans) where arg_spans holds the
+    (start, end) offsets of each argument's content, braces excluded.
+    """
+    matches = []
+    token = '\\' + command
+    pos = latex.find(token)
+    while pos != -1:
+        after = pos + len(token)
+        if after < len(latex) and latex[after].isalpha():
+            pos = latex.find(token, after)
+            continue
+
+        arg_spans = []
+        cursor = after
+        for _ in range(nargs):
+            while cursor < len(latex) and latex[cursor] in ' \t\n':
+                cursor += 1
+            if cursor >= len(latex) or latex[cursor] != '{':
+                break
+            close = match_brace(latex, cursor)
+            if close == -1:
+                break
+            arg_spans.append((cursor + 1, close))
+            cursor = close + 1
+
+        if len(arg_spans) == nargs:
+            matches.append((pos, cursor, arg_spans))
+            pos = latex.find(token, cursor)
+        else:
+            pos = latex.find(token, after)
+    return matches
+
+
+def _read_arguments(latex: str, cursor: int, nargs: int) -> Optional[Tuple[List[str], int]]:
+    """Read nargs brace-delimited arguments starting at cursor; returns (args, end) or None"""
+    args = []
+    for _ in range(nargs):
+        while cursor < len(latex) and latex[cursor] in ' \t\n':
+            cursor += 1
+        if cursor >= len(latex) or latex[cursor] != '{':
+            return None
+        close = match_brace(latex, cursor)
+        if close == -1:
+            return None
+        args.append(latex[cursor + 1:close])
+        cursor = close + 1
+    return args, cursor
+
+
+def expand_macros(latex: str, macros: Dict[str, Tuple[int, str]]) -> str:
+    """
+    Expand the given macros in a single left-to-right pass.
+
+    Arguments are matched brace-aware, so nested groups such as
+    `\\resumeItem{Cut cost by \\textbf{35\\%}}` survive intact, and macros
+    inside arguments are expanded too. A macro whose arguments cannot be read
+    is left untouched.
+    """
+    pieces = []
+    last = 0
+    for match in CONTROL_SEQUENCE_PATTERN.finditer(latex):
+        if match.start() < last:
+            continue
+        spec = macros.get(match.group(1)) if match.group(1) else None
+        if spec is None:
+            continue
+        nargs, replacement = spec
+        parsed = _read_arguments(latex, match.end(), nargs)
+        if parsed is None:
+            continue
+        args, end = parsed
+        args = [expand_macros(arg, macros) for arg in args]
+        pieces.append(latex[last:match.start()])
+        pieces.append(MACRO_SLOT_PATTERN.sub(lambda slot: args[int(slot.group(1)) - 1], replacement))
+        last = end
+    pieces.append(latex[last:])
+    return ''.join(pieces)
+
+
+def engine_command(engine: str, tex_file: str, work_dir: str, fmt_name: Optional[str] = None,
+                   draft: bool = False) -> List[str]:
+    """Build the command line for one sandboxed engine run; draft typesets without writing a PDF"""
+    command = [engine, '-interaction=nonstopmode', '-no-shell-escape', '-output-directory', work_dir]
+    if draft:
+        command.append('-draftmode')
+    if fmt_name:
+        command.append(f'-fmt={fmt_name}')
+    command.append(tex_file)
+    return command
+
+
+def parse_layout(log_text: str) -> Optional[Dict]:
+    """Parse the layout probe output from a TeX log into page count and overflow"""
+    match = LAYOUT_PATTERN.search(log_text or '')
+    if not match:
+        return None
+
+    pages = int(match.group(1))
+    page_total = float(match.group(2))
+    page_goal = float(match.group(3))
+    if page_goal >= MAX_DIMEN_PT:
+        # Nothing was on the page yet, so there is no goal to measure against
+        page_goal = 0.0
+
+    if pages > 1:
+        overflow = (pages - 2) * page_goal + page_total
+    else:
+        overflow = page_total - page_goal if page_goal else 0.0
+
+    return {
+        'page_count': pages,
+        'page_total_pt': page_total,
+        'page_goal_pt': page_goal,
+        'overflow_pt': overflow
+    }
+
+
+def page_count_from_log(log_text: str) -> Optional[int]:
+    """Read the page count from TeX's "Output written on x.pdf (N pages, M bytes)" line"""
+    index = (log_text or '').rfind(OUTPUT_WRITTEN_MARKER)
+    if index == -1:
+        return None
+    # TeX hard-wraps log lines, so the path and count may span several lines
+    window = log_text[index:index + 1024].replace('\n', '')
+    match = OUTPUT_PAGES_PATTERN.search(window)
+    return int(match.group(1)) if match else None
+
+
+def _find_pdf_object(buffer, number: int, generation: int) -> Optional[bytes]:
+    """Return the body of an uncompressed PDF object, or None if it is not found"""
+    pattern = re.compile(rb'(?<![0-9])%d\s+%d\s+obj' % (number, generation))
+    match = pattern.search(buffer)
+    if not match:
+        return None
+    end = buffer.find(b'endobj', match.end())
+    if end == -1:
+        return None
+    return buffer[match.end():end]
+
+
+def page_count_from_pdf(pdf_path: str) -> Optional[int]:
+    """
+    Count pages by following trailer /Root -> catalog /Pages -> /Count with an mmap scan.
+
+    Returns None when the catalog or page tree root sits in a compressed
+    object stream, in which case a full parser is needed.
+    """
+    with open(pdf_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            tail = buffer[max(len(buffer) - PDF_TRAILER_WINDOW, 0):]
+            roots = PDF_ROOT_PATTERN.findall(tail)
+            if not roots:
+                return None
+            number, generation = roots[-1]
+            catalog = _find_pdf_object(buffer, int(number), int(generation))
+            if catalog is None:
+                return None
+
+            pages_ref = PDF_PAGES_REF_PATTERN.search(catalog)
+            if not pages_ref:
+                return None
+            page_tree = _find_pdf_object(buffer, int(pages_ref.group(1)), int(pages_ref.group(2)))
+            if page_tree is None:
+                return None
+
+            count = PDF_COUNT_PATTERN.search(page_tree)
+            return int(count.group(1)) if count else None
+
 
 class LaTeXProcessor:
     """Handles LaTeX content processing and compilation"""
     
     def __init__(self, api_manager: APIManager, gemini_provider: GeminiProvider):
         self.api_manager = api_manager
-        self.gemini_provider = GeminiProvider()
+        self.gemini_provider = gemini_provider
+        self.compile_runner = CompileRunner()
+        self.workspace_pool = WorkspacePool()
+        self.format_cache = PreambleFormatCache(runner=self.compile_runner)
+        # Delegate compiles to a separate compile service when one is configured
+        service_socket = os.environ.get('COMPILE_SERVICE_SOCKET')
+        self.compile_client = CompileClient(service_socket) if service_socket else None
+    
+    def parse_document(self, latex_resume: str) -> ResumeDocument:
+        """Locate the marker blocks of a resume once, warning about any that are missing"""
+        document = ResumeDocument(latex_resume)
+        if document.skills is None:
+            logger.warning("skills marker not found in resume")
+        if not document.experiences:
+            logger.warning("No experience markers found in resume")
+        if document.projects is None:
+            logger.warning("No projects marker found in resume")
+        return document
     
     def parse_latex_sections(self, latex_resume: str) -> Dict[str, any]:
         """Parse LaTeX resume into sections using marker comments"""
-        sections = {}
-        
-        # Define marker patterns for main sections
-        main_marker_patterns = {
-            'skills': (r'%----START OF TECHNICAL SKILLS MARKER----(.*?)%----END OF TECHNICAL SKILLS MARKER----', re.DOTALL)
-        }
-        
-        # Parse main sections
-        for section_name, (pattern, flags) in main_marker_patterns.items():
-            match = re.search(pattern, latex_resume, flags)
-            if match:
-                sections[section_name] = match.group(1).strip()
-            else:
-                print(f"Warning: {section_name} marker not found in resume")
-        
-        # Parse individual experience markers
-        experience_matches = re.findall(r'%----START OF EXPERIENCE MARKER----(.*?)%----END OF EXPERIENCE MARKER----', latex_resume, re.DOTALL)
-        if experience_matches:
-            sections['experiences'] = experience_matches
-        else:
-            print("Warning: No experience markers found in resume")
-        
-        # Parse general projects marker
-        project_match = re.search(r'%----START OF PROJECTS MARKER----(.*?)%----END OF PROJECTS MARKER----', latex_resume, re.DOTALL)
-        if project_match:
-            sections['projects'] = project_match.group(1).strip()
-        else:
-            print("Warning: No projects marker found in resume")
-        
-        return sections
+        return self.parse_document(latex_resume).sections()
     
-    def replace_sections_in_resume(self, latex_resume: str, sections: Dict[str, any]) -> str:
+    def replace_sections_in_resume(self, latex_resume: Union[str, ResumeDocument], sections: Dict[str, any]) -> str:
         """Replace modified sections back into the original LaTeX resume and remove markers"""
-        modified_resume = latex_resume
-        
-        # Replace skills section
-        if 'skills' in sections:
-            # Use string replacement instead of regex to avoid escaping issues
-            start_marker = '%----START OF TECHNICAL SKILLS MARKER----'
-            end_marker = '%----END OF TECHNICAL SKILLS MARKER----'
-            
-            start_pos = modified_resume.find(start_marker)
-            end_pos = modified_resume.find(end_marker)
-            
-            if start_pos != -1 and end_pos != -1 and end_pos > start_pos:
-                # Replace the content between markers and remove the markers
-                modified_resume = (
-                    modified_resume[:start_pos] + sections['skills'] + 
-                    modified_resume[end_pos + len(end_marker):]
-                )
-        
-        # Replace experience sections
-        if 'experiences' in sections:
-            # Find all experience markers and replace them one by one
-            experience_pattern = r'%----START OF EXPERIENCE MARKER----.*?%----END OF EXPERIENCE MARKER----'
-            experience_matches = list(re.finditer(experience_pattern, modified_resume, re.DOTALL))
-            
-            # Replace from last to first to avoid index shifting issues
-            for i in range(len(experience_matches) - 1, -1, -1):
-                if i < len(sections['experiences']):
-                    match = experience_matches[i]
-                    start, end = match.span()
-                    # Replace the entire marker block with just the content (no markers)
-                    modified_resume = (
-                        modified_resume[:start] + sections['experiences'][i] + 
-                        modified_resume[end:]
-                    )
-        
-        # Replace projects section
-        if 'projects' in sections:
-            # Use string replacement instead of regex to avoid escaping issues
-            start_marker = '%----START OF PROJECTS MARKER----'
-            end_marker = '%----END OF PROJECTS MARKER----'
-            
-            start_pos = modified_resume.find(start_marker)
-            end_pos = modified_resume.find(end_marker)
-            
-            if start_pos != -1 and end_pos != -1 and end_pos > start_pos:
-                # Replace the content between markers and remove the markers
-                modified_resume = (
-                    modified_resume[:start_pos] + sections['projects'] + 
-                    modified_resume[end_pos + len(end_marker):]
-                )
-        
-        return modified_resume
+        document = latex_resume if isinstance(latex_resume, ResumeDocument) else ResumeDocument(latex_resume)
+        return document.splice(sections)
     
-    def compile_latex(self, latex_content: str) -> Optional[Dict]:
+    def compile_latex(self, latex_content: str, priority: int = PRIORITY_NORMAL) -> Optional[Dict]:
         """
         Compile LaTeX to PDF and validate it's 1 page
+
+        Runs on the compile service when COMPILE_SERVICE_SOCKET is set. A full
+        service queue raises CompileQueueFull. Only when the service cannot be
+        reached does the compile fall back to this process; a timeout or a
+        failed job is not run twice.
+        """
+        if self.compile_client:
+            try:
+                return self.compile_client.compile(latex_content, priority)
+            except CompileServiceUnavailable as exc:
+                logger.warning("⚠️ Compile service unavailable, compiling in-process: %s", exc)
+                FALLBACKS.inc(kind='compile_service')
+            except CompileServiceError as exc:
+                logger.error("❌ Compile service failed: %s", exc)
+                return None
+        return self.compile_locally(latex_content)
+    
+    def probe_layout(self, latex_content: str, priority: int = PRIORITY_NORMAL) -> Optional[Dict]:
+        """
+        Measure page count and overflow without producing a PDF
+
+        Runs pdflatex in -draftmode, which typesets every page but skips
+        writing the PDF, embedding fonts and reading images. Returns the
+        parse_layout() dict, or None when the probe could not run; callers then
+        fall back to compile_latex.
+        """
+        if self.compile_client:
+            try:
+                return self.compile_client.probe(latex_content, priority)
+            except CompileServiceUnavailable as exc:
+                logger.warning("⚠️ Compile service unavailable, probing in-process: %s", exc)
+                FALLBACKS.inc(kind='compile_service')
+            except CompileServiceError as exc:
+                logger.error("❌ Compile service probe failed: %s", exc)
+                return None
+        return self.probe_locally(latex_content)
+    
+    def probe_locally(self, latex_content: str) -> Optional[Dict]:
+        """
+        Run a draft-mode layout probe in this process
+        """
+        try:
+            with self.workspace_pool.acquire() as temp_dir:
+                tex_file = os.path.join(temp_dir, 'resume.tex')
+                with open(tex_file, 'w', encoding='utf-8') as f:
+                    f.write(self._with_layout_probe(latex_content))
+                
+                fmt_name = self.format_cache.get_format(latex_content)
+                result = self._run_engine('pdflatex', tex_file, temp_dir, fmt_name, draft=True)
+                if not result.ok and not result.fatal and fmt_name:
+                    result = self._run_engine('pdflatex', tex_file, temp_dir, draft=True)
+                if not result.ok:
+                    logger.info("Layout probe failed (%s), a full compile is needed", result.status)
+                    return None
+                
+                layout = parse_layout(self._read_log(os.path.join(temp_dir, 'resume.log')))
+                if layout:
+                    logger.info("📏 Layout probe: %d page(s), overflow %.1fpt in %.2fs",
+                                layout['page_count'], layout['overflow_pt'], result.elapsed)
+                return layout
+        except Exception:
+            logger.exception("❌ Error probing LaTeX layout")
+            return None
+    
+    def compile_locally(self, latex_content: str) -> Optional[Dict]:
+        """
+        Compile LaTeX to PDF in this process and validate it's 1 page
         """
-        logger.info("🔧 Starting LaTeX compilation...")
-        logger.info(f"📄 LaTeX content length: {len(latex_content)}")
-        logger.info(f"📄 LaTeX content preview: {latex_content[:200]}...")
+        logger.info("🔧 Starting LaTeX compilation (%d chars)", len(latex_content))
+        logger.debug("📄 LaTeX content preview: %s", LazyPreview(latex_content))
         
         try:
-            # Create temporary directory
-            logger.info("📁 Creating temporary directory...")
-            with tempfile.TemporaryDirectory() as temp_dir:
-                logger.info(f"📁 Temp directory created: {temp_dir}")
+            # Reuse this worker's RAM-backed workspace
+            with self.workspace_pool.acquire() as temp_dir:
+                logger.debug("📁 Compile workspace: %s", temp_dir)
                 
                 # Write LaTeX content to file
                 tex_file = os.path.join(temp_dir, 'resume.tex')
-                logger.info(f"📝 Writing LaTeX to file: {tex_file}")
                 with open(tex_file, 'w', encoding='utf-8') as f:
-                    f.write(latex_content)
-                logger.info("✅ LaTeX file written successfully")
+                    f.write(self._with_layout_probe(latex_content))
                 
                 # Check if pdflatex exists
-                logger.info("🔍 Checking if pdflatex is available...")
                 try:
                     result = subprocess.run(['pdflatex', '--version'], capture_output=True, text=True, timeout=10)
-                    logger.info(f"✅ pdflatex found: {result.stdout[:100]}...")
-                except Exception as e:
-                    logger.exception("❌ pdflatex not found:")
+                    logger.debug("✅ pdflatex found: %s", LazyPreview(result.stdout, 100))
+                except Exception:
+                    logger.exception("❌ pdflatex not found")
                     return None
                                 
                 # Try to compile with different approaches
                 compilation_success = False
                 
-                # First attempt: Standard compilation
-                print("🔄 Attempting first compilation (pdflatex)...")
-                result = subprocess.run(
-                    ['pdflatex', '-interaction=nonstopmode', '-output-directory', temp_dir, tex_file],
-                    capture_output=True,
-                    text=True,
-                    cwd=temp_dir
-                )
+                # First attempt: Standard compilation, against the warm preamble format when available
+                fmt_name = self.format_cache.get_format(latex_content)
+                logger.info("🔄 Attempting first compilation (pdflatex, format=%s)", fmt_name or 'cold')
+                result = self._run_engine('pdflatex', tex_file, temp_dir, fmt_name)
+                if not result.ok and not result.fatal and fmt_name:
+                    logger.info("🔄 Warm format compilation failed, retrying pdflatex cold")
+                    result = self._run_engine('pdflatex', tex_file, temp_dir)
                 
-                print(f"📊 First compilation result: returncode={result.returncode}")
-                print(f"📊 First compilation stdout: {result.stdout[:200]}...")
-                print(f"📊 First compilation stderr: {result.stderr[:200]}...")
+                logger.info("📊 First compilation result: %s", result)
+                logger.debug("📊 First compilation stdout: %s", LazyPreview(result.stdout))
                 
-                if result.returncode == 0:
+                if result.fatal:
+                    # A runaway or memory-hungry document would only repeat itself on the other engines
+                    logger.error("❌ First compilation aborted: %s", result.status)
+                    return None
+                
+                if result.ok:
                     compilation_success = True
-                    print("✅ First compilation successful!")
                 else:
-                    print(f"❌ First compilation failed: {result.stderr}")
+                    logger.warning("❌ First compilation failed: %s", result)
+                    logger.debug("📊 First compilation stderr: %s", LazyPreview(result.stderr, 2000))
                     
                     # Second attempt: Try with lualatex (better font support)
-                    print("🔄 Attempting second compilation (lualatex)...")
-                    result = subprocess.run(
-                        ['lualatex', '-interaction=nonstopmode', '-output-directory', temp_dir, tex_file],
-                        capture_output=True,
-                        text=True,
-                        cwd=temp_dir
-                    )
-                    
-                    print(f"📊 Second compilation result: returncode={result.returncode}")
-                    print(f"📊 Second compilation stderr: {result.stderr[:200]}...")
+                    FALLBACKS.inc(kind='compile_engine')
+                    logger.info("🔄 Attempting second compilation (lualatex)")
+                    result = self._run_engine('lualatex', tex_file, temp_dir)
+                    logger.info("📊 Second compilation result: %s", result)
                     
-                    if result.returncode == 0:
+                    if result.ok:
                         compilation_success = True
-                        print("✅ Second compilation successful!")
+                    elif result.fatal and result.status != STATUS_NOT_FOUND:
+                        logger.error("❌ Second compilation aborted: %s", result.status)
+                        return None
                     else:
-                        print(f"❌ Second compilation failed: {result.stderr}")
+                        logger.warning("❌ Second compilation failed: %s", result)
+                        logger.debug("📊 Second compilation stderr: %s", LazyPreview(result.stderr, 2000))
                         
                         # Third attempt: Remove problematic packages and try again
-                        print("🔄 Attempting third compilation (simplified content)...")
+                        FALLBACKS.inc(kind='compile_engine')
                         simplified_content = self._simplify_latex_content(latex_content)
-                        print(f"📄 Simplified content length: {len(simplified_content)}")
+                        logger.info("🔄 Attempting third compilation (simplified content, %d chars)",
+                                    len(simplified_content))
                         with open(tex_file, 'w', encoding='utf-8') as f:
-                            f.write(simplified_content)
+                            f.write(self._with_layout_probe(simplified_content))
                         
-                        result = subprocess.run(
-                            ['pdflatex', '-interaction=nonstopmode', '-output-directory', temp_dir, tex_file],
-                            capture_output=True,
-                            text=True,
-                            cwd=temp_dir
-                        )
+                        result = self._run_engine('pdflatex', tex_file, temp_dir)
+                        logger.info("📊 Third compilation result: %s", result)
                         
-                        print(f"📊 Third compilation result: returncode={result.returncode}")
-                        print(f"📊 Third compilation stderr: {result.stderr[:200]}...")
-                        
-                        if result.returncode == 0:
+                        if result.ok:
                             compilation_success = True
-                            print("✅ Third compilation successful!")
                         else:
-                            print(f"❌ Third compilation failed: {result.stderr}")
+                            logger.warning("❌ Third compilation failed: %s", result)
+                            logger.debug("📊 Third compilation stderr: %s", LazyPreview(result.stderr, 2000))
                 
                 if not compilation_success:
-                    print("❌ All compilation attempts failed")
+                    logger.error("❌ All compilation attempts failed")
                     return None
                 
                 # Check if PDF was created
                 pdf_file = os.path.join(temp_dir, 'resume.pdf')
-                print(f"📄 Checking for PDF file: {pdf_file}")
                 if not os.path.exists(pdf_file):
-                    print("❌ PDF file not found")
+                    logger.error("❌ PDF file not found: %s", pdf_file)
                     return None
                 
-                print(f"✅ PDF file created: {pdf_file}")
-                
                 # Validate PDF page count and return result with status
-                page_count = self._get_pdf_page_count(pdf_file)
+                log_text = self._read_log(os.path.join(temp_dir, 'resume.log'))
+                page_count = self._get_pdf_page_count(pdf_file, log_text)
                 is_single_page = page_count == 1
-                print(f"📊 PDF page count: {page_count}, is_single_page: {is_single_page}")
                 
-                # Copy PDF to temp directory for download
+                # Measure how far the last page overflows, for the page-fit optimizer
+                layout = parse_layout(log_text)
+                
+                # Move PDF into the temp directory for download, under a name of its own
                 temp_dir = os.environ.get('TEMP_DIR', 'temp')
-                output_pdf = os.path.join(temp_dir, 'tailored_resume.pdf')
-                print(f"📋 Copying PDF to: {output_pdf}")
-                shutil.copy2(pdf_file, output_pdf)
+                filename = artifact_name(pdf_file)
+                publish_artifact(pdf_file, os.path.join(temp_dir, filename))
+                prune_artifacts(temp_dir)
                 
                 result = {
-                    'filename': 'tailored_resume.pdf',
+                    'filename': filename,
                     'is_single_page': is_single_page,
-                    'page_count': page_count
+                    'page_count': page_count,
+                    'layout': layout
                 }
-                print(f"✅ LaTeX compilation completed successfully: {result}")
+                logger.info("✅ LaTeX compilation completed: %d page(s)", page_count)
                 return result
                     
-        except Exception as e:
-            print(f"❌ Error compiling LaTeX: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("❌ Error compiling LaTeX")
             return None
     
+    def _run_engine(self, engine: str, tex_file: str, work_dir: str,
+                    fmt_name: Optional[str] = None, draft: bool = False) -> CompileResult:
+        """Run a sandboxed TeX engine on tex_file, optionally against a cached preamble format"""
+        command = engine_command(engine, tex_file, work_dir, fmt_name, draft)
+        env = self.format_cache.format_env() if fmt_name else None
+        result = self.compile_runner.run(command, cwd=work_dir, env=env)
+        COMPILE_SECONDS.observe(result.elapsed, engine=f'{engine}-draft' if draft else engine,
+                                format='warm' if fmt_name else 'cold', status=result.status)
+        return result
+    
+    def _with_layout_probe(self, latex_content: str) -> str:
+        """Insert the layout probe right after \\begin{document} (warm formats skip the preamble)"""
+        index = latex_content.find(BEGIN_DOCUMENT)
+        if index == -1:
+            return latex_content
+        index += len(BEGIN_DOCUMENT)
+        return latex_content[:index] + '\n' + LAYOUT_PROBE + latex_content[index:]
+    
+    def _read_log(self, log_path: str) -> str:
+        """Read a TeX log, tolerating missing files and non-UTF-8 bytes"""
+        try:
+            with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+                return f.read()
+        except OSError:
+            return ''
+    
     def _simplify_latex_content(self, latex_content: str) -> str:
         """Simplify LaTeX content by removing problematic packages and commands"""
         # Remove problematic packages
-        problematic_packages = [
-            r'\\usepackage\{CormorantGaramond\}',
-            r'\\usepackage\{charter\}',
-            r'\\usepackage\{FiraSans\}',
-            r'\\usepackage\{roboto\}',
-            r'\\usepackage\{noto-sans\}',
-            r'\\usepackage\{sourcesanspro\}',
-            r'\\usepackage\{helvet\}',
-            r'\\renewcommand\{\\rmdefault\}\{phv\}',
-            r'\\input\{glyphtounicode\}'
-        ]
+        latex_content = SIMPLIFY_PACKAGES_PATTERN.sub('', latex_content)
         
-        for package in problematic_packages:
-            latex_content = re.sub(package, '', latex_content)
-        
-        # Replace custom commands with standard LaTeX
-        command_replacements = {
-            r'\\resumeItem\{([^}]*)\}': r'\\item \1',
-            r'\\resumeSubheading\{([^}]*)\}\{([^}]*)\}\{([^}]*)\}\{([^}]*)\}': r'\\textbf{\1} \hfill \2 \\\\ \textit{\3} \hfill \textit{\4}',
-            r'\\resumeSubSubheading\{([^}]*)\}\{([^}]*)\}': r'\\textit{\1} \hfill \textit{\2}',
-            r'\\resumeProjectHeading\{([^}]*)\}\{([^}]*)\}': r'\\textbf{\1} \hfill \textit{\2}',
-            r'\\resumeSubItem\{([^}]*)\}': r'\\item \1',
-            r'\\resumeSubHeadingListStart': r'\\begin{itemize}',
-            r'\\resumeSubHeadingListEnd': r'\\end{itemize}',
-            r'\\resumeItemListStart': r'\\begin{itemize}',
-            r'\\resumeItemListEnd': r'\\end{itemize}'
-        }
+        # Replace custom commands with standard LaTeX; the preamble keeps their definitions
+        preamble, body = split_preamble(latex_content)
+        return preamble + expand_macros(body, SIMPLIFIED_MACROS)
+    
+    def _get_pdf_page_count(self, pdf_path: str, log_text: Optional[str] = None) -> int:
+        """
+        Get the number of pages in a PDF.
+
+        Uses the TeX log when available, then a trailer scan of the PDF, and
+        only parses the whole file with PyPDF2 as a last resort.
+        """
+        start_time = time.perf_counter()
+        page_count = page_count_from_log(log_text) if log_text else None
+        if page_count is not None:
+            PAGE_COUNT_SECONDS.observe(time.perf_counter() - start_time, method='log')
+            return page_count
         
-        for old_cmd, new_cmd in command_replacements.items():
-            latex_content = re.sub(old_cmd, new_cmd, latex_content)
+        try:
+            page_count = page_count_from_pdf(pdf_path)
+        except (OSError, ValueError) as e:
+            logger.warning("PDF trailer scan failed for %s: %s", pdf_path, e)
+        if page_count is not None:
+            PAGE_COUNT_SECONDS.observe(time.perf_counter() - start_time, method='trailer')
+            return page_count
         
-        return latex_content
-    
-    def _get_pdf_page_count(self, pdf_path: str) -> int:
-        """Get the number of pages in a PDF"""
         try:
             import PyPDF2
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                return len(pdf_reader.pages)
+                page_count = len(pdf_reader.pages)
+            PAGE_COUNT_SECONDS.observe(time.perf_counter() - start_time, method='pypdf2')
+            return page_count
         except Exception as e:
-            print(f"Error getting PDF page count: {e}")
+            logger.error("Error getting PDF page count: %s", e)
             return 0
     
     def _validate_pdf_pages(self, pdf_path: str) -> bool:
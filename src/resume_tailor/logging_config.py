@@ -0,0 +1,133 @@
+"""
+Logging Configuration Module
+
+Structured, leveled logging with a per-request correlation ID. Payload
+previews are wrapped in LazyPreview so large strings are only sliced when a
+DEBUG record is actually emitted.
+"""
+
+import os
+import json
+import uuid
+import logging
+import contextvars
+import threading
+from typing import Callable, Optional
+
+request_id_var: contextvars.ContextVar = contextvars.ContextVar('request_id', default='-')
+
+# Attributes present on every LogRecord; anything else came in through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+
+class LazyPreview:
+    """Truncated view of a payload, only materialized when the record is formatted"""
+
+    __slots__ = ('payload', 'limit')
+
+    def __init__(self, payload, limit: int = 200):
+        self.payload = payload
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = str(self.payload)
+        if len(text) <= self.limit:
+            return text
+        return f"{text[:self.limit]}... [{len(text)} chars]"
+
+    __repr__ = __str__
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps each record with the current request's correlation ID"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Formats records as `key=value` pairs, including any `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = [
+            f"ts={self.formatTime(record)}",
+            f"level={record.levelname}",
+            f"logger={record.name}",
+            f"request_id={getattr(record, 'request_id', '-')}",
+            f"msg={json.dumps(record.getMessage(), ensure_ascii=False)}",
+        ]
+        for key, value in _extra_fields(record).items():
+            fields.append(f"{key}={json.dumps(value, default=str, ensure_ascii=False)}")
+        if record.exc_info:
+            fields.append(f"exc={json.dumps(self.formatException(record.exc_info), ensure_ascii=False)}")
+        return ' '.join(fields)
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'msg': record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+def configure_logging(level: Optional[str] = None, log_format: Optional[str] = None):
+    """
+    Install the structured handler on the root logger.
+
+    LOG_LEVEL (default INFO) and LOG_FORMAT ("kv" or "json", default "kv")
+    are read from the environment when not given.
+    """
+    level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    log_format = (log_format or os.environ.get('LOG_FORMAT', 'kv')).lower()
+
+    handler = logging.StreamHandler()
+    handler.addFilter(RequestIdFilter())
+    handler.setFormatter(JSONFormatter() if log_format == 'json' else KeyValueFormatter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    """Use a sane incoming correlation ID, or generate a fresh one"""
+    if incoming and len(incoming) <= 64 and incoming.replace('-', '').isalnum():
+        return incoming
+    return uuid.uuid4().hex[:16]
+
+
+def set_request_id(request_id: str) -> contextvars.Token:
+    return request_id_var.set(request_id)
+
+
+def reset_request_id(token: contextvars.Token):
+    request_id_var.reset(token)
+
+
+def get_request_id() -> str:
+    return request_id_var.get()
+
+
+def start_thread(target: Callable, *args) -> threading.Thread:
+    """Start a thread that inherits the caller's correlation ID"""
+    context = contextvars.copy_context()
+    thread = threading.Thread(target=context.run, args=(target,) + args)
+    thread.start()
+    return thread
@@ -0,0 +1,385 @@
+"""
+Metrics Module
+
+In-process counters and latency histograms for each pipeline stage,
+rendered in the Prometheus text exposition format.
+
+Under several gunicorn workers each process has its own registry, so a
+scrape would only see whichever worker answered it. With
+METRICS_MULTIPROC_DIR set, every process writes a snapshot of its values to
+that directory every METRICS_FLUSH_INTERVAL seconds and /metrics renders the
+sum over all snapshots, much like prometheus_client's multiprocess mode.
+Snapshots of exited workers are folded into an archive so counters never go
+backwards when workers are recycled.
+"""
+
+import os
+import json
+import glob
+import time
+import bisect
+import threading
+import functools
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+ARCHIVE_FILE = 'archive.json'
+LOCK_FILE = '.lock'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class _Metric(ABC):
+    """Shared label handling for counters and histograms"""
+
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self, values: Optional[Dict] = None) -> str:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        lines.extend(self._samples(sorted((values if values is not None else self.snapshot()).items())))
+        return '\n'.join(lines)
+
+    @abstractmethod
+    def snapshot(self) -> Dict[Tuple[str, ...], object]:
+        """Copy of the values by label key"""
+        pass
+
+    @abstractmethod
+    def reset(self):
+        """Drop all values"""
+        pass
+
+    @abstractmethod
+    def _samples(self, items):
+        """Exposition lines for sorted (label key, value) pairs"""
+        pass
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self, items):
+        for key, value in items:
+            yield f'{self.name}{_format_labels(zip(self.label_names, key))} {value}'
+
+
+class _Timer:
+    """Times a block or a function call into a histogram"""
+
+    def __init__(self, histogram: 'Histogram', labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Timer(self.histogram, self.labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            # [per-bucket counts..., +Inf count, sum]
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, **labels) -> _Timer:
+        """Context manager / decorator observing elapsed wall time"""
+        return _Timer(self, labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[:-1]) if series else 0
+
+    def snapshot(self) -> Dict[Tuple[str, ...], list]:
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def _samples(self, items):
+        for key, series in items:
+            base = list(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield f'{self.name}_bucket{_format_labels(base + [("le", le)])} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(base)} {series[-1]}'
+            yield f'{self.name}_count{_format_labels(base)} {cumulative}'
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them for scraping"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        # Set by enable_multiprocess; renders then cover every process writing there
+        self.directory: Optional[str] = None
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def _register(self, metric: _Metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        if self.directory is None:
+            return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+        self.write_snapshot()
+        totals = read_snapshots(self.directory)
+        return '\n'.join(metric.render(totals.get(metric.name, {})) for metric in metrics) + '\n'
+
+    def snapshot(self) -> Dict[str, list]:
+        """JSON-ready values of every metric: {name: [[labels, value], ...]}"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: [[list(key), value] for key, value in metric.snapshot().items()] for metric in metrics}
+
+    def reset(self):
+        """Zero every metric, e.g. in a freshly forked worker that inherited the master's values"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def write_snapshot(self, directory: Optional[str] = None):
+        """Atomically replace this process's snapshot file"""
+        directory = directory or self.directory
+        path = os.path.join(directory, f'process_{os.getpid()}.json')
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(temp_path, path)
+
+    def enable_multiprocess(self, directory: str, interval: Optional[float] = None):
+        """Share this process's values through directory, flushing them every interval seconds"""
+        if interval is None:
+            interval = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.write_snapshot()
+
+        def flush_forever():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write_snapshot()
+                except OSError:
+                    pass
+
+        threading.Thread(target=flush_forever, name='metrics-flush', daemon=True).start()
+
+
+@contextmanager
+def _directory_lock(directory: str, exclusive: bool):
+    # Readers never see an exited process both in its own file and in the archive
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _load(path: str) -> Dict[str, list]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _merge_into(totals: Dict[str, Dict], snapshot: Dict[str, list]):
+    for name, series in snapshot.items():
+        values = totals.setdefault(name, {})
+        for labels, value in series:
+            key = tuple(labels)
+            previous = values.get(key)
+            if previous is None:
+                values[key] = value
+            elif isinstance(value, list):
+                # Histogram series: bucket counts and the sum add up element by element
+                values[key] = [a + b for a, b in zip(previous, value)]
+            else:
+                values[key] = previous + value
+
+
+def read_snapshots(directory: str) -> Dict[str, Dict]:
+    """Summed values of every snapshot in directory, by metric name and label key"""
+    totals: Dict[str, Dict] = {}
+    with _directory_lock(directory, exclusive=False):
+        for path in glob.glob(os.path.join(directory, 'process_*.json')) + [os.path.join(directory, ARCHIVE_FILE)]:
+            _merge_into(totals, _load(path))
+    return totals
+
+
+def archive_process(directory: str, pid: int):
+    """Fold an exited process's snapshot into the archive (gunicorn child_exit, in the master)"""
+    path = os.path.join(directory, f'process_{pid}.json')
+    if not os.path.exists(path):
+        return
+    with _directory_lock(directory, exclusive=True):
+        archive_path = os.path.join(directory, ARCHIVE_FILE)
+        totals: Dict[str, Dict] = {}
+        _merge_into(totals, _load(archive_path))
+        _merge_into(totals, _load(path))
+        temp_path = f'{archive_path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({name: [[list(key), value] for key, value in values.items()]
+                       for name, values in totals.items()}, f)
+        os.replace(temp_path, archive_path)
+        os.remove(path)
+
+
+REGISTRY = MetricsRegistry()
+
+KEYWORD_EXTRACTION_SECONDS = REGISTRY.histogram(
+    'resume_tailor_keyword_extraction_seconds', 'Time spent extracting keywords from a job description'
+)
+SECTION_SECONDS = REGISTRY.histogram(
+    'resume_tailor_section_seconds', 'Time spent modifying one resume section type', ['section']
+)
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    'resume_tailor_llm_call_seconds', 'Latency of a single LLM provider call', ['provider', 'stage']
+)
+COMPILE_SECONDS = REGISTRY.histogram(
+    'resume_tailor_compile_seconds', 'Latency of a single TeX engine run', ['engine', 'format', 'status']
+)
+PAGE_COUNT_SECONDS = REGISTRY.histogram(
+    'resume_tailor_page_count_seconds', 'Time spent counting PDF pages', ['method'],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+)
+COMPILE_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    'resume_tailor_compile_queue_wait_seconds', 'Time a job waited in the compile service queue', ['priority']
+)
+COMPILE_QUEUE_REJECTIONS = REGISTRY.counter(
+    'resume_tailor_compile_queue_rejections_total', 'Compile jobs rejected because the service queue was full'
+)
+COMPILE_JOBS_ABANDONED = REGISTRY.counter(
+    'resume_tailor_compile_jobs_abandoned_total', 'Queued compile jobs dropped because their client gave up', ['mode']
+)
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    'resume_tailor_admission_wait_seconds', 'Time a tailoring request waited for a job slot'
+)
+ADMISSION_REJECTIONS = REGISTRY.counter(
+    'resume_tailor_admission_rejections_total', 'Tailoring requests shed by admission control', ['reason']
+)
+SINGLEFLIGHT_CALLS = REGISTRY.counter(
+    'resume_tailor_singleflight_calls_total', 'Coalesced calls by scope; followers reused a leader result',
+    ['scope', 'role']
+)
+COVERAGE_DECISIONS = REGISTRY.counter(
+    'resume_tailor_coverage_decisions_total',
+    'Section LLM calls by keyword coverage decision (skipped, downscoped, full)', ['section', 'decision']
+)
+FALLBACKS = REGISTRY.counter(
+    'resume_tailor_fallbacks_total', 'Fallbacks taken (next provider, next engine, in-process compile, regex keywords)', ['kind']
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    'resume_tailor_cache_requests_total', 'Cache lookups by cache and result', ['cache', 'result']
+)
+LLM_RETRIES = REGISTRY.counter(
+    'resume_tailor_llm_retries_total', 'Provider calls retried after a transient failure', ['provider', 'reason']
+)
+POOL_DISPATCHES = REGISTRY.counter(
+    'resume_tailor_pool_dispatches_total', 'Provider pool calls by model and result (ok, failed, throttled)',
+    ['provider', 'model', 'result']
+)
+INPUT_LIMITS = REGISTRY.counter(
+    'resume_tailor_input_limits_total', 'Request fields truncated, condensed or rejected by input limits',
+    ['field', 'action']
+)
+PROVIDER_FAILURES = REGISTRY.counter(
+    'resume_tailor_provider_failures_total', 'LLM provider calls that returned nothing or raised', ['provider']
+)
+
+
+def render_prometheus() -> str:
+    """Render all registered metrics in Prometheus text format"""
+    return REGISTRY.render()
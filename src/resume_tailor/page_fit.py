@@ -0,0 +1,247 @@
+"""
+Page Fit Module
+
+Shrinks a tailored resume back onto a single page by repeatedly applying the
+cheapest available fix and re-measuring against the warm preamble format.
+Intermediate variants are measured with draft-mode layout probes; the full
+PDF is typeset once, when the layout is final.
+"""
+
+import os
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+from .latex_processor import LaTeXProcessor, find_command_arguments
+from .preamble_format import BEGIN_DOCUMENT
+from .compile_service import PRIORITY_HIGH
+
+logger = logging.getLogger(__name__)
+
+SPACING_MARKER = '%----PAGE FIT SPACING----'
+SPACING_FIX = (
+    '\n' + SPACING_MARKER + '\n'
+    r'\linespread{0.95}\selectfont\setlength{\parskip}{0pt}'
+    r'\makeatletter\@ifpackageloaded{enumitem}{\setlist{itemsep=0pt,parsep=0pt,topsep=1pt}}{}\makeatother'
+    '\n'
+)
+ITEM_LIST_START = r'\resumeItemListStart'
+ITEM_LIST_END = r'\resumeItemListEnd'
+
+
+class PageFitOptimizer:
+    """Applies spacing, trimming and bullet-dropping fixes until the resume fits on one page"""
+
+    # Bullets shorter than this are never trimmed
+    MIN_TRIM_LENGTH = 60
+    # Fraction of a bullet kept when trimming
+    TRIM_RATIO = 0.8
+
+    def __init__(self, latex_processor: LaTeXProcessor, max_iterations: Optional[int] = None,
+                 trim_limit_pt: Optional[float] = None, use_probes: Optional[bool] = None):
+        self.latex_processor = latex_processor
+        self.max_iterations = max_iterations if max_iterations is not None else int(
+            os.environ.get('PAGE_FIT_MAX_ITERATIONS', 5)
+        )
+        # Overflow (in points) small enough to be fixed by trimming instead of dropping a bullet
+        self.trim_limit_pt = trim_limit_pt if trim_limit_pt is not None else float(
+            os.environ.get('PAGE_FIT_TRIM_LIMIT_PT', 30)
+        )
+        # Measure candidates with -draftmode probes instead of full compiles
+        self.use_probes = use_probes if use_probes is not None else os.environ.get('PAGE_FIT_PROBES', '1') != '0'
+
+    def fit_to_one_page(self, latex_content: str, keywords: List[str],
+                        pdf_result: Optional[Dict] = None) -> Dict:
+        """
+        Fit latex_content onto one page within the iteration budget.
+
+        Returns:
+            Dict with keys: 'latex_content', 'pdf_result', 'fitted',
+            'iterations' (per-iteration fix, page count and seconds) and 'total_seconds'
+        """
+        start_time = time.perf_counter()
+        if pdf_result is None:
+            pdf_result = self.latex_processor.compile_latex(latex_content)
+
+        # pdf_result always belongs to compiled_latex; probes move latex_content ahead of it
+        compiled_latex = latex_content
+        probed_only = False
+        page_count = pdf_result['page_count'] if pdf_result else None
+        layout = (pdf_result or {}).get('layout') or {}
+
+        iterations = []
+        while page_count is not None and page_count > 1 and len(iterations) < self.max_iterations:
+            fix, candidate = self.apply_cheapest_fix(latex_content, keywords, layout.get('overflow_pt'))
+            if candidate is None:
+                logger.info("Page fit: no applicable fix left")
+                break
+
+            iteration_start = time.perf_counter()
+            # Finishing a request already in flight beats starting a new one
+            probe = self.latex_processor.probe_layout(candidate, priority=PRIORITY_HIGH) if self.use_probes else None
+            candidate_result = None
+            if probe is None:
+                candidate_result = self.latex_processor.compile_latex(candidate, priority=PRIORITY_HIGH)
+            elapsed = time.perf_counter() - iteration_start
+
+            if probe is not None:
+                candidate_pages = probe['page_count']
+            else:
+                candidate_pages = candidate_result['page_count'] if candidate_result else None
+            iterations.append({
+                'iteration': len(iterations) + 1,
+                'fix': fix,
+                'page_count': candidate_pages,
+                'probe': probe is not None,
+                'seconds': round(elapsed, 3)
+            })
+            logger.info("Page fit iteration %d: %s -> %s pages in %.2fs (%s)", len(iterations), fix,
+                        candidate_pages, elapsed, 'probe' if probe is not None else 'full compile')
+
+            if probe is not None:
+                latex_content, page_count, layout = candidate, probe['page_count'], probe
+                probed_only = True
+            elif candidate_result is not None:
+                latex_content = compiled_latex = candidate
+                probed_only = False
+                pdf_result = candidate_result
+                page_count = candidate_result['page_count']
+                layout = candidate_result.get('layout') or {}
+            else:
+                break
+
+        # Typeset the final layout once, if only probes have seen it
+        if probed_only:
+            final_result = self.latex_processor.compile_latex(latex_content, priority=PRIORITY_HIGH)
+            if final_result is not None:
+                compiled_latex, pdf_result = latex_content, final_result
+            else:
+                logger.warning("Page fit: final compile failed, keeping the last compiled variant")
+
+        return {
+            'latex_content': compiled_latex,
+            'pdf_result': pdf_result,
+            'fitted': bool(pdf_result and pdf_result['page_count'] == 1),
+            'iterations': iterations,
+            'total_seconds': round(time.perf_counter() - start_time, 3)
+        }
+
+    def apply_cheapest_fix(self, latex_content: str, keywords: List[str],
+                           overflow_pt: Optional[float]) -> Tuple[Optional[str], Optional[str]]:
+        """Return (fix name, modified LaTeX) for the cheapest fix that still applies"""
+        if SPACING_MARKER not in latex_content:
+            tightened = self.tighten_spacing(latex_content)
+            if tightened is not None:
+                return 'tighten_spacing', tightened
+
+        small_overflow = overflow_pt is not None and overflow_pt <= self.trim_limit_pt
+        if small_overflow:
+            fixes = [('trim_longest_bullet', self.trim_longest_bullet),
+                     ('drop_lowest_ranked_bullet', self.drop_lowest_ranked_bullet)]
+        else:
+            fixes = [('drop_lowest_ranked_bullet', self.drop_lowest_ranked_bullet),
+                     ('trim_longest_bullet', self.trim_longest_bullet)]
+
+        for name, fix in fixes:
+            candidate = fix(latex_content, keywords)
+            if candidate is not None:
+                return name, candidate
+        return None, None
+
+    def tighten_spacing(self, latex_content: str, keywords: List[str] = None) -> Optional[str]:
+        """Tighten line spread and list spacing right after \\begin{document}"""
+        index = latex_content.find(BEGIN_DOCUMENT)
+        if index == -1:
+            return None
+        index += len(BEGIN_DOCUMENT)
+        return latex_content[:index] + SPACING_FIX + latex_content[index:]
+
+    def trim_longest_bullet(self, latex_content: str, keywords: List[str] = None) -> Optional[str]:
+        """Shorten the longest \\resumeItem to a clause or word boundary"""
+        bullets = sorted(self._bullets(latex_content), key=lambda b: b[1] - b[0], reverse=True)
+        for arg_start, arg_end in bullets:
+            trimmed = self._trim_text(latex_content[arg_start:arg_end])
+            if trimmed is not None:
+                return latex_content[:arg_start] + trimmed + latex_content[arg_end:]
+        return None
+
+    def drop_lowest_ranked_bullet(self, latex_content: str, keywords: List[str] = None) -> Optional[str]:
+        """Remove the bullet matching the fewest keywords from a list that keeps at least one item"""
+        lowered_keywords = [kw.lower() for kw in (keywords or []) if kw]
+        list_spans = self._item_list_spans(latex_content)
+        bullets = self._bullet_matches(latex_content)
+
+        candidates = []
+        for start, end, (arg_start, arg_end) in bullets:
+            span = next((s for s in list_spans if s[0] < start < s[1]), None)
+            if span is None:
+                continue
+            siblings = sum(1 for other in bullets if span[0] < other[0] < span[1])
+            if siblings < 2:
+                continue
+            text = latex_content[arg_start:arg_end].lower()
+            score = sum(1 for kw in lowered_keywords if kw in text)
+            # Lowest score first; among ties prefer the later (less prominent) bullet
+            candidates.append((score, -start, start, end))
+
+        if not candidates:
+            return None
+
+        _, _, start, end = min(candidates)
+        line_start = latex_content.rfind('\n', 0, start) + 1
+        if latex_content[line_start:start].strip() == '':
+            start = line_start
+            if end < len(latex_content) and latex_content[end] == '\n':
+                end += 1
+        return latex_content[:start] + latex_content[end:]
+
+    def _bullet_matches(self, latex_content: str) -> List[Tuple[int, int, Tuple[int, int]]]:
+        """Return (start, end, argument span) of each \\resumeItem in the document body"""
+        body_start = max(latex_content.find(BEGIN_DOCUMENT), 0)
+        return [(start, end, spans[0])
+                for start, end, spans in find_command_arguments(latex_content, 'resumeItem')
+                if start > body_start]
+
+    def _bullets(self, latex_content: str) -> List[Tuple[int, int]]:
+        return [span for _, _, span in self._bullet_matches(latex_content)]
+
+    def _item_list_spans(self, latex_content: str) -> List[Tuple[int, int]]:
+        spans = []
+        start = latex_content.find(ITEM_LIST_START)
+        while start != -1:
+            end = latex_content.find(ITEM_LIST_END, start)
+            if end == -1:
+                break
+            spans.append((start, end))
+            start = latex_content.find(ITEM_LIST_START, end)
+        return spans
+
+    def _trim_text(self, text: str) -> Optional[str]:
+        """Cut text at the last top-level clause (or word) boundary within the trim ratio"""
+        if len(text) < self.MIN_TRIM_LENGTH:
+            return None
+
+        target = int(len(text) * self.TRIM_RATIO)
+        floor = len(text) // 2
+        clause_cut = word_cut = None
+        depth = 0
+        i = 0
+        while i < len(text) and i <= target:
+            char = text[i]
+            if char == '\\':
+                i += 2
+                continue
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+            elif depth == 0 and i >= floor:
+                if char in ',;':
+                    clause_cut = i
+                elif char == ' ':
+                    word_cut = i
+            i += 1
+
+        cut = clause_cut if clause_cut is not None else word_cut
+        if cut is None:
+            return None
+        return text[:cut].rstrip(' ,;:') + '.'
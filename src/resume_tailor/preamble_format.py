@@ -0,0 +1,213 @@
+"""
+Preamble Format Module
+
+Caches precompiled ("warm") LaTeX formats for resume preambles so repeated
+compilations of the same template skip re-reading packages and fonts.
+
+Requests never wait for a format: a preamble without one compiles cold while
+a single background builder dumps its format from a small bounded queue, so
+one-off resumes pay nothing extra and a burst of new preambles cannot start
+an unbounded number of TeX processes. The cache is capped in size, evicting
+the least recently used formats, and a failed build is retried after a while
+rather than never.
+"""
+
+import os
+import time
+import queue
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from .compile_runner import CompileRunner
+from .metrics import CACHE_REQUESTS
+
+# Files a build leaves behind for one format
+FORMAT_SUFFIXES = ('.fmt', '.tex', '.log')
+
+logger = logging.getLogger(__name__)
+
+BEGIN_DOCUMENT = r'\begin{document}'
+
+
+def split_preamble(latex_content: str) -> Tuple[str, str]:
+    """Split LaTeX content into (preamble, body) at the first \\begin{document}"""
+    index = latex_content.find(BEGIN_DOCUMENT)
+    if index == -1:
+        return '', latex_content
+    return latex_content[:index], latex_content[index:]
+
+
+def preamble_hash(latex_content: str) -> Optional[str]:
+    """Return a stable hash of the document preamble, or None if there is none"""
+    preamble, _ = split_preamble(latex_content)
+    if not preamble.strip():
+        return None
+    return hashlib.sha256(preamble.encode('utf-8')).hexdigest()[:16]
+
+
+class PreambleFormatCache:
+    """Builds and caches pdflatex formats dumped from resume preambles via mylatexformat"""
+
+    def __init__(self, cache_dir: Optional[str] = None, engine: str = 'pdflatex',
+                 runner: Optional[CompileRunner] = None):
+        if cache_dir is None:
+            cache_dir = os.environ.get(
+                'FORMAT_CACHE_DIR',
+                os.path.join(os.environ.get('TEMP_DIR', 'temp'), 'formats')
+            )
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.engine = engine
+        self.runner = runner or CompileRunner()
+        self.enabled = os.environ.get('WARM_FORMAT_ENABLED', '1') != '0'
+        self.max_bytes = int(float(os.environ.get('FORMAT_CACHE_MAX_MB', 512)) * 1024 * 1024)
+        # Seconds before a preamble whose build failed (timeout, OOM, bad package) is tried again
+        self.retry_after = float(os.environ.get('FORMAT_RETRY_AFTER', 600))
+        self._failures: Dict[str, float] = {}
+        self._pending = set()
+        self._queue: queue.Queue = queue.Queue(maxsize=int(os.environ.get('FORMAT_BUILD_QUEUE_SIZE', 8)))
+        self._builder: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def format_env(self) -> Dict[str, str]:
+        """Environment that lets TeX find formats stored in the cache directory"""
+        env = os.environ.copy()
+        # A trailing separator keeps the default kpathsea search path
+        env['TEXFORMATS'] = self.cache_dir + os.pathsep + env.get('TEXFORMATS', '')
+        return env
+
+    def get_format(self, latex_content: str) -> Optional[str]:
+        """
+        Return the format name for the document's preamble if it is already built.
+
+        Never blocks on a build: a missing format is queued for the background
+        builder and None is returned, so the caller compiles cold this time.
+        """
+        if not self.enabled:
+            return None
+
+        fmt_name = preamble_hash(latex_content)
+        if fmt_name is None:
+            return None
+
+        fmt_path = os.path.join(self.cache_dir, f'{fmt_name}.fmt')
+        try:
+            # The mtime doubles as last use, for least-recently-used eviction
+            os.utime(fmt_path)
+            CACHE_REQUESTS.inc(cache='warm_format', result='hit')
+            return fmt_name
+        except FileNotFoundError:
+            pass
+
+        CACHE_REQUESTS.inc(cache='warm_format', result='miss')
+        self.schedule(latex_content)
+        return None
+
+    def schedule(self, latex_content: str) -> bool:
+        """Queue a background build of the document's format; False if skipped or the queue is full"""
+        fmt_name = preamble_hash(latex_content) if self.enabled else None
+        if fmt_name is None or os.path.exists(os.path.join(self.cache_dir, f'{fmt_name}.fmt')):
+            return False
+        with self._lock:
+            failed_at = self._failures.get(fmt_name)
+            if fmt_name in self._pending or (failed_at is not None and time.time() - failed_at < self.retry_after):
+                return False
+            try:
+                self._queue.put_nowait((fmt_name, latex_content))
+            except queue.Full:
+                logger.info("Warm format queue is full, not building %s", fmt_name)
+                return False
+            self._pending.add(fmt_name)
+            if self._builder is None or not self._builder.is_alive():
+                self._builder = threading.Thread(target=self._build_forever, name='format-builder', daemon=True)
+                self._builder.start()
+        return True
+
+    def build(self, latex_content: str) -> Optional[str]:
+        """Build the document's format now (the background builder and benchmarks use this)"""
+        fmt_name = preamble_hash(latex_content)
+        if fmt_name is None:
+            return None
+        if os.path.exists(os.path.join(self.cache_dir, f'{fmt_name}.fmt')):
+            return fmt_name
+        if not self._build_format(fmt_name, latex_content):
+            with self._lock:
+                self._record_failure(fmt_name)
+            return None
+        with self._lock:
+            self._failures.pop(fmt_name, None)
+        self.prune()
+        return fmt_name
+
+    def prune(self) -> int:
+        """Evict least recently used formats until the cache fits in FORMAT_CACHE_MAX_MB"""
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.fmt')]
+        except FileNotFoundError:
+            return 0
+        stats = []
+        for entry in entries:
+            try:
+                stats.append((entry.stat().st_mtime, entry.stat().st_size, entry.name[:-len('.fmt')]))
+            except FileNotFoundError:
+                pass
+        total = sum(size for _, size, _ in stats)
+        removed = 0
+        for _, size, fmt_name in sorted(stats):
+            if total <= self.max_bytes:
+                break
+            # A compile that already opened the format keeps reading it after the unlink
+            for suffix in FORMAT_SUFFIXES:
+                try:
+                    os.unlink(os.path.join(self.cache_dir, fmt_name + suffix))
+                except FileNotFoundError:
+                    pass
+            total -= size
+            removed += 1
+        if removed:
+            logger.info("Evicted %d warm format(s) to stay under %d MB", removed, self.max_bytes // (1024 * 1024))
+        return removed
+
+    def _build_forever(self):
+        while True:
+            fmt_name, latex_content = self._queue.get()
+            try:
+                self.build(latex_content)
+            except Exception:
+                logger.exception("Warm format build crashed for %s", fmt_name)
+                with self._lock:
+                    self._record_failure(fmt_name)
+            finally:
+                with self._lock:
+                    self._pending.discard(fmt_name)
+                self._queue.task_done()
+
+    def _record_failure(self, fmt_name: str):
+        now = time.time()
+        self._failures[fmt_name] = now
+        # Forget failures whose retry window has passed, so the table stays small
+        for name in [name for name, failed_at in self._failures.items() if now - failed_at >= self.retry_after]:
+            del self._failures[name]
+
+    def _build_format(self, fmt_name: str, latex_content: str) -> bool:
+        """Dump the preamble of latex_content into <cache_dir>/<fmt_name>.fmt"""
+        preamble, _ = split_preamble(latex_content)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        source_file = os.path.join(self.cache_dir, f'{fmt_name}.tex')
+        with open(source_file, 'w', encoding='utf-8') as f:
+            f.write(preamble)
+            f.write(BEGIN_DOCUMENT + '\n\\end{document}\n')
+
+        logger.info("Building warm format %s", fmt_name)
+        result = self.runner.run(
+            [self.engine, '-ini', '-interaction=nonstopmode', '-no-shell-escape', f'-jobname={fmt_name}',
+             f'&{self.engine}', 'mylatexformat.ltx', source_file],
+            cwd=self.cache_dir
+        )
+
+        fmt_path = os.path.join(self.cache_dir, f'{fmt_name}.fmt')
+        if not result.ok or not os.path.exists(fmt_path):
+            logger.warning("Warm format build failed for %s: %s", fmt_name, result)
+            return False
+        return True
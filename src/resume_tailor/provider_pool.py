@@ -0,0 +1,201 @@
+"""
+Provider Pool Module
+
+Spreads one vendor's LLM calls over several API keys and models. The pool is
+configured from env lists: <PREFIX>_API_KEYS holds the keys and <PREFIX>_MODELS
+the models, each optionally weighted and pinned to pipeline stages:
+
+    OPENROUTER_MODELS="qwen/qwen3-coder:free*3, meta-llama/llama-3.3-8b-instruct:free@skills|keywords"
+
+Every key is paired with every model. Members that name a stage serve it
+first, so cheap stages can go to fast small models. A call goes to the best
+member by smooth weighted round-robin (or least-loaded), skipping keys that
+are out of per-minute quota or cooling down after a 429. A failed member
+hands over to one holding a different key before the pool gives up.
+"""
+
+import os
+import time
+import threading
+import collections
+import logging
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .metrics import POOL_DISPATCHES
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ('weighted', 'least_loaded')
+# Cooldown for a key that hit its vendor rate limit without a Retry-After
+DEFAULT_THROTTLE_SECONDS = 30.0
+
+
+class KeyQuota:
+    """Requests-per-minute window and 429 cooldown for one API key
+
+    Not locked itself; it is only touched under the owning pool's lock.
+    """
+
+    __slots__ = ('rpm', 'window', 'blocked_until')
+
+    def __init__(self, rpm: int = 0):
+        # 0 means the key has no local per-minute limit
+        self.rpm = rpm
+        self.window: collections.deque = collections.deque()
+        self.blocked_until = 0.0
+
+    def available(self, now: float) -> bool:
+        if now < self.blocked_until:
+            return False
+        if not self.rpm:
+            return True
+        while self.window and now - self.window[0] >= 60.0:
+            self.window.popleft()
+        return len(self.window) < self.rpm
+
+    def record(self, now: float):
+        if self.rpm:
+            self.window.append(now)
+
+    def throttle(self, seconds: Optional[float], now: float):
+        self.blocked_until = max(self.blocked_until, now + (seconds or DEFAULT_THROTTLE_SECONDS))
+
+
+class PoolMember:
+    """One (key, model) pairing and its dispatch state"""
+
+    __slots__ = ('provider', 'model', 'key_id', 'quota', 'weight', 'stages', 'in_flight', 'current', 'dispatched')
+
+    def __init__(self, provider, model: str, key_id: str, quota: KeyQuota,
+                 weight: int = 1, stages: Sequence[str] = ()):
+        self.provider = provider
+        self.model = model
+        self.key_id = key_id
+        self.quota = quota
+        self.weight = max(1, weight)
+        self.stages = frozenset(stages)
+        self.in_flight = 0
+        # Smooth weighted round-robin credit
+        self.current = 0
+        self.dispatched = 0
+
+
+def parse_models(spec: str) -> List[Tuple[str, int, Tuple[str, ...]]]:
+    """Parse "model*weight@stage|stage, ..." into (model, weight, stages) entries"""
+    entries = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        item, _, stages = item.partition('@')
+        model, _, weight = item.partition('*')
+        entries.append((
+            model.strip(),
+            int(weight) if weight.strip() else 1,
+            tuple(stage.strip() for stage in stages.split('|') if stage.strip()),
+        ))
+    return entries
+
+
+class ProviderPool:
+    """Dispatches calls for one vendor across its keys and models"""
+
+    def __init__(self, name: str, members: List[PoolMember], strategy: Optional[str] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.members = members
+        self.strategy = strategy or os.environ.get('LLM_POOL_STRATEGY', 'weighted')
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"LLM_POOL_STRATEGY must be one of {', '.join(STRATEGIES)}")
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        return any(member.provider.is_available() for member in self.members)
+
+    def call_api(self, messages: List[Dict], temperature: float = 0.3, stage: str = 'other',
+                 json_mode: bool = False) -> Optional[str]:
+        """Call the best member, moving to another key when one fails"""
+        failed_keys: Set[str] = set()
+        while True:
+            member = self._acquire(stage, failed_keys)
+            if member is None:
+                if not failed_keys:
+                    logger.warning("%s: every key is out of quota or cooling down", self.name)
+                    POOL_DISPATCHES.inc(provider=self.name, model='-', result='throttled')
+                return None
+            try:
+                result = member.provider.call_api(messages, temperature, json_mode)
+            finally:
+                with self._lock:
+                    member.in_flight -= 1
+            POOL_DISPATCHES.inc(provider=self.name, model=member.model, result='ok' if result else 'failed')
+            if result:
+                return result
+            failed_keys.add(member.key_id)
+
+    def throttle(self, key_id: str, seconds: Optional[float]):
+        """Pause a key after its vendor rate-limited it"""
+        with self._lock:
+            for member in self.members:
+                if member.key_id == key_id:
+                    member.quota.throttle(seconds, self._clock())
+                    break
+        logger.info("%s: key %s rate limited, pausing it", self.name, key_id)
+
+    def _acquire(self, stage: str, failed_keys: Set[str]) -> Optional[PoolMember]:
+        with self._lock:
+            now = self._clock()
+            usable = [
+                member for member in self.members
+                if member.key_id not in failed_keys and member.provider.is_available() and member.quota.available(now)
+            ]
+            # Members pinned to this stage go first; unpinned members serve every stage
+            candidates = [member for member in usable if stage in member.stages]
+            if not candidates:
+                candidates = [member for member in usable if not member.stages]
+            if not candidates:
+                return None
+
+            member = self._choose(candidates)
+            member.quota.record(now)
+            member.in_flight += 1
+            member.dispatched += 1
+            return member
+
+    def _choose(self, candidates: List[PoolMember]) -> PoolMember:
+        if self.strategy == 'least_loaded':
+            return min(candidates, key=lambda m: (m.in_flight / m.weight, m.dispatched / m.weight))
+        # Smooth weighted round-robin: interleaves picks in proportion to weight
+        total = 0
+        best = None
+        for member in candidates:
+            member.current += member.weight
+            total += member.weight
+            if best is None or member.current > best.current:
+                best = member
+        best.current -= total
+        return best
+
+
+def build_pool(name: str, prefix: str, factory: Callable[..., object], default_model: str) -> ProviderPool:
+    """Pool of factory(api_key=..., model=..., on_throttle=...) providers from <PREFIX>_* settings"""
+    keys = [key.strip() for key in os.environ.get(f'{prefix}_API_KEYS', '').split(',') if key.strip()]
+    if not keys:
+        # A missing key still yields one unavailable member, as a single provider did
+        keys = [os.environ.get(f'{prefix}_API_KEY')]
+    models = parse_models(os.environ.get(f'{prefix}_MODELS', '')) or [(default_model, 1, ())]
+    rpm = int(os.environ.get(f'{prefix}_KEY_RPM', 0))
+
+    pool = ProviderPool(name, [])
+    for index, api_key in enumerate(keys):
+        key_id = f'{prefix.lower()}-{index}'
+        quota = KeyQuota(rpm)
+
+        def on_throttle(seconds, key_id=key_id):
+            pool.throttle(key_id, seconds)
+
+        for model, weight, stages in models:
+            provider = factory(api_key=api_key, model=model, on_throttle=on_throttle)
+            pool.members.append(PoolMember(provider, model, key_id, quota, weight, stages))
+    return pool
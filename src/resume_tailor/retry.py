@@ -0,0 +1,115 @@
+"""
+Retry Module
+
+Per-provider retry policies for LLM calls. A transient failure (429, 5xx
+gateway errors, a connection that never reached the server) is retried with
+exponential backoff and full jitter, waiting at least as long as the
+provider's Retry-After asks. All attempts share one deadline, so a provider
+that keeps failing still hands over to the next one in time.
+"""
+
+import os
+import time
+import random
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, TypeVar
+
+from .metrics import LLM_RETRIES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Statuses where the request was not processed (or safely can be again)
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class RetryableError(Exception):
+    """A provider call failed in a way that is safe to retry"""
+
+    def __init__(self, message: str, reason: str = 'connection', retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def raise_for_transient(status_code: int, headers, provider: str):
+    """Raise RetryableError for statuses worth retrying; other errors are left to the caller"""
+    if status_code in RETRY_STATUSES:
+        retry_after = parse_retry_after(headers.get('Retry-After') if headers is not None else None)
+        raise RetryableError(f"{provider} returned HTTP {status_code}", str(status_code), retry_after)
+
+
+def _setting(prefix: str, name: str, default: float) -> float:
+    value = os.environ.get(f'{prefix}_RETRY_{name}') or os.environ.get(f'LLM_RETRY_{name}')
+    return float(value) if value else default
+
+
+class RetryPolicy:
+    """Bounded retries with exponential backoff, jitter and an overall deadline"""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 deadline: float = 45.0, timeout: float = 30.0,
+                 sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.monotonic):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Budget for all attempts and waits of one call
+        self.deadline = deadline
+        # Cap on a single attempt; shortened as the deadline approaches
+        self.timeout = timeout
+        self._sleep = sleep
+        self._clock = clock
+
+    @classmethod
+    def from_env(cls, prefix: str) -> 'RetryPolicy':
+        """Policy from <PREFIX>_RETRY_* settings, falling back to LLM_RETRY_* and the defaults"""
+        return cls(
+            attempts=int(_setting(prefix, 'ATTEMPTS', 3)),
+            base_delay=_setting(prefix, 'BASE_DELAY', 0.5),
+            max_delay=_setting(prefix, 'MAX_DELAY', 8.0),
+            deadline=_setting(prefix, 'DEADLINE', 45.0),
+            timeout=_setting(prefix, 'TIMEOUT', 30.0),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number attempt (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def call(self, provider: str, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run func(*args, timeout=..., **kwargs), retrying RetryableError within the deadline"""
+        give_up_at = self._clock() + self.deadline
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = give_up_at - self._clock()
+            try:
+                return func(*args, timeout=max(0.1, min(self.timeout, remaining)), **kwargs)
+            except RetryableError as e:
+                delay = self.backoff(attempt)
+                if e.retry_after is not None:
+                    delay = max(delay, e.retry_after)
+                remaining = give_up_at - self._clock()
+                if attempt >= self.attempts or delay >= remaining:
+                    logger.warning("%s: giving up after %d attempt(s): %s", provider, attempt, e)
+                    raise
+                LLM_RETRIES.inc(provider=provider, reason=e.reason)
+                logger.info("%s: %s, retrying in %.2fs (attempt %d of %d)",
+                            provider, e, delay, attempt + 1, self.attempts)
+                self._sleep(delay)
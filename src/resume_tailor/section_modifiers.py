@@ -5,59 +5,168 @@ Handles modification of different resume sections (experience, skills, projects)
 using AI with threading support.
 """
 
+import os
+import re
+import json
 import time
-import threading
-from typing import List, Dict
+import logging
+from typing import List, Dict, Optional, Tuple
 from .api_providers import APIManager
+from .coverage import CoverageAnalyzer
+from .latex_processor import find_command_arguments, match_brace
+from .logging_config import LazyPreview, start_thread
+from .metrics import SECTION_SECONDS, COVERAGE_DECISIONS
+
+logger = logging.getLogger(__name__)
+
+# Markdown wrappers models put around LaTeX answers
+OPENING_FENCE_PATTERN = re.compile(r'^```(?:latex)?\s*', re.IGNORECASE)
+CLOSING_FENCE_PATTERN = re.compile(r'\s*```$')
+NEWLINES_PATTERN = re.compile(r'\n+')
+LEADING_BACKTICKS_PATTERN = re.compile(r'^`+')
+TRAILING_BACKTICKS_PATTERN = re.compile(r'`+$')
+# Structure a bullet patch must never introduce
+STRUCTURAL_COMMAND_PATTERN = re.compile(r'\\(?:resumeItem|resumeSubheading|item|begin|end|section)(?![A-Za-z])')
+# A backslash and what follows it inside a JSON answer: a JSON escape, or a bare LaTeX command/escape
+JSON_BACKSLASH_PATTERN = re.compile(r'\\(u[0-9a-fA-F]{4}|[A-Za-z]{2,}|.)', re.DOTALL)
+JSON_ESCAPES = frozenset('"\\/bfnrt')
+LATEX_COMMAND_PATTERN = re.compile(r'\\([A-Za-z]+)')
+
+EDIT_MODES = ('rewrite', 'patch')
+
+
+def indexed_bullets(section: str) -> List[Tuple[int, int]]:
+    """Offsets of the text inside each \\resumeItem{...} of a section, in order"""
+    return [spans[0] for _, _, spans in find_command_arguments(section, 'resumeItem')]
+
+
+def _escape_latex_backslashes(raw: str, commands: frozenset = frozenset()) -> str:
+    """Double backslashes the model left unescaped, so \\textbf does not decode as a tab"""
+    def escape(match):
+        token = match.group(1)
+        if token in JSON_ESCAPES or (token[0] == 'u' and len(token) == 5):
+            return match.group(0)
+        if len(token) > 1 and token[0] in JSON_ESCAPES and token not in commands:
+            # A valid escape before a word, like \nDeveloped: only a command the section
+            # already uses is read as LaTeX
+            return match.group(0)
+        return '\\\\' + token
+    return JSON_BACKSLASH_PATTERN.sub(escape, raw)
+
+
+def parse_bullet_patch(content: str, count: int, section: str = '') -> Dict[int, str]:
+    """
+    Read a {index: new_text} patch from a model answer.
+
+    Entries with an unknown index, or text that would change the LaTeX
+    structure (unbalanced braces, new items or environments), are dropped.
+    Pass the original section so its LaTeX commands are recognised when
+    the model forgot to escape them for JSON.
+    """
+    start = content.find('{')
+    end = content.rfind('}')
+    if start == -1 or end < start:
+        raise ValueError("no JSON object in the answer")
+    commands = frozenset(LATEX_COMMAND_PATTERN.findall(section))
+    patch = json.loads(_escape_latex_backslashes(content[start:end + 1], commands))
+    if not isinstance(patch, dict):
+        raise ValueError("patch is not a JSON object")
+
+    bullets = {}
+    for key, text in patch.items():
+        try:
+            index = int(key)
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= index < count or not isinstance(text, str) or not text.strip():
+            continue
+        if STRUCTURAL_COMMAND_PATTERN.search(text) or not _braces_balanced(text):
+            logger.warning("Dropping patch for bullet %d: it would change the LaTeX structure", index)
+            continue
+        bullets[index] = text.strip()
+    return bullets
+
+
+def _braces_balanced(text: str) -> bool:
+    wrapped = '{' + text + '}'
+    return match_brace(wrapped, 0) == len(wrapped) - 1
+
+
+def apply_bullet_patch(section: str, spans: List[Tuple[int, int]], patch: Dict[int, str]) -> str:
+    """Replace the patched bullets' text, leaving everything else byte-for-byte intact"""
+    pieces = []
+    last = 0
+    for index, (start, end) in enumerate(spans):
+        if index in patch:
+            pieces.append(section[last:start])
+            pieces.append(patch[index])
+            last = end
+    pieces.append(section[last:])
+    return ''.join(pieces)
 
 
 class SectionModifier:
     """Base class for section modifiers"""
     
-    def __init__(self, api_manager: APIManager):
+    def __init__(self, api_manager: APIManager, coverage: Optional[CoverageAnalyzer] = None,
+                 edit_mode: Optional[str] = None):
         self.api_manager = api_manager
+        self.coverage = coverage or CoverageAnalyzer()
+        # rewrite: the model returns whole sections; patch: only changed experience bullets, as JSON
+        self.edit_mode = edit_mode or os.environ.get('SECTION_EDIT_MODE', 'rewrite')
+        if self.edit_mode not in EDIT_MODES:
+            raise ValueError(f"SECTION_EDIT_MODE must be one of {', '.join(EDIT_MODES)}")
+    
+    def _keywords_to_add(self, section: str, content: str, keywords: List[str],
+                         savings: Optional[Dict[str, int]]) -> Optional[List[str]]:
+        """Keywords the LLM still has to work into a section, or None to skip its call"""
+        to_add = self.coverage.keywords_to_add(content, keywords)
+        if to_add is None:
+            COVERAGE_DECISIONS.inc(section=section, decision='skipped')
+            if savings is not None:
+                savings[section] = savings.get(section, 0) + 1
+        else:
+            COVERAGE_DECISIONS.inc(section=section, decision='downscoped' if len(to_add) < len(keywords) else 'full')
+        return to_add
     
     def _clean_ai_response(self, content: str) -> str:
         """Clean AI response by removing markdown formatting and extra whitespace"""
         if not content:
             return content
         
-        original_content = content
-        print(f"🔍 Cleaning AI response - Original length: {len(content)}")
-        print(f"🔍 Original content preview: {content[:100]}...")
+        logger.debug("🔍 Cleaning AI response (%d chars): %s", len(content), LazyPreview(content, 100))
         
         # Remove markdown code blocks
         content = content.strip()
         
         # Remove ```latex and ``` markers (case insensitive)
-        import re
-        
-        # Remove starting code blocks
-        content = re.sub(r'^```(?:latex|LaTeX|LATEX)?\s*', '', content, flags=re.IGNORECASE)
-        
-        # Remove ending code blocks
-        content = re.sub(r'\s*```$', '', content)
+        content = OPENING_FENCE_PATTERN.sub('', content)
+        content = CLOSING_FENCE_PATTERN.sub('', content)
         
         # Remove leading/trailing whitespace
         content = content.strip()
         
         # Normalize newlines - replace multiple newlines with single newlines
-        content = re.sub(r'\n+', '\n', content)
+        content = NEWLINES_PATTERN.sub('\n', content)
         
         # Remove any remaining markdown artifacts
-        content = re.sub(r'^`+', '', content)  # Remove leading backticks
-        content = re.sub(r'`+$', '', content)  # Remove trailing backticks
+        content = LEADING_BACKTICKS_PATTERN.sub('', content)
+        content = TRAILING_BACKTICKS_PATTERN.sub('', content)
         
         cleaned_content = content.strip()
-        print(f"✅ Cleaned content length: {len(cleaned_content)}")
-        print(f"✅ Cleaned content preview: {cleaned_content[:100]}...")
+        logger.debug("✅ Cleaned content (%d chars): %s", len(cleaned_content), LazyPreview(cleaned_content, 100))
         
         return cleaned_content
     
-    def modify_experience_sections(self, experience_content: List[str], keywords: List[str]) -> List[str]:
-        """Modify experience sections to include keywords using general experience markers"""
-        start_time = time.time()
-        
+    @SECTION_SECONDS.time(section='experiences')
+    def modify_experience_sections(self, experience_content: List[str], keywords: List[str],
+                                   savings: Optional[Dict[str, int]] = None) -> List[str]:
+        """Modify experience sections to include keywords using general experience markers
+
+        Experiences that already mention enough of the keywords are kept without an LLM call;
+        the others are only asked for the keywords they are missing. In patch mode the model
+        returns only the changed bullets, which are spliced into the original section.
+        """
         # Check if any API provider is available
         if not self.api_manager.has_any_provider():
             return experience_content
@@ -66,9 +175,20 @@ class SectionModifier:
         
         # Process each experience marker
         for i, experience_text in enumerate(experience_content):
+            missing_keywords = self._keywords_to_add('experiences', experience_text, keywords, savings)
+            if missing_keywords is None:
+                logger.info("⏭️ Experience %d already covers the keywords, skipping LLM call", i + 1)
+                modified_experiences.append(experience_text)
+                continue
+            
+            if self.edit_mode == 'patch':
+                spans = indexed_bullets(experience_text)
+                if spans:
+                    modified_experiences.append(self._patch_experience(i, experience_text, spans, missing_keywords))
+                    continue
             
             prompt = f"""
-You are a resume optimization expert. Modify ONLY the experience content in the LATEX code below to subtly incorporate these keywords: {keywords}
+You are a resume optimization expert. Modify ONLY the experience content in the LATEX code below to subtly incorporate these keywords: {missing_keywords}
 YOU DONT HAVE TO ADD ALL THE KEYWORDS, YOU CAN ADD SOME OF THEM THAT ARE RELEVANT TO THE EXPERIENCE.
 
 RULES:
@@ -96,7 +216,7 @@ Return the complete modified experience section content, IT IS VERY IMPORTANT YO
             
             try:
                 messages = [{"role": "user", "content": prompt}]
-                content = self.api_manager.call_with_fallback(messages, temperature=0.3)
+                content = self.api_manager.call_with_fallback(messages, temperature=0.3, stage='experience')
                 
                 if not content:
                     modified_experiences.append(experience_text) # Keep original if no modification
@@ -107,19 +227,58 @@ Return the complete modified experience section content, IT IS VERY IMPORTANT YO
                 modified_experiences.append(modified_content)
                 
             except Exception as e:
-                print(f"Error modifying experience {i+1}: {e}")
+                logger.error("Error modifying experience %d: %s", i + 1, e)
                 modified_experiences.append(experience_text) # Keep original on error
         
-        end_time = time.time()
-        print(f"  📝 Experience modification: {end_time - start_time:.2f}s")
         return modified_experiences
     
-    def modify_skills_section(self, skills_content: str, keywords: List[str]) -> str:
+    def _patch_experience(self, i: int, experience_text: str, spans: List[Tuple[int, int]],
+                          keywords: List[str]) -> str:
+        """Ask only for the changed bullets of one experience and splice them in locally"""
+        bullets = '\n'.join(f"{index}: {experience_text[start:end]}" for index, (start, end) in enumerate(spans))
+        prompt = f"""
+You are a resume optimization expert. Below are the numbered bullet points of one experience, in LaTeX.
+Rewrite ONLY the bullets where it reads naturally to subtly incorporate some of these keywords: {keywords}
+
+RULES:
+1. Return a JSON object mapping the bullet number to its new text, for changed bullets only, e.g. {{"0": "new text"}}
+2. Leave out bullets you do not change. Return {{}} if no bullet should change
+3. Keep LaTeX inline formatting such as \\textbf{{...}} and escapes such as \\% in the text
+4. Each bullet must stay under 180 characters
+5. Prioritize semantic relevance and fluency over keyword stuffing
+6. Return ONLY the JSON object, nothing else
+
+BULLETS:
+{bullets}
+"""
+        try:
+            messages = [{"role": "user", "content": prompt}]
+            content = self.api_manager.call_with_fallback(messages, temperature=0.3, stage='experience', json_mode=True)
+            if not content:
+                return experience_text
+            
+            patch = parse_bullet_patch(self._clean_ai_response(content), len(spans), experience_text)
+            logger.info("🩹 Experience %d: patched %d of %d bullets", i + 1, len(patch), len(spans))
+            return apply_bullet_patch(experience_text, spans, patch)
+        except Exception as e:
+            logger.error("Error patching experience %d: %s", i + 1, e)
+            return experience_text
+    
+    @SECTION_SECONDS.time(section='skills')
+    def modify_skills_section(self, skills_content: str, keywords: List[str],
+                              savings: Optional[Dict[str, int]] = None) -> str:
         """Modify skills section to include relevant technical keywords using marker-based approach"""
-        start_time = time.time()
+        # Check if any API provider is available
+        if not self.api_manager.has_any_provider():
+            return skills_content
+        
+        missing_keywords = self._keywords_to_add('skills', skills_content, keywords, savings)
+        if missing_keywords is None:
+            logger.info("⏭️ Skills section already covers the keywords, skipping LLM call")
+            return skills_content
         
         prompt = f"""
-You are a resume optimization expert. Modify ONLY the technical skills section content in the LATEX code below to include relevant keywords from: {keywords}
+You are a resume optimization expert. Modify ONLY the technical skills section content in the LATEX code below to include relevant keywords from: {missing_keywords}
 
 RULES:
 1. ONLY add technical keywords (tools, languages, frameworks, platforms)
@@ -140,13 +299,9 @@ Example of good addition:
 Return the complete modified technical skills section content, IT IS VERY IMPORTANT YOU DO NOT RETURN ANYTHING ELSE APART FROM THE LATEX CODE. DO NOT ADD ANYTHING ELSE.
 """
         
-        # Check if any API provider is available
-        if not self.api_manager.has_any_provider():
-            return skills_content
-            
         try:
             messages = [{"role": "user", "content": prompt}]
-            content = self.api_manager.call_with_fallback(messages, temperature=0.3)
+            content = self.api_manager.call_with_fallback(messages, temperature=0.3, stage='skills')
             
             if not content:
                 return skills_content
@@ -156,17 +311,12 @@ Return the complete modified technical skills section content, IT IS VERY IMPORT
             return modified_content
             
         except Exception as e:
-            print(f"Error modifying skills section: {e}")
+            logger.error("Error modifying skills section: %s", e)
             return skills_content
-        
-        end_time = time.time()
-        print(f"  🔧 Skills modification: {end_time - start_time:.2f}s")
-        return modified_content
     
+    @SECTION_SECONDS.time(section='projects')
     def modify_projects_section(self, job_description: str, project_content: str, keywords: List[str], projects_data: List[Dict]) -> str:
         """Modify projects section to include the 2 most relevant projects using general PROJECTS marker"""
-        start_time = time.time()
-        
         if not projects_data:
             return project_content
 
@@ -200,7 +350,7 @@ Return the complete modified projects section content, IT IS VERY IMPORTANT YOU
         
         try:
             messages = [{"role": "user", "content": prompt}]
-            content = self.api_manager.call_with_fallback(messages, temperature=0.3)
+            content = self.api_manager.call_with_fallback(messages, temperature=0.3, stage='projects')
             
             if not content:
                 return project_content
@@ -210,21 +360,22 @@ Return the complete modified projects section content, IT IS VERY IMPORTANT YOU
             return modified_content
             
         except Exception as e:
-            print(f"Error creating project content: {e}")
+            logger.error("Error creating project content: %s", e)
             return project_content
-        
-        end_time = time.time()
-        print(f"  📊 Projects modification: {end_time - start_time:.2f}s")
-        return modified_content
 
 
 class ThreadedSectionModifier(SectionModifier):
     """Threaded version of section modifier for parallel processing"""
     
     def modify_sections_parallel(self, sections: Dict[str, any], keywords: List[str], 
-                                job_description: str = "", projects_data: List[Dict] = None) -> Dict[str, any]:
-        """Modify all sections in parallel using threading"""
-        start_time = time.time()
+                                job_description: str = "", projects_data: List[Dict] = None,
+                                savings: Optional[Dict[str, int]] = None) -> Dict[str, any]:
+        """Modify all sections in parallel using threading
+
+        LLM calls skipped because a section already covers the keywords are counted
+        per section in savings, when given.
+        """
+        start_time = time.perf_counter()
         
         # Thread-safe storage for results
         results = {}
@@ -236,7 +387,7 @@ class ThreadedSectionModifier(SectionModifier):
                 result = func(*args)
                 results[mod_type] = result
             except Exception as e:
-                print(f"Error in {mod_type} modification: {e}")
+                logger.error("Error in %s modification: %s", mod_type, e)
                 # Keep original content on error
                 if mod_type == 'experiences':
                     results[mod_type] = args[0]  # original experiences
@@ -245,36 +396,28 @@ class ThreadedSectionModifier(SectionModifier):
                 elif mod_type == 'projects':
                     results[mod_type] = args[1]  # original projects
         
-        # Start threads for each modification type
+        # Start threads for each modification type (threads inherit the request's correlation ID)
         if 'experiences' in sections:
-            thread = threading.Thread(
-                target=run_modification,
-                args=('experiences', self.modify_experience_sections, sections['experiences'], keywords)
-            )
-            threads.append(thread)
-            thread.start()
+            threads.append(start_thread(
+                run_modification, 'experiences', self.modify_experience_sections, sections['experiences'], keywords, savings
+            ))
         
         if 'skills' in sections:
-            thread = threading.Thread(
-                target=run_modification,
-                args=('skills', self.modify_skills_section, sections['skills'], keywords)
-            )
-            threads.append(thread)
-            thread.start()
+            threads.append(start_thread(
+                run_modification, 'skills', self.modify_skills_section, sections['skills'], keywords, savings
+            ))
         
         if 'projects' in sections:
-            thread = threading.Thread(
-                target=run_modification,
-                args=('projects', self.modify_projects_section, job_description, sections['projects'], keywords, projects_data or [])
-            )
-            threads.append(thread)
-            thread.start()
+            threads.append(start_thread(
+                run_modification, 'projects', self.modify_projects_section,
+                job_description, sections['projects'], keywords, projects_data or []
+            ))
         
         # Wait for all threads to complete
         for thread in threads:
             thread.join()
         
-        end_time = time.time()
-        print(f"⏱️ Resume modification completed in {end_time - start_time:.2f} seconds using {len(threads)} threads")
+        logger.info("⏱️ Resume modification completed in %.2f seconds using %d threads",
+                    time.perf_counter() - start_time, len(threads))
         
         return results 
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+Similarity Index Module
+
+Finds near-duplicate job descriptions (reposts, templated copies with small
+edits) so their keyword lists, and optionally their tailored sections, can be
+reused. Postings are reduced to word 3-gram shingles and sketched with
+one-permutation MinHash: every shingle is hashed once and binned, and empty
+bins are densified. Sketches are banded for LSH, so a lookup only compares a
+handful of candidates.
+"""
+
+import os
+import re
+import zlib
+import threading
+import collections
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r'\w+')
+SHINGLE_SIZE = 3
+# Added per hop when an empty bin borrows from a neighbor, keeping borrowed values distinct
+DENSIFY_OFFSET = 1 << 32
+
+
+class _Entry:
+    __slots__ = ('signature', 'bands', 'payload')
+
+    def __init__(self, signature: Tuple[int, ...], bands: List[Tuple], payload: Dict):
+        self.signature = signature
+        self.bands = bands
+        self.payload = payload
+
+
+class SimilarityIndex:
+    """In-process LSH index of job description sketches with attached payloads"""
+
+    def __init__(self, threshold: Optional[float] = None, num_bins: int = 64, bands: int = 16,
+                 max_entries: Optional[int] = None):
+        if num_bins % bands:
+            raise ValueError("num_bins must be a multiple of bands")
+        # Estimated Jaccard similarity at or above which a posting counts as a near-duplicate
+        self.threshold = threshold if threshold is not None else float(os.environ.get('SIMILARITY_THRESHOLD', 0.85))
+        self.num_bins = num_bins
+        self.bands = bands
+        self.rows = num_bins // bands
+        self.max_entries = max_entries or int(os.environ.get('SIMILARITY_INDEX_SIZE', 10000))
+        self.enabled = os.environ.get('SIMILARITY_INDEX_ENABLED', '1') != '0'
+
+        self._entries: 'collections.OrderedDict[Tuple[int, ...], _Entry]' = collections.OrderedDict()
+        self._buckets: Dict[Tuple, set] = collections.defaultdict(set)
+        self._lock = threading.Lock()
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """One-permutation MinHash sketch of the text's word shingles"""
+        words = WORD_PATTERN.findall(text.lower())
+        if len(words) < SHINGLE_SIZE:
+            shingles = {' '.join(words)}
+        else:
+            shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+        num_bins = self.num_bins
+        bins = [None] * num_bins
+        for shingle in shingles:
+            hashed = zlib.crc32(shingle.encode('utf-8'))
+            index = hashed % num_bins
+            value = hashed // num_bins
+            current = bins[index]
+            if current is None or value < current:
+                bins[index] = value
+
+        # Rotation densification: an empty bin takes the next filled bin's value
+        if None in bins:
+            filled = [i for i, value in enumerate(bins) if value is not None]
+            if not filled:
+                return tuple([0] * num_bins)
+            for i in range(num_bins):
+                if bins[i] is None:
+                    hops = 1
+                    while bins[(i + hops) % num_bins] is None:
+                        hops += 1
+                    bins[i] = bins[(i + hops) % num_bins] + hops * DENSIFY_OFFSET
+        return tuple(bins)
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple]:
+        rows = self.rows
+        return [(band,) + signature[band * rows:(band + 1) * rows] for band in range(self.bands)]
+
+    @staticmethod
+    def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity of two sketches"""
+        return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+    def lookup(self, text: str, signature: Optional[Tuple[int, ...]] = None) -> Optional[Tuple[float, Dict]]:
+        """Return (similarity, payload) of the closest indexed posting above the threshold"""
+        if not self.enabled:
+            return None
+        signature = signature or self.signature(text)
+
+        best = None
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+            for candidate in candidates:
+                score = self.similarity(signature, candidate)
+                if score >= self.threshold and (best is None or score > best[0]):
+                    best = (score, candidate)
+            if best is not None:
+                self._entries.move_to_end(best[1])
+                best = (best[0], self._entries[best[1]].payload)
+
+        CACHE_REQUESTS.inc(cache='jd_similarity', result='hit' if best else 'miss')
+        return best
+
+    def add(self, text: str, signature: Optional[Tuple[int, ...]] = None, **fields) -> Dict:
+        """Index a posting (or refresh it) and merge fields into its payload"""
+        if not self.enabled:
+            return dict(fields)
+        signature = signature or self.signature(text)
+
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                entry = _Entry(signature, self._band_keys(signature), {})
+                self._entries[signature] = entry
+                for key in entry.bands:
+                    self._buckets[key].add(signature)
+                while len(self._entries) > self.max_entries:
+                    self._evict_oldest()
+            else:
+                self._entries.move_to_end(signature)
+            entry.payload.update(fields)
+            return entry.payload
+
+    def _evict_oldest(self):
+        signature, entry = self._entries.popitem(last=False)
+        for key in entry.bands:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(signature)
+                if not bucket:
+                    del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,76 @@
+"""
+Single-Flight Module
+
+Coalesces identical concurrent calls: the first caller for a key runs the
+work, and callers arriving while it is in flight wait for and share its
+result (or exception). Nothing is cached once the call completes.
+"""
+
+import json
+import hashlib
+import threading
+import logging
+from typing import Any, Callable, Dict
+
+from .metrics import SINGLEFLIGHT_CALLS
+
+logger = logging.getLogger(__name__)
+
+
+def flight_key(*parts) -> str:
+    """Stable hash of JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class _Call:
+    """One in-flight computation shared by every caller with the same key"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Per-process registry of in-flight calls keyed by flight_key()"""
+
+    def __init__(self, scope: str):
+        # scope labels the metrics, e.g. 'tailor' or 'llm'
+        self.scope = scope
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run func unless an identical call is in flight; either way return its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            SINGLEFLIGHT_CALLS.inc(scope=self.scope, role='follower')
+            logger.debug("Joining in-flight %s call %s", self.scope, key[:12])
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        SINGLEFLIGHT_CALLS.inc(scope=self.scope, role='leader')
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
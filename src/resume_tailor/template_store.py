@@ -0,0 +1,214 @@
+"""
+Template Store Module
+
+Keeps uploaded resumes on the server so /tailor can reference them by ID
+instead of resending the LaTeX on every call. Templates are content-addressed:
+uploading the same LaTeX twice returns the same ID. The source is persisted
+under TEMPLATE_STORE_DIR so every worker (and a restarted one) can find it.
+Parsed marker structure is kept in a per-process LRU. Templates unused for
+TEMPLATE_MAX_AGE seconds are deleted, and at most TEMPLATE_MAX_COUNT are kept
+on disk, least recently used going first.
+"""
+
+import os
+import re
+import time
+import hashlib
+import threading
+import collections
+import logging
+from typing import Optional
+
+from .document import ResumeDocument
+from .preamble_format import preamble_hash
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+RESUME_ID_PATTERN = re.compile(r'^[0-9a-f]{24}$')
+TEMPLATE_NAME_PATTERN = re.compile(r'^([0-9a-f]{24})\.tex$')
+# Staging files left behind by a crashed upload are removed after this long
+STAGING_MAX_AGE = 600.0
+PRUNE_INTERVAL = 60.0
+
+
+class TemplateNotFound(KeyError):
+    """No stored template has the requested resume_id"""
+
+
+class ResumeTemplate:
+    """A stored resume with its parsed marker spans and preamble hash"""
+
+    __slots__ = ('resume_id', 'document', 'preamble_hash', 'created')
+
+    def __init__(self, resume_id: str, document: ResumeDocument, created: float):
+        self.resume_id = resume_id
+        self.document = document
+        self.preamble_hash = preamble_hash(document.source)
+        self.created = created
+
+    @property
+    def latex(self) -> str:
+        return self.document.source
+
+    def to_dict(self):
+        document = self.document
+        return {
+            'resume_id': self.resume_id,
+            'preamble_hash': self.preamble_hash,
+            'size': len(document.source),
+            'sections': {
+                'skills': document.skills is not None,
+                'experiences': len(document.experiences),
+                'projects': document.projects is not None,
+            },
+            'created': self.created,
+        }
+
+
+def resume_id_for(latex_resume: str) -> str:
+    return hashlib.sha256(latex_resume.encode('utf-8')).hexdigest()[:24]
+
+
+class TemplateStore:
+    """Disk-backed template storage with an in-memory LRU of parsed templates"""
+
+    def __init__(self, directory: Optional[str] = None, cache_size: Optional[int] = None,
+                 max_age: Optional[float] = None, max_count: Optional[int] = None):
+        if directory is None:
+            directory = os.environ.get(
+                'TEMPLATE_STORE_DIR',
+                os.path.join(os.environ.get('TEMP_DIR', 'temp'), 'templates')
+            )
+        self.directory = os.path.abspath(directory)
+        self.cache_size = cache_size or int(os.environ.get('TEMPLATE_CACHE_SIZE', 256))
+        self.max_age = max_age if max_age is not None else float(
+            os.environ.get('TEMPLATE_MAX_AGE', 7 * 24 * 3600)
+        )
+        self.max_count = max_count if max_count is not None else int(os.environ.get('TEMPLATE_MAX_COUNT', 10000))
+        self._cache: 'collections.OrderedDict[str, ResumeTemplate]' = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+    def put(self, latex_resume: str) -> ResumeTemplate:
+        """Store a resume (idempotently) and return its template"""
+        resume_id = resume_id_for(latex_resume)
+        path = self._path(resume_id)
+        template = self._cached(resume_id)
+        if template is not None and self._touch(path):
+            return template
+
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            # Write then rename so a concurrent reader never sees a partial file
+            staging = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(staging, 'w', encoding='utf-8') as f:
+                f.write(latex_resume)
+            os.replace(staging, path)
+            logger.info("Stored resume template %s (%d chars)", resume_id, len(latex_resume))
+            self.prune()
+        else:
+            self._touch(path)
+
+        return self._remember(ResumeTemplate(resume_id, ResumeDocument(latex_resume), time.time()))
+
+    def get(self, resume_id: str) -> Optional[ResumeTemplate]:
+        """Return a stored template, or None for unknown or malformed IDs"""
+        if not isinstance(resume_id, str) or not RESUME_ID_PATTERN.match(resume_id):
+            return None
+
+        path = self._path(resume_id)
+        template = self._cached(resume_id)
+        if template is not None:
+            # The file's mtime is the last use, shared by every worker
+            if self._touch(path):
+                CACHE_REQUESTS.inc(cache='template', result='hit')
+                return template
+            # Pruned by another worker; answer as it would
+            self._forget(resume_id)
+            CACHE_REQUESTS.inc(cache='template', result='miss')
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                latex_resume = f.read()
+            created = os.path.getmtime(path)
+            self._touch(path)
+        except FileNotFoundError:
+            CACHE_REQUESTS.inc(cache='template', result='miss')
+            return None
+
+        CACHE_REQUESTS.inc(cache='template', result='disk')
+        return self._remember(ResumeTemplate(resume_id, ResumeDocument(latex_resume), created))
+
+    def prune(self, force: bool = False) -> int:
+        """Delete templates unused for max_age and the least recently used beyond max_count"""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_prune < PRUNE_INTERVAL:
+                return 0
+            self._last_prune = now
+
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return 0
+        templates = []
+        expired = []
+        for entry in entries:
+            try:
+                mtime = entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            match = TEMPLATE_NAME_PATTERN.match(entry.name)
+            if match is None:
+                if entry.name.endswith('.tmp') and now - mtime > STAGING_MAX_AGE:
+                    expired.append((entry.path, None))
+            elif now - mtime > self.max_age:
+                expired.append((entry.path, match.group(1)))
+            else:
+                templates.append((mtime, entry.path, match.group(1)))
+        templates.sort()
+        expired.extend((path, resume_id) for _, path, resume_id in templates[:max(0, len(templates) - self.max_count)])
+
+        removed = 0
+        for path, resume_id in expired:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+            if resume_id is not None:
+                self._forget(resume_id)
+                removed += 1
+        if removed:
+            logger.info("🧹 Removed %d unused template(s) from %s", removed, self.directory)
+        return removed
+
+    def _touch(self, path: str) -> bool:
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _forget(self, resume_id: str):
+        with self._lock:
+            self._cache.pop(resume_id, None)
+
+    def _path(self, resume_id: str) -> str:
+        return os.path.join(self.directory, f'{resume_id}.tex')
+
+    def _cached(self, resume_id: str) -> Optional[ResumeTemplate]:
+        with self._lock:
+            template = self._cache.get(resume_id)
+            if template is not None:
+                self._cache.move_to_end(resume_id)
+            return template
+
+    def _remember(self, template: ResumeTemplate) -> ResumeTemplate:
+        with self._lock:
+            self._cache[template.resume_id] = template
+            self._cache.move_to_end(template.resume_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return template
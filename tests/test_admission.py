@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test suite for admission control
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.admission import AdmissionController, AdmissionRejected
+
+
+def _rejection(controller, client_id=None):
+    try:
+        with controller.admit(client_id):
+            pass
+    except AdmissionRejected as exc:
+        return exc
+    return None
+
+
+def test_queue_full_and_queue_timeout():
+    """Requests beyond the cap wait briefly, and beyond the queue are shed with 503"""
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.2, client_quota=0)
+    release = threading.Event()
+    admitted = threading.Event()
+
+    def hold_slot():
+        with controller.admit():
+            admitted.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_slot)
+    holder.start()
+    admitted.wait(5)
+
+    # One request may wait; it times out because the slot is never freed
+    waiter_result = {}
+    waiter = threading.Thread(target=lambda: waiter_result.setdefault('exc', _rejection(controller)))
+    waiter.start()
+    while controller.waiting < 1:
+        threading.Event().wait(0.01)
+
+    full = _rejection(controller)
+    assert full.reason == 'queue_full' and full.status == 503 and full.retry_after >= 1
+
+    waiter.join(5)
+    assert waiter_result['exc'].reason == 'queue_timeout'
+
+    release.set()
+    holder.join(5)
+    assert _rejection(controller) is None
+    assert controller.active == 0
+
+
+def test_client_quota():
+    """A client over its quota gets 429 while other clients are unaffected"""
+    controller = AdmissionController(max_concurrent=4, max_queue=0, client_quota=2, client_window=60)
+    assert _rejection(controller, 'a') is None
+    assert _rejection(controller, 'a') is None
+
+    limited = _rejection(controller, 'a')
+    assert limited.status == 429 and 1 <= limited.retry_after <= 60
+    assert _rejection(controller, 'b') is None
+
+    # Clients that never return are swept once their window has passed
+    for client_id in ('c', 'd', 'e'):
+        assert _rejection(controller, client_id) is None
+    controller._sweep(time.monotonic() + 61)
+    assert len(controller._client_starts) == 0
+
+
+def test_client_address_comes_from_trusted_proxy():
+    """Behind one proxy the client address is taken from X-Forwarded-For, not the proxy's"""
+    from werkzeug.test import EnvironBuilder
+    from app import trust_proxies
+
+    seen = {}
+
+    def capture(environ, start_response):
+        seen['remote_addr'] = environ['REMOTE_ADDR']
+        start_response('200 OK', [])
+        return [b'']
+
+    environ = EnvironBuilder('/tailor', environ_base={'REMOTE_ADDR': '10.0.0.1'},
+                             headers={'X-Forwarded-For': '203.0.113.7'}).get_environ()
+    saved = os.environ.get('TRUSTED_PROXY_COUNT')
+    try:
+        os.environ['TRUSTED_PROXY_COUNT'] = '0'
+        trust_proxies(capture)(dict(environ), lambda *args: None)
+        assert seen['remote_addr'] == '10.0.0.1'
+
+        os.environ['TRUSTED_PROXY_COUNT'] = '1'
+        trust_proxies(capture)(dict(environ), lambda *args: None)
+        assert seen['remote_addr'] == '203.0.113.7'
+    finally:
+        if saved is None:
+            os.environ.pop('TRUSTED_PROXY_COUNT', None)
+        else:
+            os.environ['TRUSTED_PROXY_COUNT'] = saved
+
+
+def test_queue_limit_fits_worker_threads():
+    """The queue defaults to the threads left over by running jobs and is capped there"""
+    assert AdmissionController(max_concurrent=4, threads=8).max_queue == 4
+    assert AdmissionController(max_concurrent=4, max_queue=8, threads=8).max_queue == 4
+    assert AdmissionController(max_concurrent=2, max_queue=1, threads=8).max_queue == 1
+    assert AdmissionController(max_concurrent=8, threads=4).max_queue == 0
+
+
+if __name__ == "__main__":
+    test_queue_full_and_queue_timeout()
+    test_client_quota()
+    test_client_address_comes_from_trusted_proxy()
+    test_queue_limit_fits_worker_threads()
+    print("✅ Admission tests passed!")
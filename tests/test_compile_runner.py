@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test suite for the sandboxed compile runner
+"""
+
+import sys
+import os
+import time
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.compile_runner import (
+    CompileRunner, WorkspacePool, publish_artifact, artifact_name, prune_artifacts, ARTIFACT_NAME_PATTERN,
+    STATUS_OK, STATUS_ERROR, STATUS_TIMEOUT, STATUS_NOT_FOUND, STATUS_OOM
+)
+
+
+def test_runner_statuses():
+    """Successful, failing and missing commands are classified"""
+    runner = CompileRunner(timeout=10)
+    with tempfile.TemporaryDirectory() as work_dir:
+        assert runner.run([sys.executable, '-c', 'print("ok")'], cwd=work_dir).status == STATUS_OK
+        assert runner.run([sys.executable, '-c', 'raise SystemExit(1)'], cwd=work_dir).status == STATUS_ERROR
+        assert runner.run(['definitely-not-a-tex-engine'], cwd=work_dir).status == STATUS_NOT_FOUND
+
+
+def test_runner_timeout_kills_process_group():
+    """A runaway command is killed once the wall-clock timeout expires"""
+    runner = CompileRunner(timeout=0.5)
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as work_dir:
+        result = runner.run([sys.executable, '-c', 'import time; time.sleep(30)'], cwd=work_dir)
+    elapsed = time.perf_counter() - start
+    print(f"Timed out run: {result}")
+
+    assert result.status == STATUS_TIMEOUT
+    assert result.fatal
+    assert elapsed < 5, "Runner should not wait for the runaway process"
+
+
+def test_limits_set_before_exec_and_kills_classified():
+    """The engine starts with its rlimits already applied; only outside SIGKILLs count as OOM"""
+    runner = CompileRunner(timeout=10, cpu_limit=7, memory_limit_mb=2048)
+    script = 'import resource; print(resource.getrlimit(resource.RLIMIT_CPU), resource.getrlimit(resource.RLIMIT_AS))'
+    with tempfile.TemporaryDirectory() as work_dir:
+        result = runner.run([sys.executable, '-c', script], cwd=work_dir)
+    limit = 2048 * 1024 * 1024
+    assert result.stdout.strip() == f"(7, 8) ({limit}, {limit})"
+
+    assert runner._classify(-9, '', '', killed=True) == STATUS_TIMEOUT
+    assert runner._classify(-9, '', '', elapsed=7.5) == STATUS_TIMEOUT
+    assert runner._classify(-9, '', '', elapsed=1) == STATUS_OOM
+
+
+def test_workspace_reused_and_cleared():
+    """The same thread gets the same, emptied, workspace for every job"""
+    with tempfile.TemporaryDirectory() as root:
+        pool = WorkspacePool(root)
+        with pool.acquire() as first:
+            with open(os.path.join(first, 'resume.aux'), 'w') as f:
+                f.write('aux')
+        with pool.acquire() as second:
+            assert second == first
+            assert os.listdir(second) == []
+        pool.cleanup()
+        assert not os.path.exists(first)
+
+
+def test_publish_artifact_moves_file():
+    """The PDF is moved into the artifact store rather than copied"""
+    with tempfile.TemporaryDirectory() as work_dir, tempfile.TemporaryDirectory() as store:
+        source = os.path.join(work_dir, 'resume.pdf')
+        with open(source, 'wb') as f:
+            f.write(b'%PDF-1.4')
+        destination = os.path.join(store, 'tailored_resume.pdf')
+
+        publish_artifact(source, destination)
+
+        assert not os.path.exists(source)
+        with open(destination, 'rb') as f:
+            assert f.read() == b'%PDF-1.4'
+
+
+def test_artifacts_named_by_content_and_pruned():
+    """Different PDFs publish under different names, and expired ones are swept"""
+    with tempfile.TemporaryDirectory() as store:
+        names = []
+        for body in (b'%PDF-1.4 first', b'%PDF-1.4 second'):
+            path = os.path.join(store, 'resume.pdf')
+            with open(path, 'wb') as f:
+                f.write(body)
+            names.append(artifact_name(path))
+            publish_artifact(path, os.path.join(store, names[-1]))
+        assert names[0] != names[1] and all(ARTIFACT_NAME_PATTERN.match(name) for name in names)
+
+        expired = os.path.join(store, names[0])
+        os.utime(expired, (time.time() - 7200, time.time() - 7200))
+        assert prune_artifacts(store, max_age=3600, force=True) == 1
+        assert sorted(os.listdir(store)) == [names[1]]
+
+
+if __name__ == "__main__":
+    test_runner_statuses()
+    test_runner_timeout_kills_process_group()
+    test_limits_set_before_exec_and_kills_classified()
+    test_workspace_reused_and_cleared()
+    test_publish_artifact_moves_file()
+    test_artifacts_named_by_content_and_pruned()
+    print("✅ Compile runner tests passed!")
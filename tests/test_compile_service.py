@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test suite for the compile service daemon and client
+"""
+
+import sys
+import os
+import socket
+import tempfile
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.compile_service import (
+    CompileService, CompileClient, CompileQueueFull, CompileServiceError, CompileServiceUnavailable,
+    PRIORITY_HIGH, PRIORITY_LOW, send_message, recv_message
+)
+
+
+class GatedProcessor:
+    """Records compile order and blocks until the gate opens"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.compiled = []
+
+    def compile_locally(self, latex_content):
+        self.gate.wait(5)
+        self.compiled.append(latex_content)
+        return {'filename': 'tailored_resume.pdf', 'is_single_page': True, 'page_count': 1, 'layout': None}
+
+
+def _submit_async(client, latex, priority, results):
+    def run():
+        try:
+            results[latex] = client.compile(latex, priority)
+        except CompileQueueFull as exc:
+            results[latex] = exc
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_round_trip_priorities_and_queue_full():
+    """Results come back over the socket, high priority jumps the queue, overflow is rejected"""
+    processor = GatedProcessor()
+    with tempfile.TemporaryDirectory() as tmp:
+        service = CompileService(processor, os.path.join(tmp, 'compile.sock'), workers=1, queue_size=2).start()
+        client = CompileClient(service.socket_path, timeout=10)
+        results = {}
+        try:
+            threads = [_submit_async(client, 'running', PRIORITY_LOW, results)]
+            # Wait for the worker to take the first job so the queue is empty
+            while service._queue.qsize() or not service._queue.unfinished_tasks:
+                threading.Event().wait(0.01)
+            threads.append(_submit_async(client, 'low', PRIORITY_LOW, results))
+            while service._queue.qsize() < 1:
+                threading.Event().wait(0.01)
+            threads.append(_submit_async(client, 'high', PRIORITY_HIGH, results))
+            while service._queue.qsize() < 2:
+                threading.Event().wait(0.01)
+
+            try:
+                client.compile('overflow')
+                assert False, 'expected CompileQueueFull'
+            except CompileQueueFull as exc:
+                assert exc.retry_after >= 1
+
+            processor.gate.set()
+            for thread in threads:
+                thread.join(5)
+        finally:
+            service.stop()
+
+    assert processor.compiled == ['running', 'high', 'low']
+    assert results['low']['page_count'] == 1
+    assert not os.path.exists(service.socket_path)
+
+
+def test_timed_out_jobs_are_dropped_not_rerouted():
+    """A client timeout is not mistaken for an unreachable service, and its queued job is never compiled"""
+    processor = GatedProcessor()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            CompileClient(os.path.join(tmp, 'missing.sock')).compile('x')
+            assert False, 'expected CompileServiceUnavailable'
+        except CompileServiceUnavailable:
+            pass
+
+        service = CompileService(processor, os.path.join(tmp, 'compile.sock'), workers=1, queue_size=4).start()
+        results = {}
+        try:
+            running = _submit_async(CompileClient(service.socket_path, timeout=10), 'running', PRIORITY_LOW, results)
+            while service._queue.qsize() or not service._queue.unfinished_tasks:
+                threading.Event().wait(0.01)
+
+            try:
+                CompileClient(service.socket_path, timeout=0.3).compile('given up')
+                assert False, 'expected a timeout'
+            except CompileServiceUnavailable:
+                assert False, 'a timeout must not look like an unreachable service'
+            except CompileServiceError:
+                pass
+
+            processor.gate.set()
+            running.join(5)
+            service._queue.join()
+        finally:
+            service.stop()
+
+    assert processor.compiled == ['running']
+
+
+def test_malformed_requests_get_an_error_reply():
+    """A missing latex field or a non-numeric priority is answered, not dropped"""
+    processor = GatedProcessor()
+    processor.gate.set()
+    with tempfile.TemporaryDirectory() as tmp:
+        service = CompileService(processor, os.path.join(tmp, 'compile.sock'), workers=1, queue_size=2).start()
+        try:
+            for request, field in (({'priority': 10}, 'latex'), ({'latex': 'x', 'priority': 'high'}, 'priority'),
+                                   ({'latex': 'x', 'mode': 'render'}, 'mode')):
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.settimeout(5)
+                    sock.connect(service.socket_path)
+                    send_message(sock, request)
+                    response = recv_message(sock)
+                assert response['status'] == 'error' and field in response['message']
+        finally:
+            service.stop()
+
+    assert processor.compiled == []
+
+
+if __name__ == "__main__":
+    test_round_trip_priorities_and_queue_full()
+    test_timed_out_jobs_are_dropped_not_rerouted()
+    test_malformed_requests_get_an_error_reply()
+    print("✅ Compile service tests passed!")
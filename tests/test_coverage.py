@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test suite for local keyword coverage analysis
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.coverage import CoverageAnalyzer, normalize_text
+from src.resume_tailor.section_modifiers import SectionModifier
+
+EXPERIENCE = """
+  \\resumeItem{Built \\textbf{React} dashboards in \\textbf{JS} backed by \\textbf{Postgres}.}
+  \\resumeItem{Ran services on \\textbf{k8s} with 99.9\\% uptime using C\\#.}
+"""
+
+
+class CountingAPIManager:
+    def __init__(self):
+        self.prompts = []
+
+    def has_any_provider(self):
+        return True
+
+    def call_with_fallback(self, messages, temperature=0.3, stage='other'):
+        self.prompts.append(messages[0]['content'])
+        return '\\resumeItem{Rewritten}'
+
+
+def test_markup_and_aliases_are_matched():
+    """LaTeX commands are stripped, aliases match, and C does not match C#"""
+    assert 'textbf' not in normalize_text(EXPERIENCE) and '99.9%' in normalize_text(EXPERIENCE)
+
+    coverage = CoverageAnalyzer().analyze(
+        EXPERIENCE, ['JavaScript', 'Kubernetes', 'PostgreSQL', 'React', 'C#', 'C', 'Go']
+    )
+    assert coverage.covered == ['JavaScript', 'Kubernetes', 'PostgreSQL', 'React', 'C#']
+    assert coverage.missing == ['C', 'Go']
+
+    # Short acronyms are case-sensitive, so ordinary words do not count
+    assert CoverageAnalyzer().analyze('Teams go on to ship', ['Go']).missing == ['Go']
+
+
+def test_ordinary_words_do_not_cover_keywords():
+    """Acronyms of any length are case-sensitive, Node needs its .js, and short terms take no plural"""
+    analyzer = CoverageAnalyzer()
+    assert analyzer.analyze('Led the rest of the team', ['REST']).missing == ['REST']
+    assert analyzer.analyze('Designed a REST API', ['REST']).covered == ['REST']
+    assert analyzer.analyze('Trained graph node embeddings', ['Node.js']).missing == ['Node.js']
+    assert analyzer.analyze('Whatever goes, Goes', ['Go']).missing == ['Go']
+    assert analyzer.analyze('Shipped Kafka pipelines', ['Pipeline']).covered == ['Pipeline']
+
+    # No keywords means no decision: the call is not skipped
+    assert analyzer.analyze(EXPERIENCE, []).ratio is None
+    assert analyzer.keywords_to_add(EXPERIENCE, []) == []
+
+
+def test_covered_sections_skip_llm_and_partial_ones_are_downscoped():
+    """A covered experience keeps its text without a call; others only get missing keywords"""
+    api_manager = CountingAPIManager()
+    modifier = SectionModifier(api_manager, CoverageAnalyzer(threshold=1.0))
+    savings = {}
+
+    result = modifier.modify_experience_sections(
+        [EXPERIENCE, '\\resumeItem{Wrote Python scripts.}'], ['JavaScript', 'Kubernetes'], savings
+    )
+    assert result == [EXPERIENCE, '\\resumeItem{Rewritten}']
+    assert savings == {'experiences': 1}
+    assert len(api_manager.prompts) == 1
+
+    modifier.modify_skills_section('Languages: Python, JS', ['Python', 'Rust'], savings)
+    assert "['Rust']" in api_manager.prompts[-1] and "'Python'" not in api_manager.prompts[-1]
+    assert savings == {'experiences': 1}
+
+
+if __name__ == "__main__":
+    test_markup_and_aliases_are_matched()
+    test_ordinary_words_do_not_cover_keywords()
+    test_covered_sections_skip_llm_and_partial_ones_are_downscoped()
+    print("✅ Coverage tests passed!")
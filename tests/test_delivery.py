@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test suite for artifact delivery: ETags, ranges, proxy offload and compression
+"""
+
+import sys
+import os
+import gzip
+import json
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import jsonify
+from app import app
+
+PDF_BYTES = b'%PDF-1.4\n' + b'0123456789' * 100
+
+
+def test_download_etag_conditional_get_and_range():
+    """Downloads carry a content ETag, revalidate with 304 and honor Range"""
+    saved_env = {name: os.environ.get(name) for name in ('TEMP_DIR', 'DOWNLOAD_OFFLOAD')}
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.environ['TEMP_DIR'] = temp_dir
+            path = os.path.join(temp_dir, 'tailored_resume.pdf')
+            with open(path, 'wb') as f:
+                f.write(PDF_BYTES)
+            client = app.test_client()
+
+            response = client.get('/download/tailored_resume.pdf')
+            etag = response.headers['ETag']
+            assert response.status_code == 200 and response.data == PDF_BYTES and etag
+            assert client.get('/download/tailored_resume.pdf', headers={'If-None-Match': etag}).status_code == 304
+
+            partial = client.get('/download/tailored_resume.pdf', headers={'Range': 'bytes=0-8'})
+            assert partial.status_code == 206 and partial.data == b'%PDF-1.4\n'
+
+            # A new PDF under the same name gets a new ETag even within the same second
+            with open(path, 'wb') as f:
+                f.write(PDF_BYTES.replace(b'0', b'1'))
+            assert client.get('/download/tailored_resume.pdf', headers={'If-None-Match': etag}).status_code == 200
+            assert client.get('/download/..').status_code == 404
+
+            os.environ['DOWNLOAD_OFFLOAD'] = 'x-accel'
+            offloaded = client.get('/download/tailored_resume.pdf')
+            assert offloaded.headers['X-Accel-Redirect'] == '/_artifacts/tailored_resume.pdf'
+            assert offloaded.data == b'' and offloaded.mimetype == 'application/pdf'
+
+            # Content-named artifacts take their ETag from the name
+            named = 'tailored_' + 'ab' * 16 + '.pdf'
+            with open(os.path.join(temp_dir, named), 'wb') as f:
+                f.write(PDF_BYTES)
+            os.environ['DOWNLOAD_OFFLOAD'] = 'none'
+            assert client.get(f'/download/{named}').headers['ETag'] == '"' + 'ab' * 16 + '"'
+    finally:
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def test_json_responses_are_gzipped():
+    """Large JSON bodies are gzipped for clients that accept it; small ones are left alone"""
+    payload = {'modified_resume': '\\resumeItem{Built things}\n' * 200}
+
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = app.process_response(jsonify(payload))
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.get_data())) == payload
+
+    with app.test_request_context():
+        assert 'Content-Encoding' not in app.process_response(jsonify(payload)).headers
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        assert 'Content-Encoding' not in app.process_response(jsonify({'error': 'short'})).headers
+
+
+if __name__ == "__main__":
+    test_download_etag_conditional_get_and_range()
+    test_json_responses_are_gzipped()
+    print("✅ Delivery tests passed!")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test suite for the offset-based resume document model
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.document import ResumeDocument
+
+RESUME = """\\documentclass{article}
+\\begin{document}
+%----START OF EXPERIENCE MARKER----
+  \\item First job
+%----END OF EXPERIENCE MARKER----
+%----START OF EXPERIENCE MARKER----
+  \\item Second job
+%----END OF EXPERIENCE MARKER----
+%----START OF PROJECTS MARKER----
+
+  \\item A project
+
+%----END OF PROJECTS MARKER----
+%----START OF TECHNICAL SKILLS MARKER----
+  Python, Go
+%----END OF TECHNICAL SKILLS MARKER----
+\\end{document}
+"""
+
+
+def test_sections_are_offsets_into_the_source():
+    """Sections materialize from offsets; skills and projects are stripped, experiences are not"""
+    document = ResumeDocument(RESUME)
+    assert not hasattr(document, '__dict__')
+
+    sections = document.sections()
+    assert sections['skills'] == 'Python, Go'
+    assert sections['projects'] == '\\item A project'
+    assert sections['experiences'] == ['\n  \\item First job\n', '\n  \\item Second job\n']
+    assert RESUME[document.skills.content_start:document.skills.content_end] == 'Python, Go'
+
+
+def test_splice_replaces_blocks_and_removes_markers():
+    """Replaced blocks lose their markers; blocks without a replacement stay untouched"""
+    document = ResumeDocument(RESUME)
+    spliced = document.splice({'skills': 'Rust', 'experiences': ['\\item New job']})
+
+    assert 'Rust' in spliced and 'TECHNICAL SKILLS MARKER' not in spliced
+    assert spliced.count('EXPERIENCE MARKER') == 2
+    assert spliced.index('\\item New job') < spliced.index('\\item Second job')
+    assert '%----START OF PROJECTS MARKER----' in spliced
+    assert document.source == RESUME
+
+
+if __name__ == "__main__":
+    test_sections_are_offsets_into_the_source()
+    test_splice_replaces_blocks_and_removes_markers()
+    print("✅ Document tests passed!")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Cold-start budget: importing the app must stay cheap for serverless deploys
+"""
+
+import sys
+import os
+import json
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules that must only load once a request needs them
+DEFERRED_MODULES = [
+    'requests',
+    'PyPDF2',
+    'cerebras',
+    'src.resume_tailor.core',
+    'src.resume_tailor.latex_processor',
+    'src.resume_tailor.section_modifiers',
+]
+
+# Generous enough for a loaded CI box; Flask itself accounts for most of it
+IMPORT_BUDGET_SECONDS = float(os.environ.get('IMPORT_BUDGET_SECONDS', 1.5))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'loaded': [m for m in %r if m in sys.modules]}))
+""" % (DEFERRED_MODULES,)
+
+
+def test_app_import_is_lazy_and_within_budget():
+    """A fresh interpreter imports app.py without the pipeline and under budget"""
+    env = dict(os.environ, LOG_LEVEL='WARNING')
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    probe = json.loads(output.strip().splitlines()[-1])
+    print(probe)
+
+    assert probe['loaded'] == []
+    assert probe['elapsed'] < IMPORT_BUDGET_SECONDS
+
+
+if __name__ == "__main__":
+    test_app_import_is_lazy_and_within_budget()
+    print("✅ Import time tests passed!")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test suite for request and field size limits
+"""
+
+import io
+import sys
+import os
+import json
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import app as app_module
+from src.resume_tailor.input_limits import InputLimits, InputRejected, truncate_text, condense_job_description
+
+JOB_DESCRIPTION = (
+    "We are hiring a backend engineer.\n"
+    "You will build Python services on Kubernetes.\n"
+    "You will build Python services on Kubernetes.\n"
+    "Acme is an equal opportunity employer and values diversity.\n"
+    "Experience with PostgreSQL and Kafka is a plus. We ship often and review code carefully."
+)
+
+
+def _rejection(func, *args):
+    try:
+        func(*args)
+    except InputRejected as exc:
+        return exc
+    return None
+
+
+def test_job_description_policies():
+    """Oversized job descriptions are truncated at a boundary, condensed, or rejected"""
+    assert truncate_text("One sentence here. Another one follows", 22) == "One sentence here."
+    assert truncate_text("Words without any sentence ending", 20) == "Words without any"
+    assert truncate_text("short", 25) == "short"
+
+    condensed = condense_job_description(JOB_DESCRIPTION, 1000)
+    assert condensed.count("Python services") == 1 and "equal opportunity" not in condensed
+    assert "Kafka" in condensed
+
+    limit = len(JOB_DESCRIPTION) - 40
+    assert len(InputLimits(max_job_description_chars=limit, job_description_policy='truncate')
+               .job_description(JOB_DESCRIPTION)) <= limit
+    assert "Kafka" in InputLimits(max_job_description_chars=limit, job_description_policy='condense') \
+        .job_description(JOB_DESCRIPTION)
+    rejected = _rejection(InputLimits(max_job_description_chars=limit, job_description_policy='reject')
+                          .job_description, JOB_DESCRIPTION)
+    assert rejected.status == 413 and rejected.field == 'job_description'
+
+
+def test_field_limits_and_body_parsing():
+    """LaTeX and project lists over their limits, wrong types and non-object bodies are refused"""
+    limits = InputLimits(max_request_bytes=100, max_latex_chars=10, max_projects=2, max_project_chars=20)
+    assert _rejection(limits.latex, 'x' * 11).status == 413
+    assert _rejection(limits.projects, [{}, {}, {}]).status == 413
+    assert _rejection(limits.projects, [{'title': 'y' * 30}]).status == 413
+    assert _rejection(limits.projects, 'not a list').status == 400
+    assert _rejection(limits.job_description, 42).status == 400
+    assert _rejection(limits.resume_id, 123).status == 400
+    assert _rejection(limits.resume_id, ['a']).status == 400
+    assert _rejection(limits.resume_id, 'f' * 65).status == 400
+    assert limits.resume_id('') is None and limits.resume_id('ab12') == 'ab12'
+    assert limits.projects(None) == []
+
+    assert _rejection(limits.check_content_length, 101).status == 413
+    assert _rejection(limits.parse_body, b'{' * 101).status == 413
+    assert _rejection(limits.parse_body, b'[1, 2]').status == 400
+    assert _rejection(limits.parse_body, b'[' * 100).status == 400
+    assert limits.parse_body(b'{"a": 1}') == {'a': 1}
+
+
+def test_tailor_endpoint_rejects_oversized_input():
+    """/tailor answers 413 for oversized bodies, declared or streamed, before any tailoring"""
+    saved_limits = app_module.input_limits
+    saved_max = app_module.app.config['MAX_CONTENT_LENGTH']
+    try:
+        app_module.input_limits = InputLimits(max_request_bytes=200, max_latex_chars=50)
+        app_module.app.config['MAX_CONTENT_LENGTH'] = 201
+        client = app_module.app.test_client()
+
+        response = client.post('/tailor', json={'job_description': 'x' * 300, 'latex_resume': 'y'})
+        assert response.status_code == 413
+
+        body = json.dumps({'job_description': 'x' * 300, 'latex_resume': 'y'}).encode()
+        response = client.post('/tailor', input_stream=io.BytesIO(body), content_type='application/json',
+                               headers={'Transfer-Encoding': 'chunked'},
+                               environ_overrides={'wsgi.input_terminated': True})
+        assert response.status_code == 413
+
+        response = client.post('/tailor', json={'job_description': 'Python', 'latex_resume': 'z' * 60})
+        assert response.status_code == 413 and 'limit' in response.get_json()['error']
+
+        assert client.post('/tailor', data='not json', content_type='application/json').status_code == 400
+        for resume_id in (123, ['a']):
+            response = client.post('/tailor', json={'job_description': 'x', 'resume_id': resume_id})
+            assert response.status_code == 400 and 'resume_id' in response.get_json()['error']
+        assert client.post('/templates', json={'latex_resume': 'z' * 60}).status_code == 413
+    finally:
+        app_module.input_limits = saved_limits
+        app_module.app.config['MAX_CONTENT_LENGTH'] = saved_max
+
+
+if __name__ == "__main__":
+    test_job_description_policies()
+    test_field_limits_and_body_parsing()
+    test_tailor_endpoint_rejects_oversized_input()
+    print("✅ Input limit tests passed!")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test suite for LaTeX processor helpers
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.latex_processor import LaTeXProcessor, page_count_from_log, page_count_from_pdf
+
+
+MINIMAL_PDF = b"""%PDF-1.4
+1 0 obj
+<< /Type /Catalog /Pages 2 0 R >>
+endobj
+2 0 obj
+<< /Type /Pages /Kids [3 0 R 4 0 R] /Count 2 >>
+endobj
+3 0 obj
+<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>
+endobj
+4 0 obj
+<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>
+endobj
+trailer
+<< /Size 5 /Root 1 0 R >>
+%%EOF
+"""
+
+
+def test_page_count_from_log():
+    """Page count is read from the wrapped "Output written" log line"""
+    log_text = (
+        "Here is how much of TeX's memory you used:\n"
+        "Output written on /tmp/tmpa1b2c3d4/some/long/path/to/the/output/dir/resume.pd\n"
+        "f (2 pages, 48213 bytes).\n"
+    )
+    assert page_count_from_log(log_text) == 2
+    assert page_count_from_log("No pages of output.") is None
+
+
+def test_page_count_from_pdf_trailer():
+    """Page count is read from the page tree root without a full parse"""
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+        f.write(MINIMAL_PDF)
+        pdf_path = f.name
+    try:
+        assert page_count_from_pdf(pdf_path) == 2
+    finally:
+        os.remove(pdf_path)
+
+
+SIMPLIFY_SOURCE = r"""\documentclass{article}
+\usepackage{charter}
+\input{glyphtounicode}
+\newcommand{\resumeItem}[1]{\item\small{#1}}
+\newcommand{\resumeItemListStart}{\begin{itemize}}
+\begin{document}
+\resumeSubheading
+  {Acme}{2023 -- Present}
+  {Engineer}{Remote}
+\resumeItemListStart
+  \resumeItem{Cut cost by \textbf{35\%} using {\em nested} groups}
+  \resumeItem{Escaped \} brace}
+\resumeItemListEnd
+\end{document}
+"""
+
+
+def test_simplify_latex_content():
+    """Packages go in one pass and macros expand brace-aware, leaving the preamble definitions alone"""
+    simplified = LaTeXProcessor._simplify_latex_content(None, SIMPLIFY_SOURCE)
+    print(simplified)
+
+    assert r'\usepackage{charter}' not in simplified
+    assert r'\input{glyphtounicode}' not in simplified
+    assert r'\newcommand{\resumeItem}[1]{\item\small{#1}}' in simplified
+    assert r'\newcommand{\resumeItemListStart}{\begin{itemize}}' in simplified
+
+    body = simplified[simplified.index(r'\begin{document}'):]
+    assert r'\item \textbf{Acme} \hfill 2023 -- Present \\ \textit{Engineer} \hfill \textit{Remote}' in body
+    assert r'\item Cut cost by \textbf{35\%} using {\em nested} groups' in body
+    assert r'\item Escaped \} brace' in body
+    assert body.count(r'\begin{itemize}') == 1 and body.count(r'\end{itemize}') == 1
+    assert 'resume' not in body
+
+
+if __name__ == "__main__":
+    test_page_count_from_log()
+    test_page_count_from_pdf_trailer()
+    test_simplify_latex_content()
+    print("✅ LaTeX processor tests passed!")
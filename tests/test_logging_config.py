@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test suite for structured logging helpers
+"""
+
+import sys
+import os
+import logging
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.logging_config import (
+    LazyPreview, KeyValueFormatter, RequestIdFilter, set_request_id, reset_request_id,
+    get_request_id, start_thread
+)
+
+
+class CountingPayload:
+    """Counts how often it is rendered"""
+
+    def __init__(self):
+        self.renders = 0
+
+    def __str__(self):
+        self.renders += 1
+        return 'x' * 1000
+
+
+def test_lazy_preview_not_rendered_when_disabled():
+    """Debug previews cost nothing unless DEBUG is enabled"""
+    payload = CountingPayload()
+    test_logger = logging.getLogger('resume_tailor.test.lazy')
+    test_logger.setLevel(logging.INFO)
+    test_logger.debug("preview: %s", LazyPreview(payload))
+    assert payload.renders == 0
+
+    preview = str(LazyPreview(payload, 10))
+    assert preview.startswith('x' * 10) and '[1000 chars]' in preview
+
+
+def test_request_id_in_records_and_threads():
+    """The correlation ID is stamped on records, including from worker threads"""
+    token = set_request_id('abc123')
+    try:
+        seen = []
+        thread = start_thread(lambda: seen.append(get_request_id()))
+        thread.join()
+        assert seen == ['abc123']
+
+        record = logging.LogRecord('test', logging.INFO, __file__, 1, 'hello %s', ('world',), None)
+        RequestIdFilter().filter(record)
+        line = KeyValueFormatter().format(record)
+        print(line)
+        assert 'request_id=abc123' in line
+        assert 'msg="hello world"' in line
+    finally:
+        reset_request_id(token)
+
+
+if __name__ == "__main__":
+    test_lazy_preview_not_rendered_when_disabled()
+    test_request_id_in_records_and_threads()
+    print("✅ Logging tests passed!")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test suite for the metrics registry
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.metrics import MetricsRegistry, archive_process
+
+
+def test_prometheus_rendering():
+    """Counters and histograms render in Prometheus text format"""
+    registry = MetricsRegistry()
+    failures = registry.counter('test_failures_total', 'Failures', ['provider'])
+    latency = registry.histogram('test_latency_seconds', 'Latency', ['stage'], buckets=(0.1, 1.0))
+
+    failures.inc(provider='OpenRouterProvider')
+    failures.inc(provider='OpenRouterProvider')
+    latency.observe(0.05, stage='skills')
+    latency.observe(0.5, stage='skills')
+
+    @latency.time(stage='projects')
+    def timed_call():
+        return 'done'
+
+    assert timed_call() == 'done'
+
+    text = registry.render()
+    print(text)
+    assert 'test_failures_total{provider="OpenRouterProvider"} 2' in text
+    assert 'test_latency_seconds_bucket{stage="skills",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{stage="skills",le="+Inf"} 2' in text
+    assert 'test_latency_seconds_count{stage="projects"} 1' in text
+
+
+def test_multiprocess_totals_survive_worker_exit():
+    """Renders sum every process's snapshot, and an exited worker's counts are kept in the archive"""
+    registry = MetricsRegistry()
+    requests = registry.counter('test_requests_total', 'Requests', ['route'])
+    latency = registry.histogram('test_latency_seconds', 'Latency', buckets=(1.0,))
+
+    with tempfile.TemporaryDirectory() as directory:
+        pid = os.fork()
+        if pid == 0:
+            # Stands in for another gunicorn worker
+            requests.inc(2, route='/tailor')
+            latency.observe(0.5)
+            registry.write_snapshot(directory)
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+        registry.enable_multiprocess(directory, interval=3600)
+        requests.inc(route='/tailor')
+        latency.observe(2.0)
+        text = registry.render()
+        assert 'test_requests_total{route="/tailor"} 3' in text
+        assert 'test_latency_seconds_bucket{le="1.0"} 1' in text
+        assert 'test_latency_seconds_count 2' in text
+
+        archive_process(directory, pid)
+        assert not os.path.exists(os.path.join(directory, f'process_{pid}.json'))
+        assert 'test_requests_total{route="/tailor"} 3' in registry.render()
+
+
+if __name__ == "__main__":
+    test_prometheus_rendering()
+    test_multiprocess_totals_survive_worker_exit()
+    print("✅ Metrics tests passed!")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test suite for the OpenAI-compatible provider against a local stub server
+"""
+
+import sys
+import os
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.api_providers import OpenAICompatibleProvider
+
+MESSAGES = [{"role": "user", "content": "Extract keywords"}]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Minimal /v1/chat/completions in the shape llama.cpp, vLLM and Ollama serve"""
+
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        StubHandler.requests.append((self.path, body))
+        if body.get('stream'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            for piece in ('["Py', 'thon"]'):
+                chunk = {"choices": [{"delta": {"content": piece}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+        payload = json.dumps({"choices": [{"message": {"content": '["Python"]'}}]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def patched_env(**env):
+    """Set (or, for None, unset) environment variables for the block, then restore them"""
+    saved = {name: os.environ.get(name) for name in env}
+    for name, value in env.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def make_provider(server, **env):
+    with patched_env(**env):
+        return OpenAICompatibleProvider(base_url=f'http://127.0.0.1:{server.server_port}/v1', model='stub')
+
+
+def test_plain_and_streaming_completions():
+    """Both response shapes yield the full text; JSON mode is only sent when declared"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        StubHandler.requests = []
+        provider = make_provider(server, LOCAL_LLM_STREAMING='0', LOCAL_LLM_JSON_MODE='0')
+        assert provider.is_available()
+        assert provider.call_api(MESSAGES, json_mode=True) == '["Python"]'
+        path, body = StubHandler.requests[-1]
+        assert path == '/v1/chat/completions' and body['model'] == 'stub'
+        assert 'response_format' not in body and 'stream' not in body
+
+        provider = make_provider(server, LOCAL_LLM_STREAMING='1', LOCAL_LLM_JSON_MODE='1')
+        assert provider.call_api(MESSAGES, json_mode=True) == '["Python"]'
+        assert StubHandler.requests[-1][1]['response_format'] == {"type": "json_object"}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_context_window_and_availability():
+    """Prompts too large for the context are refused locally; no base URL means unavailable"""
+    provider = OpenAICompatibleProvider(base_url='http://127.0.0.1:9/v1')
+    provider.max_context = 2048
+    assert provider.fits_context(MESSAGES)
+    assert provider.call_api([{"role": "user", "content": "x" * 10000}]) is None
+
+    with patched_env(LOCAL_LLM_BASE_URL=None):
+        assert not OpenAICompatibleProvider().is_available()
+
+
+if __name__ == "__main__":
+    test_plain_and_streaming_completions()
+    test_context_window_and_availability()
+    print("✅ OpenAI-compatible provider tests passed!")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test suite for the page-fit optimizer
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.latex_processor import find_command_arguments, parse_layout
+from src.resume_tailor.page_fit import PageFitOptimizer, SPACING_MARKER
+
+
+SAMPLE_LATEX = r"""
+\documentclass[letterpaper,10.5pt]{article}
+\newcommand{\resumeItem}[1]{\item\small{#1}}
+\begin{document}
+\resumeItemListStart
+  \resumeItem{Developed web applications with \textbf{React} and \textbf{Node.js}, improving load times by 40\%, reducing bundle size, and streamlining deployments}
+  \resumeItem{Maintained internal wiki pages}
+\resumeItemListEnd
+\resumeItemListStart
+  \resumeItem{Built APIs in Python}
+\resumeItemListEnd
+\end{document}
+"""
+
+
+class FakeProcessor:
+    """Returns a scripted sequence of compile results, and of probe results if given"""
+
+    def __init__(self, page_counts, probe_counts=()):
+        self.page_counts = list(page_counts)
+        self.probe_counts = list(probe_counts)
+        self.compiled = []
+        self.probed = []
+
+    def probe_layout(self, latex_content, priority=None):
+        if not self.probe_counts:
+            return None
+        self.probed.append(latex_content)
+        return {'page_count': self.probe_counts.pop(0), 'overflow_pt': 20.0}
+
+    def compile_latex(self, latex_content, priority=None):
+        self.compiled.append(latex_content)
+        pages = self.page_counts.pop(0)
+        return {'filename': 'tailored_resume.pdf', 'is_single_page': pages == 1,
+                'page_count': pages, 'layout': {'overflow_pt': 20.0}}
+
+
+def test_find_command_arguments_nested_braces():
+    """Brace-aware matching keeps nested groups inside the argument"""
+    matches = find_command_arguments(SAMPLE_LATEX, 'resumeItem')
+    # The \newcommand definition is not followed by an argument and is skipped
+    assert len(matches) == 3
+    start, end, spans = matches[0]
+    assert SAMPLE_LATEX[spans[0][0]:spans[0][1]].endswith('streamlining deployments')
+    assert SAMPLE_LATEX[end - 1] == '}'
+
+
+def test_parse_layout():
+    """Overflow is measured from the layout probe line in the log"""
+    log = "Some log\nRT-LAYOUT: page=2 total=40.5pt goal=650.0pt\nOutput written"
+    layout = parse_layout(log)
+    assert layout['page_count'] == 2
+    assert layout['overflow_pt'] == 40.5
+    assert parse_layout("no probe here") is None
+
+
+def test_fixes_in_order():
+    """Spacing is tightened first, then bullets are trimmed or dropped"""
+    optimizer = PageFitOptimizer(FakeProcessor([]), max_iterations=3, trim_limit_pt=30)
+
+    fix, candidate = optimizer.apply_cheapest_fix(SAMPLE_LATEX, ['React'], 20.0)
+    assert fix == 'tighten_spacing'
+    assert SPACING_MARKER in candidate
+
+    fix, trimmed = optimizer.apply_cheapest_fix(candidate, ['React'], 20.0)
+    assert fix == 'trim_longest_bullet'
+    assert 'streamlining deployments' not in trimmed
+    assert trimmed.count('{') == trimmed.count('}')
+
+    fix, dropped = optimizer.apply_cheapest_fix(candidate, ['React'], 200.0)
+    assert fix == 'drop_lowest_ranked_bullet'
+    assert 'Maintained internal wiki pages' not in dropped
+    # The only bullet in a list is never dropped
+    assert 'Built APIs in Python' in dropped
+
+
+def test_fit_to_one_page_reports_iterations():
+    """The loop stops once the resume fits and reports each iteration"""
+    processor = FakeProcessor([2, 1])
+    optimizer = PageFitOptimizer(processor, max_iterations=5)
+    initial = {'page_count': 2, 'is_single_page': False, 'layout': {'overflow_pt': 20.0}}
+
+    fit = optimizer.fit_to_one_page(SAMPLE_LATEX, ['React'], initial)
+    print(f"Page fit iterations: {fit['iterations']}")
+
+    assert fit['fitted']
+    assert len(fit['iterations']) == 2
+    assert all('seconds' in iteration for iteration in fit['iterations'])
+    assert fit['latex_content'] == processor.compiled[-1]
+
+
+def test_probes_measure_variants_and_compile_once():
+    """Intermediate variants are only probed; the final layout gets one full compile"""
+    processor = FakeProcessor([1], probe_counts=[2, 2, 1])
+    optimizer = PageFitOptimizer(processor, max_iterations=5)
+    initial = {'page_count': 2, 'is_single_page': False, 'layout': {'overflow_pt': 20.0}}
+
+    fit = optimizer.fit_to_one_page(SAMPLE_LATEX, ['React'], initial)
+
+    assert fit['fitted']
+    assert [iteration['probe'] for iteration in fit['iterations']] == [True, True, True]
+    assert processor.compiled == [processor.probed[-1]] == [fit['latex_content']]
+
+
+if __name__ == "__main__":
+    test_find_command_arguments_nested_braces()
+    test_parse_layout()
+    test_fixes_in_order()
+    test_fit_to_one_page_reports_iterations()
+    test_probes_measure_variants_and_compile_once()
+    print("✅ Page fit tests passed!")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test suite for the warm preamble format cache
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.compile_runner import CompileResult, STATUS_OK, STATUS_TIMEOUT
+from src.resume_tailor.preamble_format import PreambleFormatCache, preamble_hash
+
+LATEX = '\\documentclass{article}\n\\usepackage{hyperref}\n\\begin{document}\nHello\n\\end{document}\n'
+
+
+class FakeRunner:
+    """Writes a format file of the given size unless told to fail"""
+
+    def __init__(self, size=1024, status=STATUS_OK):
+        self.size = size
+        self.status = status
+        self.gate = threading.Event()
+        self.gate.set()
+        self.runs = 0
+
+    def run(self, command, cwd=None, env=None):
+        self.gate.wait(5)
+        self.runs += 1
+        if self.status == STATUS_OK:
+            jobname = next(arg for arg in command if arg.startswith('-jobname=')).split('=', 1)[1]
+            with open(os.path.join(cwd, f'{jobname}.fmt'), 'wb') as f:
+                f.write(b'\0' * self.size)
+        return CompileResult(self.status)
+
+
+def _wait_for_builds(cache):
+    cache._queue.join()
+
+
+def test_lookup_never_blocks_and_builds_in_background():
+    """A miss returns None at once and queues one build; the next lookup is warm"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        runner = FakeRunner()
+        runner.gate.clear()
+        cache = PreambleFormatCache(cache_dir=cache_dir, runner=runner)
+
+        assert cache.get_format(LATEX) is None
+        # A second miss for the same preamble while it is pending is not queued again
+        assert cache.get_format(LATEX) is None
+        runner.gate.set()
+        _wait_for_builds(cache)
+
+        assert runner.runs == 1
+        assert cache.get_format(LATEX) == preamble_hash(LATEX)
+
+
+def test_failures_are_retried_after_a_while():
+    """A failed build is not retried within FORMAT_RETRY_AFTER, then it is"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        runner = FakeRunner(status=STATUS_TIMEOUT)
+        cache = PreambleFormatCache(cache_dir=cache_dir, runner=runner)
+        cache.retry_after = 60
+
+        assert cache.build(LATEX) is None
+        assert not cache.schedule(LATEX)
+
+        cache._failures[preamble_hash(LATEX)] = time.time() - 61
+        runner.status = STATUS_OK
+        assert cache.schedule(LATEX)
+        _wait_for_builds(cache)
+        assert cache.get_format(LATEX) == preamble_hash(LATEX)
+        assert cache._failures == {}
+
+
+def test_cache_evicts_least_recently_used_formats():
+    """Formats beyond the size cap are evicted oldest-use first"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = PreambleFormatCache(cache_dir=cache_dir, runner=FakeRunner(size=1000))
+        cache.max_bytes = 2500
+        documents = [LATEX.replace('hyperref', f'package{i}') for i in range(3)]
+
+        for index, latex in enumerate(documents[:2]):
+            cache.build(latex)
+            past = time.time() - 100 + index
+            os.utime(os.path.join(cache_dir, f'{preamble_hash(latex)}.fmt'), (past, past))
+        # Using the first format makes the second the least recently used
+        assert cache.get_format(documents[0])
+        cache.build(documents[2])
+
+        remaining = sorted(name for name in os.listdir(cache_dir) if name.endswith('.fmt'))
+        assert remaining == sorted(f'{preamble_hash(latex)}.fmt' for latex in (documents[0], documents[2]))
+
+
+if __name__ == "__main__":
+    test_lookup_never_blocks_and_builds_in_background()
+    test_failures_are_retried_after_a_while()
+    test_cache_evicts_least_recently_used_formats()
+    print("✅ Preamble format tests passed!")
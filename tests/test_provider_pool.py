@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test suite for the multi-key, multi-model provider pool
+"""
+
+import sys
+import os
+import collections
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.provider_pool import build_pool, parse_models
+from src.resume_tailor.retry import RetryableError
+
+
+class FakeProvider:
+    calls = []
+
+    def __init__(self, api_key=None, model=None, on_throttle=None):
+        self.api_key = api_key
+        self.model = model
+        self.on_throttle = on_throttle
+
+    def is_available(self):
+        return bool(self.api_key)
+
+    def call_api(self, messages, temperature=0.3, json_mode=False):
+        FakeProvider.calls.append((self.api_key, self.model))
+        if self.api_key == 'limited':
+            self.on_throttle(RetryableError('HTTP 429', '429', retry_after=60).retry_after)
+            return None
+        return f'{self.api_key}:{self.model}'
+
+
+def make_pool(env):
+    saved = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    try:
+        return build_pool('FakeProvider', 'FAKE', FakeProvider, 'default-model')
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def test_parse_models():
+    """Weights and stage pins are optional per model"""
+    assert parse_models('big*3, small@skills|keywords,') == [
+        ('big', 3, ()), ('small', 1, ('skills', 'keywords'))
+    ]
+
+
+def test_weighted_dispatch_and_stage_pinning():
+    """Calls split by weight across keys and models; pinned stages go to their model"""
+    pool = make_pool({'FAKE_API_KEYS': 'a,b', 'FAKE_MODELS': 'big*3,mid,small@skills'})
+    assert len(pool.members) == 6
+
+    counts = collections.Counter(pool.call_api([], stage='experience') for _ in range(8))
+    assert counts == {'a:big': 3, 'b:big': 3, 'a:mid': 1, 'b:mid': 1}
+
+    counts = collections.Counter(pool.call_api([], stage='skills') for _ in range(4))
+    assert counts == {'a:small': 2, 'b:small': 2}
+
+
+def test_quota_and_throttled_keys_are_skipped():
+    """Keys out of per-minute quota or rate limited by the vendor stop receiving calls"""
+    pool = make_pool({'FAKE_API_KEYS': 'a', 'FAKE_KEY_RPM': '2', 'FAKE_MODELS': ''})
+    assert [pool.call_api([]) for _ in range(3)] == ['a:default-model', 'a:default-model', None]
+
+    pool = make_pool({'FAKE_API_KEYS': 'limited,ok', 'FAKE_KEY_RPM': '0'})
+    FakeProvider.calls = []
+    assert [pool.call_api([]) for _ in range(3)] == ['ok:default-model'] * 3
+    assert [key for key, _ in FakeProvider.calls].count('limited') == 1
+
+    assert not make_pool({'FAKE_API_KEYS': ''}).is_available()
+
+
+if __name__ == "__main__":
+    test_parse_models()
+    test_weighted_dispatch_and_stage_pinning()
+    test_quota_and_throttled_keys_are_skipped()
+    print("✅ Provider pool tests passed!")
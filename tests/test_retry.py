@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test suite for provider retry policies
+"""
+
+import sys
+import os
+import time
+from email.utils import formatdate
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.retry import RetryPolicy, RetryableError, parse_retry_after, raise_for_transient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_policy(clock, **kwargs):
+    return RetryPolicy(sleep=clock.sleep, clock=clock, **kwargs)
+
+
+def test_parse_retry_after():
+    """Both delta-seconds and HTTP-date forms are understood"""
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after(None) is None and parse_retry_after('soon') is None
+    assert 8 <= parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+
+    try:
+        raise_for_transient(429, {'Retry-After': '2'}, 'Test')
+        assert False, "429 should be retryable"
+    except RetryableError as e:
+        assert e.reason == '429' and e.retry_after == 2.0
+    raise_for_transient(400, {}, 'Test')  # not transient: left to raise_for_status
+
+
+def test_retries_honor_retry_after_and_timeouts_shrink():
+    """A 429 waits at least Retry-After, and each attempt's timeout fits the deadline"""
+    clock = FakeClock()
+    policy = make_policy(clock, attempts=3, base_delay=0.01, deadline=10.0, timeout=30.0)
+    timeouts = []
+
+    def flaky(timeout):
+        timeouts.append(timeout)
+        if len(timeouts) == 1:
+            raise RetryableError('HTTP 429', '429', retry_after=2.0)
+        return 'ok'
+
+    assert policy.call('Test', flaky) == 'ok'
+    assert clock.sleeps[0] >= 2.0
+    assert timeouts[0] == 10.0 and timeouts[1] == 10.0 - clock.sleeps[0]
+
+
+def test_non_retryable_and_deadline_give_up():
+    """Other errors propagate at once; a Retry-After beyond the deadline is not waited out"""
+    clock = FakeClock()
+    policy = make_policy(clock, attempts=5, deadline=5.0)
+    calls = []
+
+    def broken(timeout):
+        calls.append(timeout)
+        raise ValueError('bad request')
+
+    try:
+        policy.call('Test', broken)
+        assert False, "ValueError should propagate"
+    except ValueError:
+        assert len(calls) == 1 and not clock.sleeps
+
+    def throttled(timeout):
+        raise RetryableError('HTTP 503', '503', retry_after=60.0)
+
+    try:
+        policy.call('Test', throttled)
+        assert False, "RetryableError should propagate"
+    except RetryableError:
+        assert not clock.sleeps
+
+
+if __name__ == "__main__":
+    test_parse_retry_after()
+    test_retries_honor_retry_after_and_timeouts_shrink()
+    test_non_retryable_and_deadline_give_up()
+    print("✅ Retry tests passed!")
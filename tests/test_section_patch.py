@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test suite for patch-style experience edits
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.section_modifiers import SectionModifier, indexed_bullets, parse_bullet_patch
+from src.resume_tailor.coverage import CoverageAnalyzer
+
+EXPERIENCE = """
+    \\resumeSubheading{Acme}{2021 -- 2024}{Engineer}{Remote}
+      \\resumeItemListStart
+        \\resumeItem{Built data pipelines processing 2TB daily}
+        \\resumeItem{Cut infrastructure cost by \\textbf{35\\%}}
+      \\resumeItemListEnd
+"""
+
+
+class PatchingAPIManager:
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = []
+
+    def has_any_provider(self):
+        return True
+
+    def call_with_fallback(self, messages, temperature=0.3, stage='other', json_mode=False):
+        self.calls.append((messages[0]['content'], json_mode))
+        return self.answer
+
+
+def test_patch_is_applied_to_changed_bullets_only():
+    """Only patched bullets change; list markup and untouched bullets stay byte-for-byte"""
+    # The model forgot to escape \textbf for JSON; it must not decode as a tab
+    api_manager = PatchingAPIManager('```json\n{"0": "Built \\textbf{Kafka} pipelines processing 2TB daily"}\n```')
+    modifier = SectionModifier(api_manager, CoverageAnalyzer(threshold=1.0), edit_mode='patch')
+
+    [patched] = modifier.modify_experience_sections([EXPERIENCE], ['Kafka'])
+    assert patched == EXPERIENCE.replace(
+        'Built data pipelines processing 2TB daily', 'Built \\textbf{Kafka} pipelines processing 2TB daily'
+    )
+    prompt, json_mode = api_manager.calls[0]
+    assert json_mode and '1: Cut infrastructure cost by \\textbf{35\\%}' in prompt
+    assert 'resumeItemListStart' not in prompt
+
+
+def test_structure_breaking_patches_are_rejected():
+    """Out-of-range indexes, new items and unbalanced braces are dropped; bad JSON keeps the original"""
+    patch = parse_bullet_patch(
+        '{"0": "ok", "1": "x} \\\\resumeItem{y", "2": "z", "one": "w"}', len(indexed_bullets(EXPERIENCE))
+    )
+    assert patch == {0: 'ok'}
+
+    modifier = SectionModifier(PatchingAPIManager('not json'), CoverageAnalyzer(threshold=1.0), edit_mode='patch')
+    assert modifier.modify_experience_sections([EXPERIENCE], ['Kafka']) == [EXPERIENCE]
+
+
+def test_json_escapes_before_words_are_kept():
+    """A correctly escaped \\n before a word stays a newline; only the section's own commands are repaired"""
+    count = len(indexed_bullets(EXPERIENCE))
+    assert parse_bullet_patch('{"0": "Led team\\nDeveloped APIs"}', count, EXPERIENCE) == {0: 'Led team\nDeveloped APIs'}
+    assert parse_bullet_patch('{"0": "Cut cost \\textbf{40\\%}"}', count, EXPERIENCE) == {0: 'Cut cost \\textbf{40\\%}'}
+    # Commands that cannot be JSON escapes are repaired whether or not the section uses them
+    assert parse_bullet_patch('{"0": "Shipped \\emph{Kafka}"}', count, EXPERIENCE) == {0: 'Shipped \\emph{Kafka}'}
+
+
+if __name__ == "__main__":
+    test_patch_is_applied_to_changed_bullets_only()
+    test_structure_breaking_patches_are_rejected()
+    test_json_escapes_before_words_are_kept()
+    print("✅ Section patch tests passed!")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test suite for near-duplicate job description detection
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.similarity_index import SimilarityIndex
+from src.resume_tailor.keyword_extractor import KeywordExtractor
+
+POSTING = (
+    "Acme Analytics is hiring a Senior Backend Engineer to design, build and operate the services behind "
+    "our real-time analytics platform. You will own ingestion pipelines written in Python and Go, run them "
+    "on Kubernetes in AWS, and partner with data scientists to ship features that thousands of customers "
+    "rely on every day. We value clear written communication, thoughtful code review and pragmatic testing. "
+    "Requirements: five or more years building production systems, deep experience with PostgreSQL and "
+    "Kafka, comfort with infrastructure as code using Terraform, and a track record of mentoring engineers."
+)
+REPOST = POSTING.replace("Senior Backend Engineer", "Staff Backend Engineer").replace("five or more", "six or more")
+UNRELATED = (
+    "Northwind Bakery seeks a pastry chef for early morning shifts. Responsibilities include laminating "
+    "dough, decorating cakes for weddings, managing inventory of flour and butter, and training apprentices "
+    "in food safety. Weekend availability and a love of sourdough are essential for this role."
+)
+
+
+class CountingAPIManager:
+    def __init__(self):
+        self.calls = 0
+
+    def has_any_provider(self):
+        return True
+
+    def call_with_fallback(self, messages, temperature=0.3, stage='other'):
+        self.calls += 1
+        return '["Python", "Kubernetes", "Kafka"]'
+
+
+def test_near_duplicates_found_and_unrelated_missed():
+    """Reposts match above the threshold, unrelated postings do not, eviction drops buckets"""
+    index = SimilarityIndex(threshold=0.7, max_entries=2)
+    index.add(POSTING, keywords=['Python'])
+
+    similarity, payload = index.lookup(REPOST)
+    assert similarity >= 0.7 and payload['keywords'] == ['Python']
+    assert index.lookup(UNRELATED) is None
+
+    index.add(UNRELATED, keywords=['Baking'])
+    index.add("A third posting about welding steel beams on construction sites downtown", keywords=[])
+    assert len(index) == 2
+    assert index.lookup(REPOST) is None
+
+
+def test_keyword_extractor_reuses_near_duplicate_keywords():
+    """Only the first of two near-duplicate postings pays for an LLM call"""
+    api_manager = CountingAPIManager()
+    extractor = KeywordExtractor(api_manager, SimilarityIndex(threshold=0.7))
+
+    assert extractor.extract_keywords(POSTING) == ["Python", "Kubernetes", "Kafka"]
+    assert extractor.extract_keywords(REPOST) == ["Python", "Kubernetes", "Kafka"]
+    assert api_manager.calls == 1
+
+    extractor.extract_keywords(UNRELATED)
+    assert api_manager.calls == 2
+
+
+if __name__ == "__main__":
+    test_near_duplicates_found_and_unrelated_missed()
+    test_keyword_extractor_reuses_near_duplicate_keywords()
+    print("✅ Similarity index tests passed!")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test suite for single-flight request coalescing
+"""
+
+import sys
+import os
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.singleflight import SingleFlight, flight_key
+
+
+def test_concurrent_identical_calls_share_one_run():
+    """Callers with the same key share the leader's result and exception"""
+    flight = SingleFlight('test')
+    release = threading.Event()
+    runs = []
+
+    def work(value):
+        runs.append(value)
+        release.wait(5)
+        if value == 'boom':
+            raise RuntimeError('failed once')
+        return {'value': value}
+
+    key = flight_key('job description', r'\documentclass{article}', [{'title': 'Ledger'}])
+    results = []
+    errors = []
+
+    def caller(value):
+        try:
+            results.append(flight.do(flight_key(value) if value == 'boom' else key, work, value))
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=caller, args=('same',)) for _ in range(4)]
+    threads += [threading.Thread(target=caller, args=('boom',)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    while flight.in_flight() < 2:
+        threading.Event().wait(0.01)
+    # Give the followers a moment to join before the leaders finish
+    threading.Event().wait(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert sorted(runs) == ['boom', 'same']
+    assert len(results) == 4 and all(result is results[0] for result in results)
+    assert len(errors) == 2
+    assert flight.in_flight() == 0
+
+    # Completed calls are not cached
+    assert flight.do(key, lambda: 'fresh') == 'fresh'
+
+
+if __name__ == "__main__":
+    test_concurrent_identical_calls_share_one_run()
+    print("✅ Single-flight tests passed!")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test suite for stored resume templates
+"""
+
+import sys
+import os
+import time
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.resume_tailor.template_store import TemplateStore
+from src.resume_tailor.admission import AdmissionController
+
+RESUME = """\\documentclass{article}
+\\usepackage{enumitem}
+\\begin{document}
+%----START OF EXPERIENCE MARKER----
+  \\item Built things
+%----END OF EXPERIENCE MARKER----
+%----START OF TECHNICAL SKILLS MARKER----
+  Python
+%----END OF TECHNICAL SKILLS MARKER----
+\\end{document}
+"""
+
+
+def test_put_get_and_reload_from_disk():
+    """Uploads are idempotent, survive a new store instance, and bad IDs are rejected"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = TemplateStore(directory, cache_size=1)
+        template = store.put(RESUME)
+        assert store.put(RESUME).resume_id == template.resume_id
+        assert store.get(template.resume_id) is template
+
+        metadata = template.to_dict()
+        assert metadata['sections'] == {'skills': True, 'experiences': 1, 'projects': False}
+        assert metadata['preamble_hash'] == template.preamble_hash and template.preamble_hash
+
+        # Another worker process only has the file on disk
+        reloaded = TemplateStore(directory).get(template.resume_id)
+        assert reloaded.latex == RESUME
+        assert reloaded.document.sections() == template.document.sections()
+
+        # The LRU holds one parsed template; the evicted one is reloaded from disk
+        other = store.put(RESUME.replace('Python', 'Go'))
+        assert store.get(other.resume_id) is other
+        assert store.get(template.resume_id).latex == RESUME
+
+        assert store.get('../../etc/passwd') is None
+        assert store.get('0' * 24) is None
+
+
+def test_unused_templates_are_pruned():
+    """Templates past max_age, and the least recently used beyond max_count, are deleted"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = TemplateStore(directory, max_age=3600, max_count=2)
+        templates = [store.put(RESUME.replace('Python', language)) for language in ('Go', 'Rust', 'Java')]
+        for index, template in enumerate(templates):
+            past = time.time() - 1000 + index
+            os.utime(store._path(template.resume_id), (past, past))
+        # Using the oldest one makes the second the least recently used
+        assert store.get(templates[0].resume_id) is templates[0]
+        assert store.prune(force=True) == 1
+        assert store.get(templates[1].resume_id) is None
+        assert store.get(templates[2].resume_id) is templates[2]
+
+        expired = time.time() - 7200
+        os.utime(store._path(templates[2].resume_id), (expired, expired))
+        assert store.prune(force=True) == 1
+        assert sorted(os.listdir(directory)) == [f'{templates[0].resume_id}.tex']
+
+        # A template pruned by another worker is gone here too, even though it is cached
+        os.unlink(store._path(templates[0].resume_id))
+        assert store.get(templates[0].resume_id) is None
+
+
+def test_upload_endpoint_is_admitted_and_reports_errors():
+    """POST /templates is subject to admission control and failures come back as JSON 500s"""
+    import app as app_module
+
+    class FailingTailor:
+        def register_template(self, latex_resume):
+            raise OSError('disk full')
+
+    saved_tailor, saved_admission = app_module.resume_tailor, app_module.admission
+    try:
+        app_module.resume_tailor = FailingTailor()
+        app_module.admission = AdmissionController(max_concurrent=2, max_queue=0, client_quota=1, client_window=60)
+        client = app_module.app.test_client()
+
+        response = client.post('/templates', json={'latex_resume': RESUME})
+        assert response.status_code == 500 and response.get_json()['error'] == 'disk full'
+        response = client.post('/templates', json={'latex_resume': RESUME})
+        assert response.status_code == 429 and response.headers['Retry-After']
+    finally:
+        app_module.resume_tailor, app_module.admission = saved_tailor, saved_admission
+
+
+if __name__ == "__main__":
+    test_put_get_and_reload_from_disk()
+    test_unused_templates_are_pruned()
+    test_upload_endpoint_is_admitted_and_reports_errors()
+    print("✅ Template store tests passed!")